@@ -12,6 +12,7 @@ from .models import (
     BlogCategory, BlogTag, BlogPost, Testimonial, ContactMessage,
     SiteConfiguration
 )
+from .uploads import optimize_upload
 
 # ============================================
 # CUSTOM ADMIN SITE (Regrouping)
@@ -157,6 +158,8 @@ class ImageAdminForm(forms.ModelForm):
         elif isinstance(image_file, UploadedFile) and getattr(image_file, 'size', 0) > 0:
             from PIL import Image as PILImage
 
+            image_file = optimize_upload(image_file, 'image_file')
+
             # Try to get dimensions without reading entire file into memory
             try:
                 img = PILImage.open(image_file)
@@ -237,6 +240,7 @@ class ProfileAdminForm(forms.ModelForm):
         else:
             profile_image = self.cleaned_data.get('upload_profile_image')
             if isinstance(profile_image, UploadedFile) and getattr(profile_image, 'size', 0) > 0:
+                profile_image = optimize_upload(profile_image, 'profile_image_file')
                 instance.profile_image_mime = _get_mime_type(profile_image, fallback='image/jpeg')
                 instance.profile_image_file.save(getattr(profile_image, 'name', ''), profile_image, save=False)
 
@@ -321,6 +325,7 @@ class EducationAdminForm(forms.ModelForm):
         else:
             logo = self.cleaned_data.get('upload_logo')
             if isinstance(logo, UploadedFile) and getattr(logo, 'size', 0) > 0:
+                logo = optimize_upload(logo, 'logo_file')
                 instance.logo_file.save(getattr(logo, 'name', ''), logo, save=False)
                 instance.logo_mime = _get_mime_type(logo, fallback='image/png')
 
@@ -370,6 +375,7 @@ class WorkExperienceAdminForm(forms.ModelForm):
         else:
             logo = self.cleaned_data.get('upload_company_logo')
             if isinstance(logo, UploadedFile) and getattr(logo, 'size', 0) > 0:
+                logo = optimize_upload(logo, 'company_logo_file')
                 instance.company_logo_file.save(getattr(logo, 'name', ''), logo, save=False)
                 instance.company_logo_mime = _get_mime_type(logo, fallback='image/png')
 
@@ -419,6 +425,7 @@ class ProjectAdminForm(forms.ModelForm):
         else:
             image = self.cleaned_data.get('upload_featured_image')
             if isinstance(image, UploadedFile) and getattr(image, 'size', 0) > 0:
+                image = optimize_upload(image, 'featured_image_file')
                 instance.featured_image_file.save(getattr(image, 'name', ''), image, save=False)
                 instance.featured_image_mime = _get_mime_type(image, fallback='image/jpeg')
 
@@ -476,6 +483,7 @@ class CertificateAdminForm(forms.ModelForm):
         else:
             org_logo = self.cleaned_data.get('upload_organization_logo')
             if isinstance(org_logo, UploadedFile) and getattr(org_logo, 'size', 0) > 0:
+                org_logo = optimize_upload(org_logo, 'organization_logo_file')
                 instance.organization_logo_file.save(getattr(org_logo, 'name', ''), org_logo, save=False)
                 instance.organization_logo_mime = _get_mime_type(org_logo, fallback='image/png')
 
@@ -498,6 +506,7 @@ class CertificateAdminForm(forms.ModelForm):
         else:
             cert_image = self.cleaned_data.get('upload_certificate_image')
             if isinstance(cert_image, UploadedFile) and getattr(cert_image, 'size', 0) > 0:
+                cert_image = optimize_upload(cert_image, 'certificate_image_file')
                 instance.certificate_image_file.save(getattr(cert_image, 'name', ''), cert_image, save=False)
                 instance.certificate_image_mime = _get_mime_type(cert_image, fallback='image/jpeg')
 
@@ -547,6 +556,7 @@ class AchievementAdminForm(forms.ModelForm):
         else:
             image = self.cleaned_data.get('upload_achievement_image')
             if isinstance(image, UploadedFile) and getattr(image, 'size', 0) > 0:
+                image = optimize_upload(image, 'image_file')
                 instance.image_file.save(getattr(image, 'name', ''), image, save=False)
                 instance.image_mime = _get_mime_type(image, fallback='image/jpeg')
 
@@ -604,6 +614,7 @@ class BlogPostAdminForm(forms.ModelForm):
         else:
             featured = self.cleaned_data.get('upload_featured_image')
             if isinstance(featured, UploadedFile) and getattr(featured, 'size', 0) > 0:
+                featured = optimize_upload(featured, 'featured_image_file')
                 instance.featured_image_file.save(getattr(featured, 'name', ''), featured, save=False)
                 instance.featured_image_mime = _get_mime_type(featured, fallback='image/jpeg')
 
@@ -625,6 +636,7 @@ class BlogPostAdminForm(forms.ModelForm):
                     pass
             og_image = self.cleaned_data.get('upload_og_image')
             if isinstance(og_image, UploadedFile) and getattr(og_image, 'size', 0) > 0:
+                og_image = optimize_upload(og_image, 'og_image_file')
                 instance.og_image_file.save(getattr(og_image, 'name', ''), og_image, save=False)
                 instance.og_image_mime = _get_mime_type(og_image, fallback='image/jpeg')
 
@@ -666,6 +678,7 @@ class TestimonialAdminForm(forms.ModelForm):
         else:
             image = self.cleaned_data.get('upload_author_image')
             if isinstance(image, UploadedFile) and getattr(image, 'size', 0) > 0:
+                image = optimize_upload(image, 'author_image_file')
                 instance.author_image_file.save(getattr(image, 'name', ''), image, save=False)
                 instance.author_image_mime = _get_mime_type(image, fallback='image/jpeg')
 
@@ -1349,14 +1362,20 @@ class BlogPostAdmin(admin.ModelAdmin):
 
     actions = ['make_published', 'make_draft']
 
+    # Saved one by one, not with queryset.update(): the save signals refresh
+    # the prerendered OG pages, OG cards, related posts and the content version
     @admin.action(description='Publish selected posts')
     def make_published(self, request, queryset):
-        from django.utils import timezone
-        queryset.update(status='published', published_at=timezone.now())
+        for post in queryset.exclude(status='published'):
+            post.status = 'published'
+            post.published_at = None  # set to now by save()
+            post.save()
 
     @admin.action(description='Set selected posts to draft')
     def make_draft(self, request, queryset):
-        queryset.update(status='draft')
+        for post in queryset.exclude(status='draft'):
+            post.status = 'draft'
+            post.save()
 
 
 # ============================================
@@ -0,0 +1,14 @@
+"""
+Cloudinary media storage with memoized URLs (see `api.storage.URLCacheMixin`).
+
+Kept apart from api/storage.py so `cloudinary_storage` is only imported when
+USE_CLOUDINARY selects this backend.
+"""
+
+from cloudinary_storage.storage import MediaCloudinaryStorage
+
+from .storage import URLCacheMixin
+
+
+class CachedMediaCloudinaryStorage(URLCacheMixin, MediaCloudinaryStorage):
+    """MediaCloudinaryStorage whose `url()` is served from an LRU after the first build."""
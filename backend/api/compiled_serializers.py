@@ -0,0 +1,220 @@
+"""
+Compiled fast-path serialization for the read-only API.
+
+DRF's `Serializer.to_representation` walks `_readable_fields` for every object,
+calls `field.get_attribute()` (which re-inspects the source on every call), then
+dispatches to `field.to_representation()`. For list endpoints and the unified
+portfolio payload that per-field overhead dominates the response time.
+
+`compile_serializer()` inspects a serializer class once and generates a plain
+Python function that builds the same dict directly:
+
+    * plain model fields          -> `obj.attr`
+    * date/datetime/uuid/... fields -> the DRF field's own `to_representation`
+    * `source='get_x_display'`    -> `obj.get_x_display()`
+    * SerializerMethodField       -> the serializer's bound `get_<name>` method
+    * nested serializers          -> the nested class' compiled function
+
+The output is identical to `SerializerClass(obj, context=...).data`. Serializers
+that use anything the compiler does not understand (dotted sources, custom
+fields, `to_representation` overrides) raise `NotCompilable`, and
+`get_list_serializer()` silently falls back to the regular DRF class.
+
+Run `python manage.py benchmark_serializers` to compare both paths.
+"""
+
+from functools import lru_cache
+import keyword
+
+from django.conf import settings
+from django.db.models.manager import BaseManager
+from rest_framework import serializers
+
+
+class NotCompilable(Exception):
+    """Raised when a serializer uses features the compiler cannot reproduce."""
+
+
+# Fields whose `to_representation` is the identity for values coming from the
+# database (str for CharField family, int, bool, raw choice keys).
+PASSTHROUGH_FIELDS = {
+    serializers.CharField, serializers.EmailField, serializers.URLField,
+    serializers.SlugField, serializers.IntegerField, serializers.BooleanField,
+    serializers.ChoiceField, serializers.ReadOnlyField,
+}
+
+# Fields with a stateless `to_representation` that can be reused as a converter.
+CONVERTED_FIELDS = {
+    serializers.DateField, serializers.DateTimeField, serializers.TimeField,
+    serializers.UUIDField, serializers.DecimalField, serializers.FloatField,
+    serializers.DurationField, serializers.JSONField,
+}
+
+
+def _iter_related(value):
+    return value.all() if isinstance(value, BaseManager) else value
+
+
+class CompiledSerializer:
+    """
+    A serializer class compiled into a generated function.
+
+    `bind(context)` returns `serialize(obj) -> dict`. Binding is cheap (one
+    serializer instance for method fields, recursively for nested classes) and
+    should be done once per request, not per object.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        if serializer_class.to_representation is not serializers.Serializer.to_representation:
+            raise NotCompilable(f'{serializer_class.__name__} overrides to_representation')
+
+        self.model = getattr(getattr(serializer_class, 'Meta', None), 'model', None)
+        self.converters = []       # DRF fields' to_representation, for non-trivial types
+        self.method_names = []     # SerializerMethodField method names
+        self.nested = []           # CompiledSerializer for nested fields
+        self.specs = [self._analyse(field) for field in serializer_class()._readable_fields]
+
+        self.source = self._render(lambda attr: f'obj.{attr}')
+        self._factory = self._build(self.source)
+
+        # `.values()` mode: every field must be a plain, non-relational column.
+        columns = set()
+        if self.model is not None:
+            columns = {f.attname for f in self.model._meta.concrete_fields if not f.is_relation}
+        self.values_fields = []
+        self._values_factory = None
+        if self.specs and all(kind == 'attr' and attr in columns for _, kind, attr, _ in self.specs):
+            self.values_fields = [attr for _, _, attr, _ in self.specs]
+            self._values_factory = self._build(self._render(lambda attr: f'obj[{attr!r}]'))
+
+    def _analyse(self, field):
+        """Return a (name, kind, attr, index) spec for one readable field."""
+        name = field.field_name
+        if isinstance(field, serializers.SerializerMethodField):
+            self.method_names.append(field.method_name)
+            return name, 'method', None, len(self.method_names) - 1
+
+        if field.source == '*' or len(field.source_attrs) != 1:
+            raise NotCompilable(f'{self.serializer_class.__name__}.{name}: unsupported source')
+        attr = field.source_attrs[0]
+        if not attr.isidentifier() or keyword.iskeyword(attr):
+            raise NotCompilable(f'{self.serializer_class.__name__}.{name}: invalid source')
+
+        if isinstance(field, serializers.ListSerializer):
+            self.nested.append(compile_serializer(type(field.child)))
+            return name, 'many', attr, len(self.nested) - 1
+        if isinstance(field, serializers.BaseSerializer):
+            self.nested.append(compile_serializer(type(field)))
+            return name, 'one', attr, len(self.nested) - 1
+
+        if type(field) in CONVERTED_FIELDS:
+            self.converters.append(field.to_representation)
+            index = len(self.converters) - 1
+        elif type(field) in PASSTHROUGH_FIELDS:
+            index = None
+        else:
+            raise NotCompilable(f'{self.serializer_class.__name__}.{name}: {type(field).__name__}')
+
+        # e.g. source='get_skill_type_display'
+        if callable(getattr(self.model, attr, None)):
+            return name, 'call', attr, index
+        return name, 'attr', attr, index
+
+    def _render(self, access):
+        lines = [
+            'def factory(converters, methods, nested, iter_related):',
+            '    def serialize(obj):',
+            '        return {',
+        ]
+        for name, kind, attr, index in self.specs:
+            if kind == 'method':
+                expr = f'methods[{index}](obj)'
+            elif kind == 'many':
+                expr = f'[nested[{index}](v) for v in iter_related({access(attr)})]'
+            elif kind == 'one':
+                expr = f'(None if (v := {access(attr)}) is None else nested[{index}](v))'
+            else:
+                value = f'{access(attr)}()' if kind == 'call' else access(attr)
+                if index is None:
+                    expr = value
+                else:
+                    expr = f'(None if (v := {value}) is None else converters[{index}](v))'
+            lines.append(f'            {name!r}: {expr},')
+        lines += ['        }', '    return serialize']
+        return '\n'.join(lines)
+
+    def _build(self, source):
+        namespace = {}
+        exec(compile(source, f'<compiled {self.serializer_class.__name__}>', 'exec'), namespace)
+        return namespace['factory']
+
+    def bind(self, context=None):
+        """Return a `serialize(obj)` function bound to `context`."""
+        context = context if context is not None else {}
+        methods = ()
+        if self.method_names:
+            serializer = self.serializer_class(context=context)
+            methods = tuple(getattr(serializer, name) for name in self.method_names)
+        nested = tuple(n.bind(context) for n in self.nested)
+        return self._factory(tuple(self.converters), methods, nested, _iter_related)
+
+    def serialize(self, instance, context=None):
+        return self.bind(context)(instance)
+
+    def serialize_many(self, instances, context=None):
+        serialize = self.bind(context)
+        return [serialize(obj) for obj in _iter_related(instances)]
+
+    def serialize_values(self, queryset):
+        """
+        Serialize straight from `.values()` rows, skipping model instantiation.
+        Only available when every field maps to a plain model column.
+        """
+        if self._values_factory is None:
+            raise NotCompilable(f'{self.serializer_class.__name__} needs model instances')
+        serialize = self._values_factory(tuple(self.converters), (), (), _iter_related)
+        return [serialize(row) for row in queryset.values(*self.values_fields)]
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class):
+    """Compile (and memoize) `serializer_class`. Raises NotCompilable."""
+    return CompiledSerializer(serializer_class)
+
+
+class CompiledListSerializer:
+    """Minimal stand-in for `Serializer(many=True)` exposing only `.data`."""
+
+    def __init__(self, compiled, instances, context):
+        self.compiled = compiled
+        self.instances = instances
+        self.context = context
+
+    @property
+    def data(self):
+        return self.compiled.serialize_many(self.instances, self.context)
+
+
+def get_list_serializer(serializer_class, instances, context=None):
+    """
+    Return an object whose `.data` serializes `instances` like
+    `serializer_class(instances, many=True, context=context).data`, using the
+    compiled fast path when enabled and possible.
+    """
+    if getattr(settings, 'COMPILED_SERIALIZERS', True):
+        try:
+            return CompiledListSerializer(compile_serializer(serializer_class), instances, context)
+        except NotCompilable:
+            pass
+    return serializer_class(instances, many=True, context=context or {})
+
+
+def serialize_instance(serializer_class, instance, context=None):
+    """Single-object counterpart of `get_list_serializer(...).data`."""
+    if getattr(settings, 'COMPILED_SERIALIZERS', True):
+        try:
+            return compile_serializer(serializer_class).serialize(instance, context)
+        except NotCompilable:
+            pass
+    return serializer_class(instance, context=context or {}).data
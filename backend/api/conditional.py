@@ -0,0 +1,188 @@
+"""
+Conditional GET (ETag / Last-Modified) for the read-only API.
+
+Validators are computed *before* anything is serialized, so a client that
+already holds the current representation gets a `304 Not Modified` for the
+price of one small aggregate query:
+
+    list   -> SELECT MAX(updated_at), COUNT(*) over the filtered queryset
+    detail -> SELECT updated_at of the looked-up row
+
+Responses also embed related rows (images, tags, categories, the author...)
+whose edits do not touch the parent's `updated_at`. Every content model's
+save/delete already fires the portfolio cache invalidation signal (see
+`api/views.py`), which also bumps a *content version* mixed into each ETag,
+so those edits invalidate validators too.
+
+The version must be the same in every process serving the API. With a shared
+default cache (CACHE_URL, see settings) it lives there and a 304 needs no
+query at all. Django's default LocMemCache is per process, so otherwise it is
+read from the ContentVersion row: one primary-key lookup per request. Entries
+that other modules cache per process (the portfolio payload, the srcset and
+placeholder maps) are stored with `versioned_get_or_set()`, so a bump made by
+another process discards them as well.
+
+Counters such as `BlogPost.views_count` are written with `update_fields` and do
+not bump `updated_at`; they are deliberately not part of the validators.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .models import ContentVersion
+
+CONTENT_VERSION_KEY = 'api_content_version'
+DOCUMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _stored_version():
+    return ContentVersion.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+
+def get_content_version():
+    """Return the current content version."""
+    if settings.CONTENT_VERSION_IN_CACHE:
+        return cache.get_or_set(CONTENT_VERSION_KEY, _stored_version, timeout=None)
+    return _stored_version()
+
+
+def bump_content_version():
+    """Invalidate every ETag handed out so far, in every process."""
+    version = time.time_ns()
+    if not ContentVersion.objects.filter(pk=1).update(version=version):
+        ContentVersion.objects.get_or_create(pk=1, defaults={'version': version})
+    if settings.CONTENT_VERSION_IN_CACHE:
+        cache.set(CONTENT_VERSION_KEY, version, timeout=None)
+
+
+def versioned_get_or_set(key, build, timeout=None):
+    """
+    `cache.get_or_set()` whose entry is only reused under the content version
+    it was built at.
+    """
+    version = get_content_version()
+    entry = cache.get(key)
+    if entry is None or entry[0] != version:
+        entry = (version, build())
+        cache.set(key, entry, timeout)
+    return entry[1]
+
+
+def make_etag(request, *parts):
+    """
+    Build a strong ETag from `parts` plus everything about the request that
+    changes the body: the absolute URL (host, filters, pagination) and the
+    negotiated renderer (JSON vs. browsable API).
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    key = [request.build_absolute_uri(), getattr(renderer, 'format', ''), get_content_version(), *parts]
+    digest = hashlib.blake2b('|'.join(map(str, key)).encode(), digest_size=16).hexdigest()
+    return quote_etag(digest)
+
+
+def conditional_response(request, etag, last_modified, build):
+    """
+    Return `304 Not Modified` when the request's `If-None-Match` /
+    `If-Modified-Since` match the validators, otherwise call `build()` and
+    attach them to its response. `last_modified` is an aware datetime or None.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = build()
+        if response.status_code != 200:
+            return response
+    if timestamp is not None:
+        response['Last-Modified'] = http_date(timestamp)
+    response['ETag'] = etag
+    # Always revalidate instead of letting browsers apply heuristic freshness.
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def cached_document(request, name, build, content_type):
+    """
+    Serve a generated document (sitemap, feed) from the cache, with validators.
+
+    `name` identifies the document, including the base URL it links to. It is
+    cached as bytes under the content version, so the next content change
+    rebuilds it. `build()` returns (body, last_modified), or None for a 404.
+    """
+    digest = hashlib.blake2b(name.encode(), digest_size=16).hexdigest()
+    key = f'document:{get_content_version()}:{digest}'
+
+    doc = cache.get(key)
+    if doc is None:
+        built = build()
+        if built is None:
+            doc = {'body': None}
+        else:
+            body, last_modified = built
+            body = body.encode() if isinstance(body, str) else body
+            etag = quote_etag(hashlib.blake2b(body, digest_size=16).hexdigest())
+            doc = {'body': body, 'etag': etag, 'last_modified': last_modified}
+        cache.set(key, doc, DOCUMENT_CACHE_TIMEOUT)
+    if doc['body'] is None:
+        raise Http404
+
+    return conditional_response(
+        request, doc['etag'], doc['last_modified'],
+        lambda: HttpResponse(doc['body'], content_type=content_type),
+    )
+
+
+class ConditionalGetMixin:
+    """
+    Add ETag / Last-Modified validators to `list` and `retrieve` of a
+    read-only viewset. Custom actions can reuse `conditional_list()`.
+    """
+
+    validator_field = 'updated_at'
+
+    def get_list_validators(self, queryset):
+        stats = queryset.order_by().aggregate(
+            last_modified=Max(self.validator_field), count=Count('pk'),
+        )
+        etag = make_etag(self.request, queryset.model._meta.label, stats['last_modified'], stats['count'])
+        return etag, stats['last_modified']
+
+    def get_detail_validators(self):
+        """Validators for the object `get_object()` would return, or (None, None)."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            last_modified = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            ).prefetch_related(None).order_by().values_list(self.validator_field, flat=True).first()
+        except (TypeError, ValueError, ValidationError):
+            last_modified = None
+        if last_modified is None:
+            # Missing row: let the regular code path produce the 404.
+            return None, None
+        etag = make_etag(self.request, queryset.model._meta.label, last_modified)
+        return etag, last_modified
+
+    def conditional_list(self, queryset, build):
+        etag, last_modified = self.get_list_validators(queryset)
+        return conditional_response(self.request, etag, last_modified, build)
+
+    def conditional_detail(self, build):
+        etag, last_modified = self.get_detail_validators()
+        if etag is None:
+            return build()
+        return conditional_response(self.request, etag, last_modified, build)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_list(queryset, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_detail(lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs))
@@ -0,0 +1,74 @@
+"""
+Archive and facet counts of the published blog posts.
+
+An archive sidebar (posts per year/month) and the category/tag filters with
+their counts used to take a request per list plus a COUNT per entry. One
+endpoint returns them all for the current filter set, i.e. the same
+`category`, `tags`, `profile`, `is_featured`, `show_on_home` and `search`
+parameters as /api/blog/:
+
+    GET /api/blog/facets/?tags=django
+
+    {
+      "count": 12,
+      "categories": [{"slug", "name", "count"}, ...],   every category, 0 included
+      "tags":       [{"slug", "name", "count"}, ...],   every tag, 0 included
+      "years":      [{"year": 2026, "count": 7}, ...],  newest first
+      "months":     [{"month": "2026-05", "count": 3}, ...]
+    }
+
+Three aggregate queries, each over the filtered posts as a subquery: a
+conditional Count() per category and per tag, and a TruncMonth() GROUP BY
+(the totals and years are summed from the months). The result is cached per
+filter combination under the content version (see api/conditional.py), so any
+post, tag or category change invalidates it; pagination and ordering
+parameters do not create new entries.
+"""
+
+import hashlib
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+
+from .conditional import DOCUMENT_CACHE_TIMEOUT, get_content_version
+from .models import BlogCategory, BlogPost, BlogTag
+
+
+def _counts(model, ids):
+    rows = model.objects.annotate(count=Count('posts', filter=Q(posts__in=ids))).values_list('slug', 'name', 'count')
+    return [{'slug': slug, 'name': name, 'count': count} for slug, name, count in rows]
+
+
+def build_facets(posts):
+    """Facet counts of the `posts` queryset."""
+    ids = posts.order_by().values('pk')
+    months = (
+        BlogPost.objects.filter(pk__in=ids)
+        .annotate(month=TruncMonth('published_at'))
+        .values('month').annotate(count=Count('pk'))
+        .order_by('-month')
+    )
+    months = [(row['month'], row['count']) for row in months]
+    years = Counter()
+    for month, count in months:
+        if month is not None:
+            years[month.year] += count
+    return {
+        'count': sum(count for _, count in months),
+        'categories': _counts(BlogCategory, ids),
+        'tags': _counts(BlogTag, ids),
+        'years': [{'year': year, 'count': count} for year, count in sorted(years.items(), reverse=True)],
+        'months': [{'month': f'{month:%Y-%m}', 'count': count} for month, count in months if month is not None],
+    }
+
+
+def cached_facets(params, build):
+    """
+    The facets of the filter parameters `params` ({name: value}) from the
+    cache, or `build()` them.
+    """
+    key = '&'.join(f'{name}={value}' for name, value in sorted(params.items()))
+    digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    return cache.get_or_set(f'facets:{get_content_version()}:{digest}', build, DOCUMENT_CACHE_TIMEOUT)
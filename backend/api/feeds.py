@@ -0,0 +1,139 @@
+"""
+RSS, Atom and JSON Feed of the published blog posts.
+
+The Next.js `/api/rss` route lists local MDX files, so posts written in the
+admin never reached feed readers, and it rebuilt the XML on every poll. The
+backend serves the feeds from the database instead:
+
+    GET /api/blog/feed.rss     RSS 2.0
+    GET /api/blog/feed.atom    Atom 1.0
+    GET /api/blog/feed.json    JSON Feed 1.1
+
+The FEED_ITEMS latest posts are read once with iterator() and handed to the
+encoder one at a time (django.utils.feedgenerator for RSS/Atom). The feed is
+not streamed to the client: its ETag is a hash of the whole body, so it is
+encoded in memory and cached as bytes under the content version (see
+api/conditional.py). It is rebuilt only after a post, tag, category or
+profile change; view counters do not count. Readers polling with
+If-None-Match / If-Modified-Since get a 304 without a query.
+
+Item links point at the frontend (FRONTEND_URL, else the forwarded host).
+"""
+
+import io
+import json
+
+from django.http import Http404
+from django.utils import feedgenerator
+
+from .conditional import cached_document
+from .models import BlogPost, Profile
+from .og_middleware import resolve_base_url
+
+FEED_ITEMS = 30
+CHUNK_SIZE = 100
+
+FEED_TYPES = {
+    'rss': (feedgenerator.Rss201rev2Feed, 'application/rss+xml; charset=utf-8'),
+    'atom': (feedgenerator.Atom1Feed, 'application/atom+xml; charset=utf-8'),
+    'json': (None, 'application/feed+json; charset=utf-8'),
+}
+
+
+def _posts():
+    posts = (
+        BlogPost.objects.filter(status='published')
+        .select_related('profile', 'category')
+        .prefetch_related('tags')
+        .order_by('-published_at', '-id')[:FEED_ITEMS]
+    )
+    return posts.iterator(chunk_size=CHUNK_SIZE)
+
+
+def _items(base_url, site_name):
+    """Feed items of the latest posts, as feedgenerator.add_item() keyword arguments."""
+    for post in _posts():
+        categories = [post.category.name] if post.category else []
+        categories += [tag.name for tag in post.tags.all()]
+        link = f"{base_url}/blog/{post.slug}"
+        yield {
+            'title': post.title,
+            'link': link,
+            'unique_id': link,
+            'description': post.excerpt,
+            'author_name': post.profile.full_name if post.profile else site_name,
+            'pubdate': post.published_at,
+            'updateddate': post.updated_at,
+            'categories': categories,
+            'content_html': post.content_html,
+        }
+
+
+def _json_feed(meta, items):
+    feed = {
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': meta['title'],
+        'home_page_url': meta['link'],
+        'feed_url': meta['feed_url'],
+        'description': meta['description'],
+        'language': meta['language'],
+        'authors': [{'name': meta['author_name']}],
+        'items': [
+            {
+                'id': item['unique_id'],
+                'url': item['link'],
+                'title': item['title'],
+                'summary': item['description'],
+                'content_html': item['content_html'],
+                'date_published': item['pubdate'].isoformat() if item['pubdate'] else None,
+                'date_modified': item['updateddate'].isoformat(),
+                'authors': [{'name': item['author_name']}],
+                'tags': item['categories'],
+            }
+            for item in items
+        ],
+    }
+    return json.dumps(feed, ensure_ascii=False).encode()
+
+
+def build_feed(fmt, base_url, feed_url):
+    """The encoded feed and its newest modification time."""
+    profile = Profile.objects.filter(pk=1).first()
+    site_name = profile.full_name if profile else 'Portfolio'
+    meta = {
+        'title': f"{site_name} — Blog",
+        'link': f"{base_url}/blog",
+        'description': profile.headline if profile else '',
+        'language': 'en',
+        'author_name': site_name,
+        'feed_url': feed_url,
+    }
+    modified = [getattr(profile, 'updated_at', None)]
+
+    def items():
+        for item in _items(base_url, site_name):
+            modified.append(item['updateddate'])
+            yield item
+
+    generator_class = FEED_TYPES[fmt][0]
+    if generator_class is None:
+        body = _json_feed(meta, items())
+    else:
+        feed = generator_class(**meta)
+        for item in items():
+            feed.add_item(**item)
+        out = io.BytesIO()
+        feed.write(out, 'utf-8')
+        body = out.getvalue()
+    return body, max(filter(None, modified), default=None)
+
+
+def blog_feed(request, fmt):
+    if fmt not in FEED_TYPES:
+        raise Http404('Unknown feed format')
+    base_url = resolve_base_url(request)
+    feed_url = request.build_absolute_uri(request.path)
+    return cached_document(
+        request, f'feed|{fmt}|{base_url}|{feed_url}',
+        lambda: build_feed(fmt, base_url, feed_url), FEED_TYPES[fmt][1],
+    )
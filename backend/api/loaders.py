@@ -0,0 +1,129 @@
+"""
+Request-scoped batch loaders.
+
+`Image` rows hang off most content models through a GenericForeignKey, so a
+response that mixes several content types (e.g. the unified portfolio payload)
+would normally issue one `images` query per model type — or one per object when
+nothing is prefetched. `ImageLoader` collects every `(content_type, object_id)`
+pair a response needs, resolves them in a single query that hits the
+`(content_type, object_id)` index, and hands the grouped rows back to the
+instances through Django's prefetch cache so `obj.images.all()` (and therefore
+`ImageSerializer(many=True)`) never touches the database again.
+"""
+
+from collections import defaultdict
+from functools import reduce
+import operator
+
+from django.contrib.contenttypes.fields import GenericRelation
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+
+from .models import Image
+
+
+def _image_relation_name(model):
+    """Return the name of the GenericRelation to Image on `model` (or None)."""
+    for field in model._meta.private_fields:
+        if isinstance(field, GenericRelation) and field.related_model is Image:
+            return field.name
+    return None
+
+
+class ImageLoader:
+    """
+    DataLoader-style batcher for generic images.
+
+    Usage:
+        loader = ImageLoader.for_request(request)
+        loader.load_many(educations)
+        loader.load_many(certificates)
+        loader.dispatch()           # one query for everything queued
+        loader.get(educations[0])   # -> list[Image]
+
+    `prime()` is a shortcut for load_many + dispatch that also attaches the
+    results to each instance's prefetch cache.
+    """
+
+    REQUEST_ATTR = '_image_loader'
+
+    def __init__(self):
+        self._pending = defaultdict(set)    # content_type_id -> {object_id}
+        self._instances = []                # instances waiting to be attached
+        self._results = {}                  # (content_type_id, object_id) -> [Image]
+
+    @classmethod
+    def for_request(cls, request):
+        """Return the loader bound to `request`, creating it on first use."""
+        if request is None:
+            return cls()
+        loader = getattr(request, cls.REQUEST_ATTR, None)
+        if loader is None:
+            loader = cls()
+            setattr(request, cls.REQUEST_ATTR, loader)
+        return loader
+
+    @staticmethod
+    def _key(instance):
+        content_type = ContentType.objects.get_for_model(instance, for_concrete_model=True)
+        return content_type.pk, instance.pk
+
+    def load(self, instance):
+        """Queue `instance` so its images are fetched on the next dispatch."""
+        if instance is None or instance.pk is None:
+            return
+        ct_id, obj_id = self._key(instance)
+        if (ct_id, obj_id) not in self._results:
+            self._pending[ct_id].add(obj_id)
+        self._instances.append(instance)
+
+    def load_many(self, instances):
+        for instance in instances:
+            self.load(instance)
+
+    def dispatch(self):
+        """Resolve every queued key with a single query and attach the results."""
+        if self._pending:
+            clauses = [
+                Q(content_type_id=ct_id, object_id__in=sorted(obj_ids))
+                for ct_id, obj_ids in self._pending.items()
+            ]
+            for ct_id, obj_ids in self._pending.items():
+                for obj_id in obj_ids:
+                    self._results[(ct_id, obj_id)] = []
+
+            images = Image.objects.select_related('content_type').filter(reduce(operator.or_, clauses))
+            for image in images:
+                self._results[(image.content_type_id, image.object_id)].append(image)
+            self._pending.clear()
+
+        for instance in self._instances:
+            self._attach(instance)
+        self._instances = []
+
+    def get(self, instance):
+        """Return the loaded images for `instance` (dispatching if still queued)."""
+        key = self._key(instance)
+        if key not in self._results:
+            self.load(instance)
+            self.dispatch()
+        return self._results.get(key, [])
+
+    def prime(self, instances):
+        """Queue, dispatch and attach in one go. Returns `instances` as a list."""
+        instances = [obj for obj in instances if obj is not None]
+        self.load_many(instances)
+        self.dispatch()
+        return instances
+
+    def _attach(self, instance):
+        """Seed the instance's prefetch cache so `instance.images.all()` is free."""
+        relation = _image_relation_name(type(instance))
+        if relation is None:
+            return
+        queryset = getattr(instance, relation).all()
+        queryset._result_cache = self._results.get(self._key(instance), [])
+        queryset._prefetch_done = True
+        if not hasattr(instance, '_prefetched_objects_cache'):
+            instance._prefetched_objects_cache = {}
+        instance._prefetched_objects_cache[relation] = queryset
@@ -0,0 +1,104 @@
+"""Benchmark the compiled serializer fast path against the regular DRF serializers.
+
+Usage:
+  python manage.py benchmark_serializers
+  python manage.py benchmark_serializers --repeat 200 --multiply 20
+
+Each case serializes the same (already fetched) instances with both paths, checks
+that the rendered JSON is byte-identical and reports the per-run time. Database
+access is excluded: querysets are materialized and image relations primed first.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from api.compiled_serializers import compile_serializer
+from api.loaders import ImageLoader
+from api.models import (
+    Image, Profile, Skill, Education, WorkExperience, Project, Certificate,
+    Achievement, BlogPost, Testimonial, SocialLink
+)
+from api.serializers import (
+    ImageSerializer, ProfileDetailSerializer, SkillSerializer, EducationSerializer,
+    WorkExperienceSerializer, ProjectSerializer, CertificateSerializer,
+    AchievementSerializer, BlogPostListSerializer, TestimonialSerializer,
+    SocialLinkSerializer
+)
+
+CASES = [
+    ('projects', ProjectSerializer, lambda: Project.objects.filter(is_visible=True)),
+    ('blog posts', BlogPostListSerializer,
+     lambda: BlogPost.objects.filter(status='published').select_related('category', 'profile').prefetch_related('tags')),
+    ('experience', WorkExperienceSerializer, lambda: WorkExperience.objects.all()),
+    ('education', EducationSerializer, lambda: Education.objects.all()),
+    ('certificates', CertificateSerializer, lambda: Certificate.objects.all()),
+    ('achievements', AchievementSerializer, lambda: Achievement.objects.all()),
+    ('testimonials', TestimonialSerializer, lambda: Testimonial.objects.all()),
+    ('skills', SkillSerializer, lambda: Skill.objects.all()),
+    ('images', ImageSerializer, lambda: Image.objects.select_related('content_type')),
+    ('profile detail', ProfileDetailSerializer,
+     lambda: Profile.objects.prefetch_related('social_links', 'skills')),
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare compiled fast-path serializers with the DRF serializers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', '-r', type=int, default=50, help='Timed runs per case')
+        parser.add_argument('--multiply', '-m', type=int, default=1,
+                            help='Repeat the instance list N times to simulate larger payloads')
+
+    def handle(self, *args, **opts):
+        repeat = opts['repeat']
+        multiply = opts['multiply']
+        request = RequestFactory().get('/api/portfolio-data/')
+        context = {'request': request}
+        render = JSONRenderer().render
+
+        self.stdout.write(f"{'case':16} {'items':>6} {'drf ms':>9} {'compiled ms':>12} {'speedup':>8}")
+        total_drf = total_fast = 0.0
+        for label, serializer_class, get_queryset in CASES:
+            instances = ImageLoader.for_request(request).prime(get_queryset()) * multiply
+            if not instances:
+                self.stdout.write(f'{label:16} {0:>6}  (no rows, skipped)')
+                continue
+            compiled = compile_serializer(serializer_class)
+
+            drf_data = serializer_class(instances, many=True, context=context).data
+            fast_data = compiled.serialize_many(instances, context)
+            if render(drf_data) != render(fast_data):
+                raise CommandError(f'{label}: compiled output differs from {serializer_class.__name__}')
+
+            drf_ms = self._time(lambda: serializer_class(instances, many=True, context=context).data, repeat)
+            fast_ms = self._time(lambda: compiled.serialize_many(instances, context), repeat)
+            total_drf += drf_ms
+            total_fast += fast_ms
+            self.stdout.write(
+                f'{label:16} {len(instances):>6} {drf_ms:>9.3f} {fast_ms:>12.3f} {drf_ms / fast_ms:>7.1f}x'
+            )
+
+        if total_fast:
+            self.stdout.write(self.style.SUCCESS(
+                f"{'total':16} {'':>6} {total_drf:>9.3f} {total_fast:>12.3f} {total_drf / total_fast:>7.1f}x"
+            ))
+
+        # `.values()` rows skip model instantiation entirely for column-only serializers.
+        compiled = compile_serializer(SocialLinkSerializer)
+        queryset = SocialLink.objects.all()
+        if compiled.values_fields and queryset.exists():
+            drf_ms = self._time(lambda: SocialLinkSerializer(queryset.all(), many=True).data, repeat)
+            fast_ms = self._time(lambda: compiled.serialize_values(queryset.all()), repeat)
+            self.stdout.write(
+                f"{'social (values)':16} {queryset.count():>6} {drf_ms:>9.3f} {fast_ms:>12.3f} "
+                f'{drf_ms / fast_ms:>7.1f}x  (includes query)'
+            )
+
+    @staticmethod
+    def _time(fn, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - start) * 1000 / repeat
@@ -0,0 +1,72 @@
+"""Benchmark media URL building with and without the storage URL cache.
+
+Usage:
+  python manage.py benchmark_storage_urls
+  python manage.py benchmark_storage_urls --images 500 --repeat 50 --refs 3
+
+Builds the URLs of a synthetic payload with `--images` distinct stored names,
+each referenced `--refs` times (e.g. the image, its card and the gallery
+entry), using two instances of the configured default storage backend: one
+with `url_cache_size=0` and one with MEDIA_URL_CACHE_SIZE. The first cached
+build fills the LRU and is reported separately; the rest are warm payload
+builds, the case `/api/portfolio-data/` hits after every cache invalidation.
+No database access and no file I/O: names are never opened.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from api.storage import content_name
+
+
+class Command(BaseCommand):
+    help = 'Measure storage.url() cost for a payload with and without the URL cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--images', '-n', type=int, default=500, help='Distinct stored images in the payload')
+        parser.add_argument('--refs', type=int, default=2, help='URL lookups per image per payload build')
+        parser.add_argument('--repeat', '-r', type=int, default=50, help='Timed payload builds')
+
+    def handle(self, *args, **opts):
+        config = settings.STORAGES['default']
+        storage_class = import_string(config['BACKEND'])
+        options = dict(config.get('OPTIONS', {}))
+        cache_size = options.pop('url_cache_size', 0) or settings.MEDIA_URL_CACHE_SIZE
+        if not cache_size:
+            raise CommandError('MEDIA_URL_CACHE_SIZE is 0; nothing to compare')
+
+        names = [
+            content_name(hashlib.sha256(str(i).encode()).hexdigest(), f'image-{i}.jpg')
+            for i in range(opts['images'])
+        ]
+        payload = names * opts['refs']
+        repeat = opts['repeat']
+
+        plain = storage_class(**options, url_cache_size=0)
+        cached = storage_class(**options, url_cache_size=cache_size)
+        if [plain.url(n) for n in names] != [cached.url(n) for n in names]:
+            raise CommandError('Cached URLs differ from the storage URLs')
+        cached.url.cache_clear()
+
+        plain_ms = self._time(plain.url, payload, repeat)
+        cold_ms = self._time(cached.url, payload, 1)
+        warm_ms = self._time(cached.url, payload, repeat)
+
+        self.stdout.write(f'{storage_class.__name__}: {len(names)} images, {len(payload)} URL lookups per build')
+        self.stdout.write(f"{'uncached':>10} {'cold':>10} {'warm':>10} {'speedup':>8}   (ms per build)")
+        self.stdout.write(f'{plain_ms:>10.3f} {cold_ms:>10.3f} {warm_ms:>10.3f} {plain_ms / warm_ms:>7.1f}x')
+        info = cached.url.cache_info()
+        self.stdout.write(f'cache: {info.currsize}/{info.maxsize} entries, {info.hits} hits, {info.misses} misses')
+        if len(names) > cache_size:
+            self.stdout.write(self.style.WARNING('More images than cache entries: the LRU thrashes'))
+
+    @staticmethod
+    def _time(url, payload, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for name in payload:
+                url(name)
+        return (time.perf_counter() - start) * 1000 / repeat
@@ -0,0 +1,48 @@
+"""Write Brotli/gzip copies of compressible media files (see api/media_middleware.py).
+
+SVGs, PDFs with uncompressed streams, text and JSON uploads shrink a lot;
+images, archives and video are skipped. A `.br` is only written when the
+`brotli` package is installed, and a copy is kept only if it saves enough bytes.
+Run it as a deploy step, before the web processes start, since the media
+middleware notes the available encodings when it indexes a file.
+
+Usage:
+  # Compress files without an up-to-date .gz/.br:
+  python manage.py compress_media
+
+  # Recompress everything:
+  python manage.py compress_media --force
+"""
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from whitenoise.compress import Compressor
+
+SKIP_EXTENSIONS = Compressor.SKIP_COMPRESS_EXTENSIONS + ('avif', 'docx', 'xlsx', 'pptx', 'mp3')
+
+
+def _is_current(path, compressed):
+    return os.path.exists(compressed) and os.path.getmtime(compressed) >= os.path.getmtime(path)
+
+
+class Command(BaseCommand):
+    help = 'Precompress media files for the media middleware'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Recompress files that already have copies')
+
+    def handle(self, *args, **opts):
+        compressor = Compressor(extensions=SKIP_EXTENSIONS, quiet=True)
+        written = 0
+        for directory, _, filenames in os.walk(settings.MEDIA_ROOT):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                if filename.endswith(('.gz', '.br')) or not compressor.should_compress(filename):
+                    continue
+                if not opts['force'] and _is_current(path, path + '.gz'):
+                    continue
+                for output in compressor.compress(path):
+                    self.stdout.write(f'Wrote {os.path.relpath(output, settings.MEDIA_ROOT)}')
+                    written += 1
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} compressed file(s)'))
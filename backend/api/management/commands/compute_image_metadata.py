@@ -0,0 +1,54 @@
+"""Compute image dimensions, dominant colours and placeholders (see api/placeholders.py).
+
+Saves schedule this automatically; run the command to backfill existing images
+or after a background run was interrupted.
+
+Usage:
+  # Compute what is missing:
+  python manage.py compute_image_metadata
+
+  # Recompute everything:
+  python manage.py compute_image_metadata --force
+"""
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from api.conditional import bump_content_version
+from api.models import ImageMetadata
+from api.placeholders import METADATA_CACHE_KEY, compute_metadata, image_sources, missing_sources
+from api.variants import image_fields
+from api.views import CACHE_KEY
+
+
+class Command(BaseCommand):
+    help = 'Compute missing image dimensions, dominant colours and placeholders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Recompute metadata that already exists')
+
+    def handle(self, *args, **opts):
+        sources = set()
+        for model in apps.get_models():
+            if image_fields(model):
+                for instance in model._default_manager.all().iterator():
+                    sources |= image_sources(instance)
+
+        todo = sources if opts['force'] else missing_sources(sources)
+        stored = 0
+        for source in sorted(todo):
+            metadata = compute_metadata(source)
+            if metadata:
+                stored += 1
+                self.stdout.write(f'{source}: {metadata.width}x{metadata.height} {metadata.dominant_color}')
+
+        # Drop rows of images that are no longer used
+        stale, _ = ImageMetadata.objects.exclude(source__in=sources).delete()
+
+        if stored or stale:
+            cache.delete(METADATA_CACHE_KEY)
+            cache.delete(CACHE_KEY)
+            bump_content_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored metadata for {stored} of {len(todo)} image(s); removed {stale} stale row(s)'
+        ))
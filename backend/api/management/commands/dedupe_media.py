@@ -0,0 +1,78 @@
+"""Move existing uploads into content-addressed storage (see api/storage.py).
+
+Files uploaded before CONTENT_ADDRESSED_MEDIA was enabled keep their original
+names (and duplicates). This re-saves each one through the storage so it ends
+up under cas/<sha256>, then points the record at the new name.
+
+Usage:
+  # Dry-run: shows what would be moved (default behavior unless --confirm is passed)
+  python manage.py dedupe_media
+
+  # Apply changes:
+  python manage.py dedupe_media --confirm
+
+  # Apply and remove the original files once nothing refers to them:
+  python manage.py dedupe_media --confirm --delete-originals
+
+Records are updated with queryset.update(), so `updated_at` and save signals are
+not touched; the API cache and ETags are invalidated once at the end.
+"""
+from django.apps import apps
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+
+from api.conditional import bump_content_version
+from api.storage import ContentAddressedStorage, is_content_addressed
+from api.views import CACHE_KEY
+
+
+class Command(BaseCommand):
+    help = 'Re-store existing media files under content-addressed names'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--confirm', action='store_true', help='Actually move files and update records')
+        parser.add_argument('--delete-originals', action='store_true', help='Delete the old files after moving')
+
+    def handle(self, *args, **opts):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError('Default storage is not content-addressed (check CONTENT_ADDRESSED_MEDIA / USE_CLOUDINARY).')
+        dry = not opts['confirm']
+
+        moved = {}  # original name -> content-addressed name
+        updated = 0
+        for model in apps.get_models():
+            for field in model._meta.get_fields():
+                if not (isinstance(field, models.FileField) and field.concrete):
+                    continue
+                rows = model._default_manager.exclude(**{field.name: ''}).exclude(**{f'{field.name}__isnull': True})
+                for pk, name in rows.values_list('pk', field.name).iterator():
+                    if is_content_addressed(name):
+                        continue
+                    if name not in moved:
+                        if not default_storage.exists(name):
+                            self.stdout.write(self.style.WARNING(f'{model.__name__}.{field.name}#{pk}: {name} missing - skipping'))
+                            continue
+                        if dry:
+                            moved[name] = None
+                        else:
+                            with default_storage.open(name, 'rb') as fh:
+                                moved[name] = default_storage.save(name, fh)
+                    self.stdout.write(f'{model.__name__}.{field.name}#{pk}: {name} -> {moved[name] or "cas/..."}')
+                    if not dry:
+                        model._default_manager.filter(pk=pk).update(**{field.name: moved[name]})
+                    updated += 1
+
+        if dry:
+            self.stdout.write(self.style.SUCCESS(f'Dry-run: {updated} record(s), {len(moved)} file(s) would be moved. Pass --confirm to apply.'))
+            return
+
+        if opts['delete_originals']:
+            for name in moved:
+                default_storage.delete(name)
+        if updated:
+            cache.delete(CACHE_KEY)
+            bump_content_version()
+        blobs = len(set(moved.values()))
+        self.stdout.write(self.style.SUCCESS(f'Updated {updated} record(s): {len(moved)} file(s) stored as {blobs} blob(s)'))
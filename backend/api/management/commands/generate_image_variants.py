@@ -0,0 +1,50 @@
+"""Generate responsive variants for images uploaded before they existed (see api/variants.py).
+
+Usage:
+  # Create missing variants for every ImageField upload:
+  python manage.py generate_image_variants
+
+  # Rebuild all variants (e.g. after changing IMAGE_VARIANT_WIDTHS / IMAGE_VARIANT_QUALITY):
+  python manage.py generate_image_variants --force
+"""
+from django.apps import apps
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from api.conditional import bump_content_version
+from api.models import ImageVariant
+from api.variants import delete_variants, generate_variants, image_fields
+from api.views import CACHE_KEY
+
+
+class Command(BaseCommand):
+    help = 'Generate missing responsive image variants'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that already exist')
+
+    def handle(self, *args, **opts):
+        names = set()
+        for model in apps.get_models():
+            for field in image_fields(model):
+                rows = model._default_manager.exclude(**{field.name: ''}).exclude(**{f'{field.name}__isnull': True})
+                names.update(rows.values_list(field.name, flat=True))
+
+        if opts['force']:
+            delete_variants(names)
+        existing = set(ImageVariant.objects.values_list('source', flat=True).distinct())
+
+        created = 0
+        for name in sorted(names - existing):
+            if not default_storage.exists(name):
+                self.stdout.write(self.style.WARNING(f'{name} missing - skipping'))
+                continue
+            variants = generate_variants(name)
+            self.stdout.write(f'{name}: {len(variants)} variant(s)')
+            created += len(variants)
+
+        if created:
+            cache.delete(CACHE_KEY)
+            bump_content_version()
+        self.stdout.write(self.style.SUCCESS(f'Created {created} variant(s) for {len(names)} image(s)'))
@@ -0,0 +1,26 @@
+"""Rebuild the prerendered crawler OG pages (see api/prerender.py).
+
+Saves keep the pages current on their own; run this after enabling
+OG_PRERENDER, changing FRONTEND_URL or restoring a database, and as a deploy
+step when OG_PRERENDER_DIR is not persistent. Files no public object maps to
+any more are removed.
+
+Usage:
+  python manage.py prerender_og_pages
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api import prerender
+
+
+class Command(BaseCommand):
+    help = 'Write the OG pages of all public detail routes to OG_PRERENDER_DIR'
+
+    def handle(self, *args, **opts):
+        if not settings.OG_PRERENDER_BASE_URL:
+            raise CommandError('FRONTEND_URL is not set; the pages need it for their canonical links')
+        written, removed = prerender.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} page(s), removed {removed} stale file(s) in {settings.OG_PRERENDER_DIR}'
+        ))
@@ -0,0 +1,65 @@
+"""Probe external image URLs for dimensions and file size (see api/probe.py).
+
+Only the first few kilobytes of each image are requested (ranged GETs), on a
+bounded thread pool. Results go to ImageMetadata and to Image.width/height/file_size.
+
+Usage:
+  # Probe URLs without stored dimensions:
+  python manage.py probe_image_urls
+
+  # Re-probe everything with 16 workers, 3 s timeout and 3 retries:
+  python manage.py probe_image_urls --force --workers 16 --timeout 3 --retries 3
+"""
+import time
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from api.conditional import bump_content_version
+from api.models import Image, ImageMetadata
+from api.placeholders import METADATA_CACHE_KEY, image_sources
+from api.probe import probe_many, store_results
+from api.variants import image_fields
+from api.views import CACHE_KEY
+
+
+class Command(BaseCommand):
+    help = 'Probe external image URLs for dimensions and size using ranged requests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-probe URLs that already have dimensions')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent probes')
+        parser.add_argument('--timeout', type=float, default=5, help='Per-request timeout in seconds')
+        parser.add_argument('--retries', type=int, default=2, help='Retries for timeouts and 5xx responses')
+
+    def handle(self, *args, **opts):
+        urls = set()
+        for model in apps.get_models():
+            if image_fields(model):
+                for instance in model._default_manager.all().iterator():
+                    urls |= {s for s in image_sources(instance) if s.startswith(('http://', 'https://'))}
+
+        if not opts['force']:
+            known = set(ImageMetadata.objects.filter(source__in=urls).values_list('source', flat=True))
+            # Gallery rows may still lack dimensions even when metadata exists
+            unsized = set(Image.objects.filter(image_url__in=urls, width__isnull=True).values_list('image_url', flat=True))
+            urls = (urls - known) | unsized
+
+        started = time.time()
+        results = probe_many(urls, workers=opts['workers'], timeout=opts['timeout'], retries=opts['retries'])
+        for url, result in sorted(results.items()):
+            if result:
+                size = f'{result.file_size} bytes' if result.file_size else 'size unknown'
+                self.stdout.write(f'{url}: {result.width}x{result.height}, {size} (read {result.bytes_read})')
+            else:
+                self.stdout.write(self.style.WARNING(f'{url}: failed'))
+
+        stored = store_results(results)
+        if stored:
+            cache.delete(METADATA_CACHE_KEY)
+            cache.delete(CACHE_KEY)
+            bump_content_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Probed {len(results)} URL(s) in {time.time() - started:.1f}s: {stored} stored, {len(results) - stored} failed'
+        ))
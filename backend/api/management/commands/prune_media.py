@@ -0,0 +1,81 @@
+"""Delete content-addressed media blobs that no FileField references any more.
+
+Responsive variants (api/variants.py) of images that are no longer used are
+deleted first, so their blobs are released in the same run.
+
+Usage:
+  # Show what would be deleted:
+  python manage.py prune_media --dry-run
+
+  # Delete unreferenced blobs older than 24 hours (default):
+  python manage.py prune_media
+
+  # Only blobs older than a week:
+  python manage.py prune_media --min-age 168
+
+Blobs younger than --min-age are kept so uploads whose record has not been
+saved yet (e.g. a form that failed validation and is re-submitted) survive.
+"""
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import models
+from django.utils import timezone
+
+from api.models import ImageVariant, MediaBlob
+from api.variants import delete_variants
+
+
+def referenced_media_names(exclude_models=()):
+    """Every file name stored in a FileField/ImageField of any installed model."""
+    names = set()
+    for model in apps.get_models():
+        if model in exclude_models:
+            continue
+        for field in model._meta.get_fields():
+            if isinstance(field, models.FileField) and field.concrete:
+                names.update(
+                    model._default_manager.exclude(**{field.name: ''})
+                    .exclude(**{f'{field.name}__isnull': True})
+                    .values_list(field.name, flat=True)
+                )
+    return names
+
+
+class Command(BaseCommand):
+    help = 'Delete content-addressed media blobs that are no longer referenced'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only list what would be deleted')
+        parser.add_argument('--min-age', type=float, default=24, help='Keep blobs younger than this many hours')
+
+    def handle(self, *args, **opts):
+        dry = opts['dry_run']
+        cutoff = timezone.now() - timedelta(hours=opts['min_age'])
+
+        sources = referenced_media_names(exclude_models=(ImageVariant,))
+        stale = set(
+            ImageVariant.objects.filter(created_at__lt=cutoff).exclude(source__in=sources)
+            .values_list('source', flat=True)
+        )
+        for source in sorted(stale):
+            self.stdout.write(f"{'Would delete' if dry else 'Deleting'} variants of {source}")
+        if stale and not dry:
+            delete_variants(stale)
+
+        referenced = referenced_media_names()
+        delete_blob = getattr(default_storage, 'delete_blob', default_storage.delete)
+
+        removed = freed = 0
+        for blob in MediaBlob.objects.filter(created_at__lt=cutoff).exclude(name__in=referenced).iterator():
+            self.stdout.write(f"{'Would delete' if dry else 'Deleting'} {blob.name} ({blob.size} bytes)")
+            if not dry:
+                delete_blob(blob.name)
+                blob.delete()
+            removed += 1
+            freed += blob.size
+
+        verb = 'Would free' if dry else 'Freed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {freed} bytes in {removed} blob(s)'))
@@ -0,0 +1,48 @@
+"""Recompute `BlogPost.popularity` from the daily view counters.
+
+Views keep the score current (see api/popularity.py); run this after changing
+POPULAR_HALF_LIFE_DAYS, since stored scores use the half-life they were
+recorded with. Each day's views count at noon. `--prune-days` first deletes
+counters older than that many days; with a week-long half-life, views
+older than the longest window (90 days) weigh less than 1/4000.
+
+Usage:
+  python manage.py rebuild_popularity
+  python manage.py rebuild_popularity --prune-days 90
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import BlogPost, BlogPostViewDay
+from api.popularity import CACHE_PREFIX, WINDOWS, day_exponent, log_score
+
+
+class Command(BaseCommand):
+    help = 'Recompute the decayed popularity of all blog posts from the daily view counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prune-days', type=int, default=0, help='Delete counters older than this many days first')
+
+    def handle(self, *args, **opts):
+        if opts['prune_days']:
+            cutoff = timezone.localdate() - timedelta(days=opts['prune_days'])
+            deleted, _ = BlogPostViewDay.objects.filter(day__lt=cutoff).delete()
+            self.stdout.write(f'Pruned {deleted} counter(s) before {cutoff}')
+
+        days = defaultdict(list)
+        rows = BlogPostViewDay.objects.values_list('post_id', 'day', 'views')
+        for post_id, day, views in rows.iterator(chunk_size=2000):
+            days[post_id].append((views, day_exponent(day)))
+        scores = {pk: log_score(weighted) for pk, weighted in days.items()}
+
+        posts = [BlogPost(pk=pk, popularity=score) for pk, score in scores.items()]
+        with transaction.atomic():
+            BlogPost.objects.exclude(pk__in=list(scores)).update(popularity=0)
+            BlogPost.objects.bulk_update(posts, ['popularity'], batch_size=500)
+        cache.delete_many([f'{CACHE_PREFIX}:{window}' for window in WINDOWS])
+        self.stdout.write(self.style.SUCCESS(f'Recomputed the popularity of {len(posts)} post(s)'))
@@ -0,0 +1,27 @@
+"""Recompute the related posts and related projects of every item.
+
+Saves keep the tables current (see api/related.py); run this after enabling
+RELATED_CONTENT, a bulk import that bypassed save(), or a change of the
+scoring weights.
+
+Usage:
+  python manage.py rebuild_related
+"""
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from api import related
+from api.conditional import bump_content_version
+from api.views import CACHE_KEY
+
+
+class Command(BaseCommand):
+    help = 'Recompute the precomputed related posts and related projects'
+
+    def handle(self, *args, **opts):
+        for model in related.KINDS:
+            rows = related.rebuild(model)
+            self.stdout.write(f'{model._meta.verbose_name}: {rows} neighbour row(s)')
+        cache.delete(CACHE_KEY)
+        bump_content_version()
+        self.stdout.write(self.style.SUCCESS('Related content rebuilt'))
@@ -0,0 +1,66 @@
+"""Recompute word count, reading time and blank excerpts of every blog post.
+
+`BlogPost.save()` keeps them current for posts whose content changes, and
+migration 0015 measured the posts that existed before; run this after
+changing WORDS_PER_MINUTE or the stripped syntax in api/markup.py.
+
+Walks the table in primary-key chunks, reading only the columns it needs and
+writing each chunk with one bulk_update(). `updated_at` and the content
+signals are left alone, so ETags are invalidated once at the end.
+
+Usage:
+  python manage.py recompute_post_stats
+  python manage.py recompute_post_stats --chunk-size 200
+"""
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.conditional import bump_content_version
+from api.markup import measure_markdown
+from api.models import BlogPost
+from api.views import CACHE_KEY
+
+FIELDS = ['word_count', 'reading_time', 'excerpt']
+
+
+class Command(BaseCommand):
+    help = 'Recompute word count, reading time and blank excerpts of all blog posts in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Posts per query and bulk update')
+
+    def handle(self, *args, **opts):
+        chunk_size = opts['chunk_size']
+        last_pk = 0
+        changed = total = 0
+        while True:
+            posts = list(
+                BlogPost.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', 'content', *FIELDS)[:chunk_size]
+            )
+            if not posts:
+                break
+            last_pk = posts[-1].pk
+            total += len(posts)
+
+            updates = []
+            for post in posts:
+                stats = measure_markdown(post.content)
+                values = {
+                    'word_count': stats.word_count,
+                    'reading_time': stats.reading_time,
+                    'excerpt': post.excerpt if post.excerpt.strip() else stats.excerpt,
+                }
+                if any(getattr(post, field) != value for field, value in values.items()):
+                    for field, value in values.items():
+                        setattr(post, field, value)
+                    updates.append(post)
+            with transaction.atomic():
+                BlogPost.objects.bulk_update(updates, FIELDS)
+            changed += len(updates)
+            self.stdout.write(f'{total} post(s) scanned, {changed} updated')
+
+        if changed:
+            cache.delete(CACHE_KEY)
+            bump_content_version()
+        self.stdout.write(self.style.SUCCESS(f'Updated {changed} of {total} post(s)'))
@@ -0,0 +1,206 @@
+"""
+Media serving for the API's file endpoints (`/api/profiles/<id>/resume/`,
+`/api/projects/<slug>/image/`, `/api/images/<uuid>/data/`, ...).
+
+Every `*_file` / `*_url` pair is served the same way by `serve_media()`:
+
+    * uploaded file -> streamed with validators, range support and caching
+    * external URL  -> redirect
+    * neither       -> 404 `{"error": ...}`
+
+Validators and caching follow from the stored name:
+
+    * content-addressed names (`cas/<sha256>...`, see api/storage.py) embed
+      the digest of their content, which is the ETag; they are sent with
+      `Cache-Control: public, max-age=31536000, immutable` on any URL
+    * other names can be reused once deleted (or rewritten by another
+      storage), so their ETag also covers the size and modification time
+    * `If-None-Match` / `If-Modified-Since` -> 304 without opening the file
+    * `Range: bytes=a-b` (single range, honouring `If-Range`) -> 206 / 416,
+      so PDF viewers and download managers can resume
+    * URLs carrying the current `?v=<token>` (see `versioned_path()`) are
+      immutable too; the token is derived like the ETag, so rewriting a
+      reused name changes it. Other URLs are public but revalidated on
+      every use
+
+Serializers emit `file.url` for uploads, i.e. the stored name itself, which
+is served as immutable for `cas/` names (api/media_middleware.py) and needs no
+token. Only endpoints whose path stays the same when the file is replaced,
+such as `resume_url`, carry `?v=`.
+
+On filesystem storage the transfer can be handed to the web server with
+`MEDIA_ACCEL_REDIRECT_PREFIX` (nginx `X-Accel-Redirect`, internal location
+aliased to MEDIA_ROOT) or `MEDIA_SENDFILE` (Apache/lighttpd `X-Sendfile`).
+"""
+
+import hashlib
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .storage import is_content_addressed
+
+VERSION_QUERY_PARAM = 'v'
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+UNSATISFIABLE = object()
+
+
+def _fingerprint(file, timestamp):
+    """Digest of a content-addressed name, else a hash of its name, size and `timestamp`."""
+    if is_content_addressed(file.name):
+        return os.path.splitext(os.path.basename(file.name))[0]
+    key = f'{file.name}|{file.size}|{timestamp}'
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def media_version(file, timestamp=None):
+    """
+    Short token identifying the content of a stored file. Pass the modification
+    `timestamp` when it is already known; it is read from the storage otherwise.
+    """
+    if timestamp is None:
+        timestamp = _modified_timestamp(file)
+    try:
+        return _fingerprint(file, timestamp)[:16]
+    except FileNotFoundError:
+        return ''  # the URL is a 404 until the file exists
+
+
+def versioned_path(path, file):
+    """Append the version token so the URL can be cached as immutable."""
+    return f'{path}?{VERSION_QUERY_PARAM}={media_version(file)}'
+
+
+def serve_media(request, file, content_type, external_url=None, not_found='File not found'):
+    """Serve `file` (a FieldFile), else redirect to `external_url`, else 404."""
+    if file:
+        try:
+            return _serve_file(request, file, content_type)
+        except FileNotFoundError:
+            pass
+    elif external_url:
+        return redirect(external_url)
+    return Response({'error': not_found}, status=status.HTTP_404_NOT_FOUND)
+
+
+def media_etag(file, timestamp):
+    """Strong ETag of a stored file whose modification time is `timestamp` (or None)."""
+    return quote_etag(_fingerprint(file, timestamp))
+
+
+def _serve_file(request, file, content_type):
+    timestamp = _modified_timestamp(file)
+    etag = media_etag(file, timestamp)
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = _file_response(request, file, content_type, etag)
+
+    response['ETag'] = etag
+    if timestamp is not None:
+        response['Last-Modified'] = http_date(timestamp)
+    if is_content_addressed(file.name) or request.GET.get(VERSION_QUERY_PARAM) == media_version(file, timestamp):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def _file_response(request, file, content_type, etag):
+    path = _local_path(file)
+    accel_prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '')
+    if path and accel_prefix:
+        # nginx serves the bytes (including Range) from its internal location
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{quote(file.name)}"
+        return response
+    if path and getattr(settings, 'MEDIA_SENDFILE', False):
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+        return response
+
+    size = file.size
+    byte_range = _requested_range(request, etag, size)
+    if byte_range is UNSATISFIABLE:
+        response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    handle = file.storage.open(file.name, 'rb')
+    if byte_range is None:
+        response = FileResponse(handle, content_type=content_type)
+    else:
+        start, end = byte_range
+        handle.seek(start)
+        response = StreamingHttpResponse(
+            _iter_range(handle, end - start + 1),
+            status=status.HTTP_206_PARTIAL_CONTENT,
+            content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _requested_range(request, etag, size):
+    """
+    Return (start, end) for a satisfiable single byte range, UNSATISFIABLE, or
+    None to send the whole file (no/malformed/multi-range header, stale If-Range).
+    """
+    match = RANGE_RE.match(request.META.get('HTTP_RANGE', '').strip())
+    if not match:
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range.strip() != etag:
+        return None
+
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        if not last or int(last) == 0 or size == 0:
+            return UNSATISFIABLE
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return UNSATISFIABLE
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def _iter_range(handle, remaining):
+    try:
+        while remaining > 0:
+            chunk = handle.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        handle.close()
+
+
+def _modified_timestamp(file):
+    try:
+        return int(file.storage.get_modified_time(file.name).timestamp())
+    except (NotImplementedError, OSError):
+        return None
+
+
+def _local_path(file):
+    try:
+        return file.path
+    except NotImplementedError:
+        return None
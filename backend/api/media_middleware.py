@@ -0,0 +1,71 @@
+"""
+Serve MEDIA_ROOT in production, the way WhiteNoise serves static files.
+
+`portfolio/urls.py` only serves MEDIA_URL with DEBUG on, so with local storage
+(USE_CLOUDINARY=False) uploaded files were only reachable through the
+per-model API actions, each costing a database query. This middleware answers
+`GET /portfolio_media/<name>` before Django routing, sessions or the database
+are touched:
+
+    * MEDIA_ROOT is indexed once at startup: content type, size, mtime and
+      ETag of every file are computed up front
+    * files uploaded later (possibly by another worker process) are added to
+      the index on their first request, with a single stat()
+    * `If-None-Match` / `If-Modified-Since` -> 304, single `Range` -> 206
+    * `.br` / `.gz` siblings are sent to clients that accept them;
+      `manage.py compress_media` writes them for compressible files
+    * content-addressed names (`cas/...`, see api/storage.py) never change
+      content and are cached for a year as `immutable`; other names get
+      MEDIA_SERVE_MAX_AGE, since a deleted name can be reused
+
+Enabled by MEDIA_SERVE (defaults to on unless USE_CLOUDINARY); put it right
+after WhiteNoiseMiddleware.
+"""
+
+import os
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from whitenoise.base import WhiteNoise
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.string_utils import ensure_leading_trailing_slash
+
+from .storage import is_content_addressed
+
+
+class MediaFilesMiddleware(WhiteNoise):
+    def __init__(self, get_response):
+        if not settings.MEDIA_SERVE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        super().__init__(application=None, max_age=settings.MEDIA_SERVE_MAX_AGE)
+
+        self.media_prefix = ensure_leading_trailing_slash(urlparse(settings.MEDIA_URL).path)
+        root = os.path.abspath(settings.MEDIA_ROOT)
+        # Looked up by find_file() for files that are not indexed yet
+        self.directories.append((root.rstrip(os.sep) + os.sep, self.media_prefix))
+        if os.path.isdir(root):
+            self.add_files(root, prefix=self.media_prefix)
+
+    def __call__(self, request):
+        url = request.path_info
+        if url.startswith(self.media_prefix):
+            media_file = self.files.get(url) or self.index_file_at(url)
+            if media_file is not None:
+                try:
+                    return WhiteNoiseMiddleware.serve(media_file, request)
+                except FileNotFoundError:
+                    # Deleted (e.g. by prune_media) since it was indexed
+                    self.files.pop(url, None)
+        return self.get_response(request)
+
+    def index_file_at(self, url):
+        """Add the file at `url` to the index if it exists on disk; returns it or None."""
+        media_file = self.find_file(url)
+        if media_file is not None:
+            self.files[url] = media_file
+        return media_file
+
+    def immutable_file_test(self, path, url):
+        return is_content_addressed(url[len(self.media_prefix):])
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.9 on 2026-10-18 22:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_add_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageMetadata',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='Stored file name or external URL', max_length=500, unique=True)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('dominant_color', models.CharField(help_text='Hex colour, e.g. #1a2b3c', max_length=7)),
+                ('placeholder', models.TextField(help_text='Low-quality image placeholder (data URI)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Image metadata',
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-18 22:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_add_image_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagemetadata',
+            name='file_size',
+            field=models.PositiveBigIntegerField(blank=True, help_text='Size in bytes, if known', null=True),
+        ),
+        migrations.AlterField(
+            model_name='imagemetadata',
+            name='dominant_color',
+            field=models.CharField(blank=True, help_text='Hex colour, e.g. #1a2b3c', max_length=7),
+        ),
+        migrations.AlterField(
+            model_name='imagemetadata',
+            name='placeholder',
+            field=models.TextField(blank=True, help_text='Low-quality image placeholder (data URI)'),
+        ),
+    ]
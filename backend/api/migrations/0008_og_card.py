@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-18 23:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_add_image_metadata_file_size'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OGCard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('version', models.DateTimeField(help_text='updated_at of the content the card was rendered from')),
+                ('file', models.ImageField(max_length=255, upload_to='og_cards/')),
+                ('size', models.PositiveIntegerField(default=0, help_text='Size in bytes')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'OG card',
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.9 on 2026-10-18 23:22
+
+import copy
+import hashlib
+
+import markdown
+import nh3
+from django.db import migrations, models
+
+# Frozen copy of api/markup.py as of this migration, so later changes to the
+# rendering do not change what it does.
+EXTENSIONS = ['extra', 'sane_lists', 'toc']
+TOC_CONFIG = {
+    'toc_depth': '2-4',
+    'permalink': '#',
+    'permalink_class': 'heading-anchor',
+    'permalink_title': 'Link to this section',
+}
+ALLOWED_ATTRIBUTES = copy.deepcopy(nh3.ALLOWED_ATTRIBUTES)
+ALLOWED_ATTRIBUTES['a'] |= {'title'}
+ALLOWED_ATTRIBUTES['img'] |= {'title'}
+ALLOWED_ATTRIBUTES['code'] = {'class'}
+for _tag in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'sup', 'div'):
+    ALLOWED_ATTRIBUTES.setdefault(_tag, set()).add('id')
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _toc(tokens):
+    return [
+        {'level': t['level'], 'id': t['id'], 'name': t['name'], 'children': _toc(t['children'])}
+        for t in tokens
+    ]
+
+
+def render_markdown(text):
+    md = markdown.Markdown(extensions=EXTENSIONS, extension_configs={'toc': TOC_CONFIG})
+    html = md.convert(text)
+    clean = nh3.clean(
+        html,
+        attributes=ALLOWED_ATTRIBUTES,
+        allowed_classes={'a': {'heading-anchor', 'footnote-ref', 'footnote-backref'}, 'div': {'footnote'}},
+        set_tag_attribute_values={'img': {'loading': 'lazy'}},
+        url_schemes={'http', 'https', 'mailto'},
+        clean_content_tags={'script', 'style'},
+    )
+    return clean, _toc(md.toc_tokens)
+
+
+def render_existing_posts(apps, schema_editor):
+    BlogPost = apps.get_model('api', 'BlogPost')
+    for pk, content in BlogPost.objects.values_list('pk', 'content').iterator():
+        html, toc = render_markdown(content)
+        # update() leaves updated_at alone: the posts did not change
+        BlogPost.objects.filter(pk=pk).update(content_html=html, content_toc=toc, content_hash=content_hash(content))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_og_card'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_toc',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(render_existing_posts, migrations.RunPython.noop),
+    ]
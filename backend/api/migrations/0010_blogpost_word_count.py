@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-18 23:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_blogpost_rendered_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='blogpost',
+            name='excerpt',
+            field=models.TextField(blank=True, help_text='Short summary for previews (left blank: the start of the content)', max_length=500),
+        ),
+        migrations.AlterField(
+            model_name='blogpost',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=5, help_text='Estimated reading time in minutes, computed from the content on save'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.9 on 2026-10-18 23:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_blogpost_word_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='api.blogpost')),
+                ('target', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbour_of', to='api.blogpost')),
+            ],
+            options={
+                'ordering': ['source', 'rank'],
+                'unique_together': {('source', 'rank')},
+            },
+        ),
+        migrations.CreateModel(
+            name='RelatedProject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='api.project')),
+                ('target', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbour_of', to='api.project')),
+            ],
+            options={
+                'ordering': ['source', 'rank'],
+                'unique_together': {('source', 'rank')},
+            },
+        ),
+    ]
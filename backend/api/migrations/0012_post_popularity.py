@@ -0,0 +1,32 @@
+# Generated by Django 5.2.9 on 2026-10-18 23:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_related_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='popularity',
+            field=models.FloatField(db_index=True, default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='BlogPostViewDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(db_index=True)),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_days', to='api.blogpost')),
+            ],
+            options={
+                'ordering': ['-day'],
+                'unique_together': {('post', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.9 on 2026-10-18 23:42
+
+from django.db import migrations, models
+
+
+def backfill_published_at(apps, schema_editor):
+    # Rows written with update() could be published without a date; keyset
+    # pagination would skip them
+    BlogPost = apps.get_model('api', 'BlogPost')
+    BlogPost.objects.filter(status='published', published_at__isnull=True).update(published_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_post_popularity'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_published_at, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='blogpost',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('status', 'published'), _negated=True), ('published_at__isnull', False), _connector='OR'), name='published_post_has_published_at'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+import math
+import re
+
+from django.db import migrations
+
+# Frozen copy of measure_markdown() in api/markup.py. 0009 stored the content
+# hash of every post, so their next saves skip measuring and word_count would
+# stay at the 0 that 0010 added it with.
+WORDS_PER_MINUTE = 230
+FENCE_RE = re.compile(r'^[ ]{0,3}(`{3,}|~{3,}).*?^[ ]{0,3}\1', re.MULTILINE | re.DOTALL)
+MARKUP_RE = re.compile(r"""
+    (?=^|[!\]<*_`~|\[])
+    (?:
+        ^[ ]{0,3}(?:\#{1,6}|>|[-*+]|\d+[.)])[ ]
+      | !\[[^\[\]\n]*\]\([^()\n]*\)
+      | \]\([^()\n]*\)
+      | <[^<>\n]*>
+      | [*_`~|\[\]]+
+    )
+""", re.MULTILINE | re.VERBOSE)
+
+
+def measure(text):
+    code_words = 0
+
+    def strip_code(match):
+        nonlocal code_words
+        code_words += max(0, len(match.group(0).split()) - 2)
+        return ' '
+
+    words = len(MARKUP_RE.sub(' ', FENCE_RE.sub(strip_code, text)).split())
+    return words, max(1, math.ceil((words + code_words) / WORDS_PER_MINUTE))
+
+
+def measure_existing_posts(apps, schema_editor):
+    BlogPost = apps.get_model('api', 'BlogPost')
+    for pk, content in BlogPost.objects.values_list('pk', 'content').iterator():
+        word_count, reading_time = measure(content)
+        # update() leaves updated_at alone: the posts did not change
+        BlogPost.objects.filter(pk=pk).update(word_count=word_count, reading_time=reading_time)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_content_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(measure_existing_posts, migrations.RunPython.noop),
+    ]
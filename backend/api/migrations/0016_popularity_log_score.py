@@ -0,0 +1,27 @@
+import math
+
+from django.db import migrations
+
+
+def to_log_scores(apps, schema_editor):
+    # popularity held the sum S of the view weights; it now holds log2(1 + S)
+    BlogPost = apps.get_model('api', 'BlogPost')
+    for pk, score in BlogPost.objects.filter(popularity__gt=0).values_list('pk', 'popularity').iterator():
+        BlogPost.objects.filter(pk=pk).update(popularity=math.log2(1 + score))
+
+
+def to_sums(apps, schema_editor):
+    BlogPost = apps.get_model('api', 'BlogPost')
+    for pk, score in BlogPost.objects.filter(popularity__gt=0).values_list('pk', 'popularity').iterator():
+        BlogPost.objects.filter(pk=pk).update(popularity=2 ** score - 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_backfill_post_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(to_log_scores, to_sums),
+    ]
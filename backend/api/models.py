@@ -9,6 +9,8 @@ from django.db.models.signals import post_delete
 from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 
+from .markup import content_hash, measure_markdown, render_markdown
+
 
 def reorder_model_items(model_class, filter_kwargs, order_field='order'):
     """
@@ -115,6 +117,103 @@ class Image(models.Model):
             raise ValueError("Either file or url must be provided")
 
 
+# ============================================
+# CONTENT-ADDRESSED MEDIA
+# ============================================
+
+class MediaBlob(models.Model):
+    """
+    One row per unique uploaded file (see `api.storage.ContentAddressedStorage`).
+    Identical uploads resolve to the same row and the same stored name, so a
+    logo used by ten certificates is written once. Blobs no longer referenced
+    by any FileField are removed by `manage.py prune_media`.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, help_text="Name of the stored file")
+    size = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.name
+
+
+class ImageVariant(models.Model):
+    """
+    A resized copy of an uploaded image (see `api.variants`).
+    Keyed by the stored name of the original, which never changes content,
+    so every record pointing at the same upload shares its variants.
+    """
+    FORMAT_CHOICES = [
+        ('webp', 'WebP'),
+        ('jpeg', 'JPEG'),
+        ('png', 'PNG'),
+    ]
+
+    source = models.CharField(max_length=255, db_index=True, help_text="Stored name of the original image")
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    file = models.ImageField(upload_to='variants/', max_length=255)
+    size = models.PositiveIntegerField(default=0, help_text="Size in bytes")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['source', 'format', 'width']
+        unique_together = ['source', 'format', 'width']
+
+    def __str__(self):
+        return f"{self.source} ({self.format} {self.width}w)"
+
+
+class ImageMetadata(models.Model):
+    """
+    Layout data for an image, computed in the background (see `api.placeholders`):
+    dimensions, dominant colour and a tiny blurred preview as a data URI.
+    Keyed by the stored file name, or the URL for external images.
+    External images are probed first (`api.probe`), which fills only the
+    dimensions and size; colour and placeholder follow once downloaded.
+    """
+    source = models.CharField(max_length=500, unique=True, help_text="Stored file name or external URL")
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    file_size = models.PositiveBigIntegerField(null=True, blank=True, help_text="Size in bytes, if known")
+    dominant_color = models.CharField(max_length=7, blank=True, help_text="Hex colour, e.g. #1a2b3c")
+    placeholder = models.TextField(blank=True, help_text="Low-quality image placeholder (data URI)")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Image metadata"
+
+    def __str__(self):
+        return f"{self.source} ({self.width}x{self.height})"
+
+
+class OGCard(models.Model):
+    """
+    Generated 1200x630 Open Graph card of a blog post or project (see `api.og_cards`).
+    `version` is the content's `updated_at` when the card was rendered;
+    a newer `updated_at` means the card is stale.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    version = models.DateTimeField(help_text="updated_at of the content the card was rendered from")
+    file = models.ImageField(upload_to='og_cards/', max_length=255)
+    size = models.PositiveIntegerField(default=0, help_text="Size in bytes")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "OG card"
+        unique_together = ['content_type', 'object_id']
+
+    def __str__(self):
+        return f"{self.content_type.model} #{self.object_id} ({self.version:%Y-%m-%d %H:%M})"
+
+
 # ============================================
 # ABOUT / PROFILE SECTION
 # ============================================
@@ -238,6 +337,8 @@ class SocialLink(models.Model):
     # Display on homepage
     show_on_home = models.BooleanField(default=True, help_text="Display this social link on homepage")
 
+    updated_at = models.DateTimeField(auto_now=True)
+
     class Meta:
         ordering = ['order']
 
@@ -307,6 +408,8 @@ class Skill(models.Model):
     # Display on homepage
     show_on_home = models.BooleanField(default=False, help_text="Display this skill on homepage")
 
+    updated_at = models.DateTimeField(auto_now=True)
+
     # Mapping of common skill names to icon keys in frontend
     ICON_MAPPING = {
         # Programming Languages
@@ -566,6 +669,7 @@ class Education(models.Model):
     
     # Display on homepage
     show_on_home = models.BooleanField(default=False, help_text="Display this education on homepage")
+    updated_at = models.DateTimeField(auto_now=True)
     
     # Related images (gallery)
     images = GenericRelation(Image)
@@ -642,6 +746,7 @@ class WorkExperience(models.Model):
     
     # Display on homepage
     show_on_home = models.BooleanField(default=False, help_text="Display this work experience on homepage")
+    updated_at = models.DateTimeField(auto_now=True)
     
     # Related images (gallery)
     images = GenericRelation(Image)
@@ -812,6 +917,7 @@ class Certificate(models.Model):
     
     # Display on homepage
     show_on_home = models.BooleanField(default=False, help_text="Display this certificate on homepage")
+    updated_at = models.DateTimeField(auto_now=True)
     
     # Related images (gallery)
     images = GenericRelation(Image)
@@ -886,6 +992,7 @@ class Achievement(models.Model):
     
     # Display on homepage
     show_on_home = models.BooleanField(default=False, help_text="Display this achievement on homepage")
+    updated_at = models.DateTimeField(auto_now=True)
     
     # Related images (gallery)
     images = GenericRelation(Image)
@@ -941,6 +1048,7 @@ class BlogCategory(models.Model):
     description = models.TextField(blank=True)
     order = models.PositiveIntegerField(default=0)
     show_on_home = models.BooleanField(default=False, help_text="Display this category on homepage")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order', 'name']
@@ -984,6 +1092,7 @@ class BlogTag(models.Model):
     name = models.CharField(max_length=50)
     slug = models.SlugField(max_length=60, unique=True, blank=True)
     show_on_home = models.BooleanField(default=False, help_text="Display this tag on homepage")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
@@ -1022,8 +1131,12 @@ class BlogPost(models.Model):
     # Content
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=250, unique=True, blank=True)
-    excerpt = models.TextField(max_length=500, help_text="Short summary for previews")
+    excerpt = models.TextField(max_length=500, blank=True, help_text="Short summary for previews (left blank: the start of the content)")
     content = models.TextField(help_text="Full blog post content (supports Markdown)")
+    # Rendered from `content` on save, once per content version (see api/markup.py)
+    content_html = models.TextField(blank=True, editable=False)
+    content_toc = models.JSONField(default=list, blank=True, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
     
     # Featured image URL (external) and optional file
     featured_image_url = models.URLField(blank=True, help_text="External featured image URL (CDN/S3/Cloudinary)")
@@ -1043,8 +1156,11 @@ class BlogPost(models.Model):
     published_at = models.DateTimeField(blank=True, null=True)
     
     # Engagement
-    reading_time = models.PositiveIntegerField(default=5, help_text="Estimated reading time in minutes")
+    reading_time = models.PositiveIntegerField(default=5, help_text="Estimated reading time in minutes, computed from the content on save")
+    word_count = models.PositiveIntegerField(default=0, editable=False)
     views_count = models.PositiveIntegerField(default=0)
+    # log2 of the views decayed by age, scaled to a fixed epoch (see api/popularity.py)
+    popularity = models.FloatField(default=0, db_index=True, editable=False)
     is_featured = models.BooleanField(default=False)
     show_on_home = models.BooleanField(default=False, help_text="Display this blog post on homepage")
     allow_comments = models.BooleanField(default=True)
@@ -1072,6 +1188,13 @@ class BlogPost(models.Model):
 
     class Meta:
         ordering = ['-published_at', '-created_at']
+        constraints = [
+            # Keyset pagination of published posts orders by published_at (see api/pagination.py)
+            models.CheckConstraint(
+                condition=~models.Q(status='published') | models.Q(published_at__isnull=False),
+                name='published_post_has_published_at',
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         # Ensure profile defaults to singleton profile when not set
@@ -1093,6 +1216,7 @@ class BlogPost(models.Model):
                 counter += 1
         if self.status == 'published' and not self.published_at:
             self.published_at = timezone.now()
+        derived = self.refresh_content()
         # Auto-populate SEO fields if empty
         if not self.meta_title:
             self.meta_title = self.title[:70]
@@ -1106,16 +1230,85 @@ class BlogPost(models.Model):
             self.og_image_url = self.featured_image_url
         if not self.og_image_file and self.featured_image_file:
             self.og_image_file = self.featured_image_file
+        if derived and kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], *derived}
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
 
+    def refresh_content(self):
+        """
+        Render and measure `content` unless that was done for this exact
+        Markdown, and fill a blank excerpt. Returns the names of the fields set.
+        """
+        derived = set()
+        stats = None
+        digest = content_hash(self.content)
+        if digest != self.content_hash:
+            self.content_html, self.content_toc = render_markdown(self.content)
+            stats = measure_markdown(self.content)
+            self.word_count, self.reading_time = stats.word_count, stats.reading_time
+            self.content_hash = digest
+            derived |= {'content_html', 'content_toc', 'content_hash', 'word_count', 'reading_time'}
+        if not self.excerpt.strip():
+            self.excerpt = (stats or measure_markdown(self.content)).excerpt
+            derived.add('excerpt')
+        return derived
+
     def increment_views(self):
         self.views_count += 1
         self.save(update_fields=['views_count'])
 
 
+class BlogPostViewDay(models.Model):
+    """Views of a post on one day (see api/popularity.py)"""
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='view_days')
+    day = models.DateField(db_index=True)
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-day']
+        unique_together = ['post', 'day']
+
+    def __str__(self):
+        return f"{self.post_id} on {self.day}: {self.views}"
+
+
+# ============================================
+# RELATED CONTENT (precomputed, see api/related.py)
+# ============================================
+
+class RelatedPost(models.Model):
+    """One of the top-k most similar published posts of `source`, rank 0 first."""
+    source = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='related_links')
+    target = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='neighbour_of')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['source', 'rank']
+        unique_together = ['source', 'rank']
+
+    def __str__(self):
+        return f"{self.source_id} -> {self.target_id} (#{self.rank}, {self.score:.3f})"
+
+
+class RelatedProject(models.Model):
+    """One of the top-k most similar visible projects of `source`, rank 0 first."""
+    source = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='related_links')
+    target = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='neighbour_of')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['source', 'rank']
+        unique_together = ['source', 'rank']
+
+    def __str__(self):
+        return f"{self.source_id} -> {self.target_id} (#{self.rank}, {self.score:.3f})"
+
+
 # ============================================
 # TESTIMONIALS SECTION (Bonus)
 # ============================================
@@ -1142,6 +1335,7 @@ class Testimonial(models.Model):
     show_on_home = models.BooleanField(default=False, help_text="Display this testimonial on homepage")
     date = models.DateField(default=timezone.now)
     order = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
     
     # Related images (gallery)
     images = GenericRelation(Image)
@@ -1350,6 +1544,17 @@ class SiteConfiguration(models.Model):
         return config
 
 
+class ContentVersion(models.Model):
+    """
+    Singleton row holding the API content version when the default cache is
+    not shared between processes (see api/conditional.py).
+    """
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return str(self.version)
+
+
 # ============================================
 # SIGNALS FOR AUTO-REORDERING ON DELETE
 # ============================================
@@ -1385,3 +1590,8 @@ def reorder_testimonials(sender, instance, **kwargs):
 @receiver(post_delete, sender=Image)
 def reorder_images(sender, instance, **kwargs):
     reorder_model_items(Image, {'content_type': instance.content_type, 'object_id': instance.object_id})
+
+@receiver(post_delete, sender=BlogPost)
+@receiver(post_delete, sender=Project)
+def delete_og_cards(sender, instance, **kwargs):
+    OGCard.objects.filter(content_type=ContentType.objects.get_for_model(sender), object_id=instance.pk).delete()
@@ -0,0 +1,289 @@
+"""
+Generated Open Graph cards for blog posts and projects.
+
+Posts and projects without an OG image of their own used to fall back to the
+featured image (any size or aspect ratio, often over the 300 KB WhatsApp
+limit) or to nothing at all. `ensure_card()` composes a branded 1200×630 JPEG
+with Pillow instead:
+
+    ┌────────────────────────────────────────────┐
+    │  CATEGORY                                  │  featured image, cropped to
+    │                                            │  fill and darkened, or the
+    │  Title of the post, wrapped onto up        │  plain brand background
+    │  to three lines                            │
+    │                                            │
+    │  Author · Site name                        │
+    └────────────────────────────────────────────┘
+
+Cards are stored in media through `OGCard` and rendered once per content
+version: the row remembers the `updated_at` it was rendered from, and a newer
+`updated_at` renders a new card. Saves render it after commit (published posts
+and visible projects only). A crawler hitting a page whose card is missing is
+not kept waiting for Pillow: `queue_card()` renders it on a background thread
+(OG_CARD_ASYNC) and bumps the content version once stored, and the page falls
+back to the featured image meanwhile.
+The serializers' `og_image` and the crawler HTML use `og_image_url()`: the
+uploaded OG image, else the external OG URL, else the card, else the featured
+image. An OG field that only holds the copy of the featured image made by
+`save()` does not count as an OG image of its own (`own_og_image()`).
+
+Crawlers need absolute og:image URLs, while uploads are stored with relative
+`MEDIA_URL` paths. `absolute_url()` prefixes them with BACKEND_URL when set,
+else with the request's scheme and host; prerendered pages have no request
+and rely on BACKEND_URL.
+
+Fonts default to Pillow's bundled sans-serif; point OG_CARD_FONT /
+OG_CARD_FONT_BOLD at .ttf files for the site's own typeface.
+"""
+
+import io
+import logging
+import threading
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.db import close_old_connections
+from PIL import Image as PILImage, ImageDraw, ImageFont, ImageOps, UnidentifiedImageError
+
+from .conditional import bump_content_version
+from .models import BlogPost, OGCard, Profile
+from .placeholders import read_source
+from .uploads import encode_within_budget
+
+CARD_SIZE = (1200, 630)
+PADDING = 80
+BACKGROUND = (21, 21, 21)
+ACCENT = (124, 92, 255)
+TEXT = (255, 255, 255)
+MUTED = (200, 200, 200)
+TITLE_SIZES = range(72, 39, -8)
+MAX_TITLE_LINES = 3
+DEFAULT_BUDGET = 300 * 1024
+
+logger = logging.getLogger('django')
+
+_render_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='og-cards')
+# (content type, pk, updated_at) of the cards waiting in the executor
+_queued = set()
+_queued_lock = threading.Lock()
+
+
+def absolute_url(url, request=None):
+    """`url` with the backend's origin if it is a path (see the module docstring)."""
+    if not url or urlsplit(url).netloc:
+        return url
+    if settings.BACKEND_BASE_URL:
+        return settings.BACKEND_BASE_URL + url
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def _font(size, bold=False):
+    path = (settings.OG_CARD_FONT_BOLD if bold else None) or settings.OG_CARD_FONT
+    if path:
+        return ImageFont.truetype(path, size)
+    return ImageFont.load_default(size)
+
+
+def _wrap(draw, text, font, width):
+    """Greedy word wrap by rendered width."""
+    lines = []
+    for word in text.split():
+        candidate = f'{lines[-1]} {word}' if lines else word
+        if lines and draw.textlength(candidate, font=font) <= width:
+            lines[-1] = candidate
+        else:
+            lines.append(word)
+    return lines
+
+
+def _fit_title(draw, title, width):
+    """Largest font size at which `title` fits MAX_TITLE_LINES, ellipsized if it never does."""
+    for size in TITLE_SIZES:
+        font = _font(size, bold=True)
+        lines = _wrap(draw, title, font, width)
+        if len(lines) <= MAX_TITLE_LINES:
+            return font, lines
+    lines = lines[:MAX_TITLE_LINES]
+    while draw.textlength(lines[-1] + '…', font=font) > width and ' ' in lines[-1]:
+        lines[-1] = lines[-1].rsplit(' ', 1)[0]
+    lines[-1] += '…'
+    return font, lines
+
+
+def _background(source):
+    card = PILImage.new('RGB', CARD_SIZE, BACKGROUND)
+    if not source:
+        return card
+    try:
+        with PILImage.open(io.BytesIO(read_source(source))) as original:
+            image = ImageOps.exif_transpose(original).convert('RGB')
+    except (OSError, ValueError, UnidentifiedImageError, PILImage.DecompressionBombError) as exc:
+        logger.warning(f"[OG-CARD] Cannot read {source}: {exc}")
+        return card
+    image = ImageOps.fit(image, CARD_SIZE, PILImage.Resampling.LANCZOS)
+    # Mostly brand background, darkest at the bottom where the byline sits
+    shade = PILImage.linear_gradient('L').resize(CARD_SIZE).point(lambda v: 170 + v * 70 // 255)
+    return PILImage.composite(card, image, shade)
+
+
+def render_card(title, label='', author='', background=None):
+    """Compose a card and return it as JPEG bytes within the OG byte budget."""
+    card = _background(background)
+    draw = ImageDraw.Draw(card)
+    width = CARD_SIZE[0] - 2 * PADDING
+
+    y = PADDING
+    if label:
+        font = _font(28, bold=True)
+        text = label.upper()
+        left, top, right, bottom = draw.textbbox((PADDING + 20, y + 12), text, font=font)
+        draw.rounded_rectangle((PADDING, y, right + 20, bottom + 12), radius=10, fill=ACCENT)
+        draw.text((PADDING + 20, y + 12), text, font=font, fill=TEXT)
+
+    font, lines = _fit_title(draw, title, width)
+    line_height = round(font.size * 1.2)
+    y = (CARD_SIZE[1] - line_height * len(lines)) // 2
+    for line in lines:
+        draw.text((PADDING, y), line, font=font, fill=TEXT)
+        y += line_height
+
+    if author:
+        draw.text(
+            (PADDING, CARD_SIZE[1] - PADDING - 32), textwrap.shorten(author, 70, placeholder='…'),
+            font=_font(32), fill=MUTED,
+        )
+
+    budget = settings.IMAGE_UPLOAD_BUDGETS.get('og', DEFAULT_BUDGET)
+    return encode_within_budget(card, 'jpeg', budget)
+
+
+def own_og_image(obj, request=None):
+    """
+    Absolute URL of the OG image set on `obj` itself, or None. The models copy
+    the featured image into empty OG fields on save; such a copy is not an OG
+    image of its own and the item still gets a card.
+    """
+    featured = obj.featured_image_file.name if obj.featured_image_file else None
+    if obj.og_image_file and obj.og_image_file.name != featured:
+        return absolute_url(obj.og_image_file.url, request)
+    if obj.og_image_url and obj.og_image_url != obj.featured_image_url:
+        return obj.og_image_url
+    return None
+
+
+def has_own_og_image(obj):
+    return own_og_image(obj) is not None
+
+
+def card_content(obj):
+    """Title, label, author line and background image source of a post or project."""
+    profile = Profile.objects.filter(pk=1).first()
+    site_name = profile.full_name if profile else 'Portfolio'
+    background = obj.featured_image_file.name if obj.featured_image_file else obj.featured_image_url
+    if isinstance(obj, BlogPost):
+        author = obj.profile.full_name if obj.profile else site_name
+        label = obj.category.name if obj.category else 'Blog'
+        byline = author if author == site_name else f'{author} · {site_name}'
+    else:
+        label = 'Project'
+        byline = site_name
+    return {'title': obj.title, 'label': label, 'author': byline, 'background': background}
+
+
+def current_card(obj):
+    """The stored card of `obj` if it was rendered from its current version."""
+    return OGCard.objects.filter(
+        content_type=ContentType.objects.get_for_model(obj),
+        object_id=obj.pk,
+        version=obj.updated_at,
+    ).first()
+
+
+def ensure_card(obj):
+    """Render and store the card of `obj` unless it is up to date. Returns the OGCard or None."""
+    if not settings.OG_CARDS or has_own_og_image(obj):
+        return None
+    card = current_card(obj)
+    if card:
+        return card
+    with _render_lock:
+        card = current_card(obj)
+        if card:
+            return card
+        data = render_card(**card_content(obj))
+        content_type = ContentType.objects.get_for_model(obj)
+        card = (
+            OGCard.objects.filter(content_type=content_type, object_id=obj.pk).first()
+            or OGCard(content_type=content_type, object_id=obj.pk)
+        )
+        if card.file:
+            card.file.delete(save=False)
+        card.file.save(f'{content_type.model}-{obj.pk}.jpg', ContentFile(data), save=False)
+        card.version = obj.updated_at
+        card.size = len(data)
+        card.save()
+    return card
+
+
+def _render_queued(obj, key):
+    try:
+        if ensure_card(obj):
+            # Pages and responses cached without the card pick it up
+            bump_content_version()
+    except Exception:
+        logger.exception(f"[OG-CARD] Rendering the card of {type(obj).__name__} #{obj.pk} failed")
+    finally:
+        with _queued_lock:
+            _queued.discard(key)
+
+
+def _run(obj, key):
+    try:
+        _render_queued(obj, key)
+    finally:
+        close_old_connections()
+
+
+def queue_card(obj):
+    """Render the missing card of `obj` in the background (inline without OG_CARD_ASYNC)."""
+    key = (type(obj), obj.pk, obj.updated_at)
+    with _queued_lock:
+        if key in _queued:
+            return
+        _queued.add(key)
+    if settings.OG_CARD_ASYNC:
+        _executor.submit(_run, obj, key)
+    else:
+        _render_queued(obj, key)
+
+
+def card_url(obj, request=None, queue=False):
+    """
+    Absolute URL of the current card of `obj`, or None. A missing card is
+    queued for rendering when `queue` is set.
+    """
+    if not settings.OG_CARDS or has_own_og_image(obj):
+        return None
+    card = current_card(obj)
+    if card is None:
+        if queue:
+            queue_card(obj)
+        return None
+    return absolute_url(card.file.url, request)
+
+
+def og_image_url(obj, request=None, queue=False):
+    """Best OG image of a post or project: own OG image, card, featured image."""
+    url = own_og_image(obj, request) or card_url(obj, request, queue=queue)
+    if url:
+        return url
+    if obj.featured_image_file:
+        return absolute_url(obj.featured_image_file.url, request)
+    return obj.featured_image_url or None
@@ -7,17 +7,52 @@ react-helmet-async, crawlers only ever see the bare index.html with no og:image,
 no og:title, etc. — and fall back to scraping any visible <img> tags or the
 default description.
 
-This Django middleware detects social crawler User-Agents and, for known SPA
-routes (/blog/<slug>, /projects/<slug>), fetches the real data from the database
-and returns a minimal but complete HTML response with correct OG meta tags baked
-in — without touching regular browser traffic at all.
+This Django middleware detects social crawler User-Agents and, for the SPA
+detail routes in `ROUTES` (/blog/<slug>, /projects/<slug>, /certificates/<slug>,
+/achievements/<slug>, /skills/<slug>, /education/<slug>, /testimonials/<slug>,
+/experience/<id>), fetches the real data from the database and returns a
+minimal but complete HTML response with correct OG meta tags baked in —
+without touching regular browser traffic at all.
+
+The path is checked first: anything outside the route prefixes (/api/,
+/admin/, static and media files, ...) is passed on after one startswith(),
+and the crawler regex only runs for detail routes, memoized per distinct
+User-Agent string. New detail pages are one `OGRoute` entry: a path prefix,
+the full pattern, the model and its public filter, and a function returning
+the page fields of one object.
+
+Rendered pages are cached (keyed by content version, base URL, media origin
+and path), so repeated crawler hits for a freshly shared link are served
+without queries and answered with 304 when the crawler revalidates. A missing
+OG card is queued rather than rendered while the crawler waits (see
+api/og_cards.py); the page uses the featured image until it is stored.
 """
 
+import functools
+import hashlib
+import os
 import re
+from typing import Callable, NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
 from django.http import HttpResponse
 from django.utils.html import escape
+from django.utils.http import quote_etag
+from django.utils.text import Truncator
+from whitenoise.base import WhiteNoise
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from api.conditional import conditional_response, get_content_version
+from api.models import (
+    Achievement, BlogPost, Certificate, Education, Profile, Project, Skill, Testimonial,
+    WorkExperience,
+)
+from api.og_cards import absolute_url, og_image_url
 
-from api.models import BlogPost, Project, Profile
+OG_HTML_CACHE_PREFIX = 'og_html'
+OG_HTML_CACHE_TIMEOUT = 60 * 60 * 24
+DESCRIPTION_LENGTH = 200
 
 
 # ──────────────────────────────────────────────
@@ -34,14 +69,17 @@ CRAWLER_UA_PATTERNS = re.compile(
     re.IGNORECASE,
 )
 
-# ──────────────────────────────────────────────
-# Route → data resolver map
-# ──────────────────────────────────────────────
 
-BLOG_ROUTE   = re.compile(r'^/blog/(?P<slug>[a-z0-9\-]+)/?$')
-PROJECT_ROUTE = re.compile(r'^/projects?/(?P<slug>[a-z0-9\-]+)/?$')
+@functools.lru_cache(maxsize=512)
+def _is_crawler(ua):
+    """Whether `ua` is a link-preview crawler; traffic comes from few distinct UAs."""
+    return CRAWLER_UA_PATTERNS.search(ua) is not None
 
 
+# ──────────────────────────────────────────────
+# Helpers
+# ──────────────────────────────────────────────
+
 def _get_profile():
     try:
         return Profile.objects.filter(pk=1).first()
@@ -62,32 +100,172 @@ def _optimize_cloudinary_url(url):
             return url.replace('/image/upload/', '/image/upload/c_scale,w_800,q_auto/')
     return url
 
-def _og_image_for_blog(post):
-    """Return the best available OG image URL for a blog post."""
-    url = None
-    if post.og_image_file:
-        url = post.og_image_file.url
-    elif getattr(post, 'og_image_url', None):
-        url = post.og_image_url
-    elif post.featured_image_file:
-        url = post.featured_image_file.url
-    elif getattr(post, 'featured_image_url', None):
-        url = post.featured_image_url
-    return _optimize_cloudinary_url(url)
-
-
-def _og_image_for_project(project):
-    """Return the best available OG image URL for a project."""
-    url = None
-    if project.og_image_file:
-        url = project.og_image_file.url
-    elif getattr(project, 'og_image_url', None):
-        url = project.og_image_url
-    elif project.featured_image_file:
-        url = project.featured_image_file.url
-    elif getattr(project, 'featured_image_url', None):
-        url = project.featured_image_url
-    return _optimize_cloudinary_url(url)
+
+def _image(obj, *fields):
+    """First set image among `fields`: (file_field, url_field) name pairs, in order."""
+    for file_field, url_field in fields:
+        image_file = getattr(obj, file_field)
+        if image_file:
+            return _optimize_cloudinary_url(image_file.url)
+        if getattr(obj, url_field):
+            return _optimize_cloudinary_url(getattr(obj, url_field))
+    return None
+
+
+def _summary(text):
+    return Truncator(' '.join((text or '').split())).chars(DESCRIPTION_LENGTH)
+
+
+# ──────────────────────────────────────────────
+# Route table: path → page fields
+# ──────────────────────────────────────────────
+#
+# Each route names the model behind a detail page, the field its path is keyed
+# by (also the pattern's group name), the filter that makes an object public
+# and a page function returning the keyword arguments of _render_og_html for
+# one object. The prerender step (api/prerender.py) walks the same table.
+
+class OGRoute(NamedTuple):
+    prefix: str
+    pattern: re.Pattern
+    model: type
+    key: str
+    path: str
+    page: Callable
+    visible: dict = {}
+
+    def lookup(self, value):
+        """The public object at `value`, or None."""
+        return self.model.objects.filter(**{self.key: value}, **self.visible).first()
+
+    def path_of(self, obj):
+        """Canonical path of `obj`, e.g. /projects/<slug> for /project/<slug> too."""
+        return self.path.format(getattr(obj, self.key))
+
+    def public(self):
+        return self.model.objects.filter(**self.visible)
+
+
+def _blog_page(post, base_url, site_name):
+    author = post.profile.full_name if post.profile else site_name
+    return {
+        'title': f"{post.meta_title or post.title} | {site_name}",
+        'description': post.meta_description or post.excerpt,
+        'og_image': _optimize_cloudinary_url(og_image_url(post, queue=True)),
+        'og_type': 'article',
+        'url': post.canonical_url or f"{base_url}/blog/{post.slug}",
+        'published_time': post.published_at,
+        'modified_time': post.updated_at,
+        'author': author,
+    }
+
+
+def _project_page(project, base_url, site_name):
+    return {
+        'title': f"{project.meta_title or project.title} | Projects | {site_name}",
+        'description': project.meta_description or project.short_description,
+        'og_image': _optimize_cloudinary_url(og_image_url(project, queue=True)),
+        'url': project.canonical_url or f"{base_url}/projects/{project.slug}",
+        'author': site_name,
+    }
+
+
+def _certificate_page(certificate, base_url, site_name):
+    return {
+        'title': f"{certificate.title} | Certificates | {site_name}",
+        'description': _summary(certificate.description) or f"Issued by {certificate.issuing_organization}",
+        'og_image': _image(
+            certificate,
+            ('certificate_image_file', 'certificate_image_url'),
+            ('organization_logo_file', 'organization_logo_url'),
+        ),
+        'url': f"{base_url}/certificates/{certificate.slug}",
+    }
+
+
+def _achievement_page(achievement, base_url, site_name):
+    return {
+        'title': f"{achievement.title} | Achievements | {site_name}",
+        'description': _summary(achievement.description) or achievement.issuer,
+        'og_image': _image(achievement, ('image_file', 'image_url')),
+        'url': f"{base_url}/achievements/{achievement.slug}",
+    }
+
+
+def _skill_page(skill, base_url, site_name):
+    return {
+        'title': f"{skill.name} | Skills | {site_name}",
+        'description': f"{skill.get_proficiency_display()} · {skill.get_skill_type_display()}",
+        'og_image': None,
+        'url': f"{base_url}/skills/{skill.slug}",
+        'twitter_card': 'summary',
+    }
+
+
+def _education_page(education, base_url, site_name):
+    return {
+        'title': f"{education.degree} – {education.institution} | Education | {site_name}",
+        'description': _summary(education.description) or education.field_of_study,
+        'og_image': _image(education, ('logo_file', 'logo_url')),
+        'url': f"{base_url}/education/{education.slug}",
+        'twitter_card': 'summary',
+    }
+
+
+def _testimonial_page(testimonial, base_url, site_name):
+    return {
+        'title': f"Testimonial by {testimonial.author_name} | {site_name}",
+        'description': _summary(testimonial.content),
+        'og_image': _image(testimonial, ('author_image_file', 'author_image_url')),
+        'url': f"{base_url}/testimonials/{testimonial.slug}",
+        'twitter_card': 'summary',
+    }
+
+
+def _experience_page(experience, base_url, site_name):
+    return {
+        'title': f"{experience.job_title} at {experience.company_name} | Experience | {site_name}",
+        'description': _summary(experience.description),
+        'og_image': _image(experience, ('company_logo_file', 'company_logo_url')),
+        'url': f"{base_url}/experience/{experience.pk}",
+        'twitter_card': 'summary',
+    }
+
+
+SLUG = r'(?P<slug>[a-z0-9\-]+)/?$'
+
+ROUTES = [
+    OGRoute('/blog/', re.compile(r'^/blog/' + SLUG), BlogPost, 'slug', '/blog/{}', _blog_page,
+            {'status': 'published'}),
+    OGRoute('/project', re.compile(r'^/projects?/' + SLUG), Project, 'slug', '/projects/{}', _project_page,
+            {'is_visible': True}),
+    OGRoute('/certificates/', re.compile(r'^/certificates/' + SLUG), Certificate, 'slug', '/certificates/{}',
+            _certificate_page),
+    OGRoute('/achievements/', re.compile(r'^/achievements/' + SLUG), Achievement, 'slug', '/achievements/{}',
+            _achievement_page),
+    OGRoute('/skills/', re.compile(r'^/skills/' + SLUG), Skill, 'slug', '/skills/{}', _skill_page),
+    OGRoute('/education/', re.compile(r'^/education/' + SLUG), Education, 'slug', '/education/{}',
+            _education_page),
+    OGRoute('/testimonials/', re.compile(r'^/testimonials/' + SLUG), Testimonial, 'slug', '/testimonials/{}',
+            _testimonial_page, {'is_visible': True}),
+    OGRoute('/experience/', re.compile(r'^/experience/(?P<pk>[0-9]+)/?$'), WorkExperience, 'pk', '/experience/{}',
+            _experience_page),
+]
+
+
+def match_route(path):
+    """Return (route, match) for the first route matching `path`, or None."""
+    for route in ROUTES:
+        if path.startswith(route.prefix):
+            match = route.pattern.match(path)
+            if match:
+                return route, match
+    return None
+
+
+def route_for(model):
+    """The route of the detail pages of `model`, or None."""
+    return next((route for route in ROUTES if route.model is model), None)
 
 
 # ──────────────────────────────────────────────
@@ -161,107 +339,114 @@ def _render_og_html(*, title, description, og_image, og_type, url, site_name,
 class OGMetaMiddleware:
     """
     Detects social media crawlers and serves a pre-rendered OG meta page
-    for blog and project detail routes. All other requests pass through normally.
+    for the detail routes in `ROUTES`. All other requests pass through normally.
+
+    Rendered pages are cached per (base URL, media origin, path) under the API
+    content version, which every content save/delete bumps (see
+    api/conditional.py), so the burst of requests that follows a share costs
+    no queries. Unknown slugs are cached too. Responses carry ETag /
+    Last-Modified.
     """
 
     def __init__(self, get_response):
         self.get_response = get_response
+        # Read once: requests outside every route prefix cost a single startswith()
+        self.prefixes = tuple(route.prefix for route in ROUTES)
+        self.pages = None
+        if settings.OG_PRERENDER:
+            # Prerendered pages (api/prerender.py). Not indexed up front: they are
+            # rewritten while the process runs, so every lookup stats the file.
+            self.pages = WhiteNoise(application=None, max_age=0)
+            root = os.path.abspath(settings.OG_PRERENDER_DIR)
+            self.pages.directories.append((root.rstrip(os.sep) + os.sep, settings.OG_PRERENDER_URL))
+            self.prefixes += (settings.OG_PRERENDER_URL,)
 
     def __call__(self, request):
-        ua = request.META.get('HTTP_USER_AGENT', '')
         path = request.path
 
         # Only intercept crawler requests for known SPA content routes
-        if CRAWLER_UA_PATTERNS.search(ua):
-            response = self._try_serve_og(request, path)
-            if response:
-                return response
+        if path.startswith(self.prefixes):
+            if self.pages and path.startswith(settings.OG_PRERENDER_URL):
+                # Fetched directly, e.g. by an edge rule for crawler User-Agents
+                return self._serve_prerendered(request, path) or self.get_response(request)
+            found = match_route(path)
+            if found and _is_crawler(request.META.get('HTTP_USER_AGENT', '')):
+                route, match = found
+                page_url = f"{settings.OG_PRERENDER_URL}{route.path.format(match[route.key]).strip('/')}.html"
+                response = (
+                    (self.pages and self._serve_prerendered(request, page_url))
+                    or self._try_serve_og(request, path, route, match)
+                )
+                if response:
+                    return response
 
         return self.get_response(request)
 
-    def _try_serve_og(self, request, path):
+    def _serve_prerendered(self, request, url):
+        """Serve the prerendered page at `url` if it exists; no database access."""
+        page = self.pages.find_file(url)
+        if page is None:
+            return None
+        try:
+            return WhiteNoiseMiddleware.serve(page, request)
+        except FileNotFoundError:
+            # Removed since find_file() looked (unpublished)
+            return None
+
+    def _try_serve_og(self, request, path, route, match):
         """
-        Try to resolve the path to content, build an OG HTML page and return it.
-        Returns None if the path isn't a recognised content route.
+        Serve the cached OG page for `path`, rendering it on a miss.
+        Returns None if the path does not resolve to visible content.
         """
-        import os
-        from django.conf import settings
-        
-        profile = _get_profile()
-        site_name = profile.full_name if profile else 'Portfolio'
-        
-        # 1. Prioritize explicit FRONTEND_URL from environment variables
-        frontend_url = os.environ.get('FRONTEND_URL')
-        
-        if frontend_url:
-            base_url = frontend_url.rstrip('/')
-        else:
-            # 2. Fall back to X-Forwarded-Host if proxying through Vercel/Nginx
-            forwarded_host = request.META.get('HTTP_X_FORWARDED_HOST')
-            if forwarded_host:
-                proto = request.META.get('HTTP_X_FORWARDED_PROTO', 'https')
-                base_url = f"{proto}://{forwarded_host}"
-            else:
-                # 3. Absolute fallback to the request URI
-                base_url = request.build_absolute_uri('/').rstrip('/')
-
-        # ── Blog detail: /blog/<slug>
-        m = BLOG_ROUTE.match(path)
-        if m:
-            slug = m.group('slug')
-            try:
-                post = BlogPost.objects.select_related('profile').get(
-                    slug=slug, status='published'
-                )
-            except BlogPost.DoesNotExist:
-                return None
-
-            author = post.profile.full_name if post.profile else site_name
-            title = f"{post.meta_title or post.title} | {site_name}"
-            description = post.meta_description or post.excerpt
-            og_image = _og_image_for_blog(post)
-            canonical = post.canonical_url or f"{base_url}/blog/{post.slug}"
-
-            return HttpResponse(
-                _render_og_html(
-                    title=title,
-                    description=description,
-                    og_image=og_image,
-                    og_type='article',
-                    url=canonical,
-                    site_name=site_name,
-                    published_time=post.published_at,
-                    modified_time=post.updated_at,
-                    author=author,
-                ),
-                content_type='text/html; charset=utf-8',
-            )
-
-        # ── Project detail: /projects/<slug>
-        m = PROJECT_ROUTE.match(path)
-        if m:
-            slug = m.group('slug')
-            try:
-                project = Project.objects.get(slug=slug, is_visible=True)
-            except Project.DoesNotExist:
-                return None
-
-            title = f"{project.meta_title or project.title} | Projects | {site_name}"
-            description = project.meta_description or project.short_description
-            og_image = _og_image_for_project(project)
-            canonical = project.canonical_url or f"{base_url}/projects/{project.slug}"
-
-            return HttpResponse(
-                _render_og_html(
-                    title=title,
-                    description=description,
-                    og_image=og_image,
-                    og_type='website',
-                    url=canonical,
-                    site_name=site_name,
-                    author=site_name,
-                ),
-                content_type='text/html; charset=utf-8',
-            )
+        base_url = resolve_base_url(request)
+        key_source = f'{base_url}|{absolute_url("/", request)}|{path}'.encode()
+        key = f'{OG_HTML_CACHE_PREFIX}:{get_content_version()}:{hashlib.blake2b(key_source, digest_size=16).hexdigest()}'
 
-        return None
+        page = cache.get(key)
+        if page is None:
+            obj = route.lookup(match[route.key])
+            page = render_og_page(route, obj, base_url, _get_profile(), request) if obj else {'html': None}
+            cache.set(key, page, OG_HTML_CACHE_TIMEOUT)
+        if page['html'] is None:
+            return None
+
+        return conditional_response(
+            request, page['etag'], page['last_modified'],
+            lambda: HttpResponse(page['html'], content_type='text/html; charset=utf-8'),
+        )
+
+
+def resolve_base_url(request):
+    # 1. Prioritize explicit FRONTEND_URL from environment variables
+    frontend_url = os.environ.get('FRONTEND_URL')
+    if frontend_url:
+        return frontend_url.rstrip('/')
+
+    # 2. Fall back to X-Forwarded-Host if proxying through Vercel/Nginx
+    forwarded_host = request.META.get('HTTP_X_FORWARDED_HOST')
+    if forwarded_host:
+        proto = request.META.get('HTTP_X_FORWARDED_PROTO', 'https')
+        return f"{proto}://{forwarded_host}"
+
+    # 3. Absolute fallback to the request URI
+    return request.build_absolute_uri('/').rstrip('/')
+
+
+def render_og_page(route, obj, base_url, profile, request=None):
+    """
+    Render the OG page of `obj`, a public object of `route`. Media paths in
+    og:image are made absolute with `request` (see `absolute_url()`).
+    Returns {'html', 'etag', 'last_modified'}.
+    """
+    site_name = profile.full_name if profile else 'Portfolio'
+    fields = {'og_type': 'website', **route.page(obj, base_url, site_name)}
+    fields['og_image'] = absolute_url(fields['og_image'], request)
+    html = _render_og_html(site_name=site_name, **fields)
+    return _page(html, obj.updated_at, profile)
+
+
+def _page(html, updated_at, profile):
+    # The site name comes from the profile, so its edits count as modifications too
+    last_modified = max(filter(None, [updated_at, getattr(profile, 'updated_at', None)]), default=None)
+    etag = quote_etag(hashlib.blake2b(html.encode(), digest_size=16).hexdigest())
+    return {'html': html, 'etag': etag, 'last_modified': last_modified}
@@ -0,0 +1,163 @@
+"""
+Keyset (cursor) pagination.
+
+`LimitOffsetPagination` (the project default) costs an `OFFSET n` scan plus a
+separate `COUNT(*)` per request, so deep pages of large tables get slower the
+further a client scrolls. `KeysetPagination` keeps limit/offset behaviour for
+existing clients and switches to keyset paging when the request carries a
+`cursor` parameter (empty for the first page):
+
+    GET /api/blog/?cursor=            -> first page + opaque `next` cursor
+    GET /api/blog/?cursor=<opaque>    -> WHERE (published_at, id) < (...) LIMIT n
+    GET /api/blog/?cursor=&count=true -> also include the (expensive) total count
+
+The view declares its natural ordering with `keyset_ordering`; it must end in a
+unique column (normally the primary key) and use fields that are never NULL
+in the paginated queryset, so every row has a well-defined position (a NULL
+fails every `<`/`>` comparison and would be skipped). Nullable columns need a
+database constraint for the rows the view lists, as BlogPost has for the
+`published_at` of published posts. In cursor mode that ordering replaces any
+`?ordering=` requested by the client.
+"""
+
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(LimitOffsetPagination):
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_mode = self.cursor_query_param in request.query_params
+        if not self.keyset_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.ordering = self._get_ordering(view, queryset)
+        self.fields = [queryset.model._meta.get_field(name.lstrip('-')) for name in self.ordering]
+        values, reverse = self._decode_cursor(request.query_params.get(self.cursor_query_param))
+        has_cursor = values is not None
+
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes'):
+            self.count = queryset.count()
+
+        ordering = self._reversed(self.ordering) if reverse else self.ordering
+        if has_cursor:
+            queryset = queryset.filter(self._keyset_filter(ordering, values))
+        rows = list(queryset.order_by(*ordering)[:self.limit + 1])
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if reverse:
+            rows.reverse()
+
+        # Forward pages always have a way back once a cursor was used; reverse
+        # pages know whether more rows exist before them from the extra row.
+        self.next_values = self._row_values(rows[-1]) if rows and (has_more or reverse) else None
+        self.previous_values = None
+        if rows and ((has_cursor and not reverse) or (reverse and has_more)):
+            self.previous_values = self._row_values(rows[0])
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+        payload = {}
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['next'] = self._link(self.next_values, reverse=False)
+        payload['previous'] = self._link(self.previous_values, reverse=True)
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema['properties']['count']['description'] = (
+            f'Total rows. In cursor mode only present with `{self.count_query_param}=true`.'
+        )
+        return schema
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters += [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque keyset cursor. Pass an empty value to start cursor pagination.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Include the total count in cursor mode (costs a COUNT query).',
+                'schema': {'type': 'boolean'},
+            },
+        ]
+        return parameters
+
+    # ---- helpers ---------------------------------------------------------
+
+    @staticmethod
+    def _get_ordering(view, queryset):
+        ordering = getattr(view, 'keyset_ordering', None)
+        if ordering:
+            return list(ordering)
+        # Fall back to the model's default ordering with the primary key as tie-breaker
+        return list(queryset.model._meta.ordering or []) + [f'-{queryset.model._meta.pk.name}']
+
+    @staticmethod
+    def _reversed(ordering):
+        return [name[1:] if name.startswith('-') else f'-{name}' for name in ordering]
+
+    @staticmethod
+    def _keyset_filter(ordering, values):
+        """(a, b, c) after (x, y, z) == a>x OR (a=x AND b>y) OR (a=x AND b=y AND c>z)."""
+        condition = Q()
+        for i, name in enumerate(ordering):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            clause = Q(**{f'{field}__{lookup}': values[i]})
+            for prev_name, prev_value in zip(ordering[:i], values[:i]):
+                clause &= Q(**{prev_name.lstrip('-'): prev_value})
+            condition |= clause
+        return condition
+
+    def _row_values(self, row):
+        return [getattr(row, field.attname) for field in self.fields]
+
+    def _encode_cursor(self, values, reverse):
+        payload = {'v': [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]}
+        if reverse:
+            payload['r'] = 1
+        raw = json.dumps(payload, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def _decode_cursor(self, encoded):
+        if not encoded:
+            return None, False
+        try:
+            raw = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4))
+            payload = json.loads(raw)
+            values = [field.to_python(value) for field, value in zip(self.fields, payload['v'], strict=True)]
+            return values, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _link(self, values, reverse):
+        if values is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, self._encode_cursor(values, reverse))
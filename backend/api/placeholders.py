@@ -0,0 +1,216 @@
+"""
+Placeholders and layout data for images.
+
+Galleries cannot lay out masonry rows or show anything until each image has
+downloaded. For every `Image` and every ImageField upload (and the matching
+`*_url` for external images) this module computes:
+
+    * width / height (also written to `Image.width` / `Image.height`)
+    * the dominant colour, as a hex string
+    * a tiny blurred preview (LQIP): a WebP of at most PLACEHOLDER_SIZE px,
+      base64-encoded as a data URI of a few hundred bytes
+
+Results are stored in `ImageMetadata`, keyed by the stored file name or the
+external URL, and returned by the serializers next to each image URL:
+
+    "featured_image_placeholder": {
+        "width": 1600, "height": 900, "aspect_ratio": 1.7778,
+        "color": "#c80a0a", "lqip": "data:image/webp;base64,..."
+    }
+
+Computing them means decoding (and for external images downloading) the full
+image, so saves only schedule the work: `schedule()` runs it after commit on a
+single background thread. External URLs are probed first (see api/probe.py),
+so their dimensions are published after a few kilobytes even when the full
+download is slow, fails or exceeds MAX_FETCH_BYTES. Set IMAGE_METADATA_ASYNC=False
+where background threads do not outlive the request (serverless);
+`manage.py compute_image_metadata` backfills everything that is missing.
+"""
+
+import base64
+import io
+import logging
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image as PILImage, ImageFilter, ImageOps, UnidentifiedImageError
+
+from .conditional import versioned_get_or_set
+from .models import Image, ImageMetadata
+from .probe import probe_many, store_results
+from .variants import encode_image, image_fields
+
+METADATA_CACHE_KEY = 'image_metadata_placeholders'
+REQUEST_ATTR = '_image_placeholders'
+
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+FETCH_TIMEOUT = 10
+MAX_FETCH_BYTES = 20 * 1024 * 1024
+
+logger = logging.getLogger('django')
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='image-metadata')
+
+
+def image_sources(instance):
+    """Stored names / external URLs of every image on `instance`."""
+    sources = set()
+    for field in image_fields(type(instance)):
+        file = getattr(instance, field.name)
+        url_field = f'{field.name[:-len("_file")]}_url' if field.name.endswith('_file') else None
+        if file:
+            sources.add(file.name)
+        elif url_field and getattr(instance, url_field, None):
+            sources.add(getattr(instance, url_field))
+    return sources
+
+
+def _is_url(source):
+    return source.startswith(('http://', 'https://'))
+
+
+def read_source(source):
+    if _is_url(source):
+        request = urllib.request.Request(source, headers={'User-Agent': 'portfolio-image-metadata'})
+        with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+            data = response.read(MAX_FETCH_BYTES + 1)
+        if len(data) > MAX_FETCH_BYTES:
+            raise OSError('image too large')
+        return data
+    with default_storage.open(source, 'rb') as fh:
+        return fh.read()
+
+
+def dominant_color(image):
+    """Most common colour of a small median-cut palette, as '#rrggbb'."""
+    small = image.convert('RGB')
+    small.thumbnail((64, 64))
+    palette_image = small.quantize(colors=5, method=PILImage.Quantize.MEDIANCUT)
+    count, index = max(palette_image.getcolors())
+    r, g, b = palette_image.getpalette()[index * 3:index * 3 + 3]
+    return f'#{r:02x}{g:02x}{b:02x}'
+
+
+def lqip(image):
+    """Tiny blurred WebP preview as a data URI."""
+    small = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    small.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    small = small.filter(ImageFilter.GaussianBlur(0.6))
+    data = encode_image(small, 'webp', PLACEHOLDER_QUALITY)
+    return 'data:image/webp;base64,' + base64.b64encode(data).decode()
+
+
+def compute_metadata(source):
+    """Analyse one image and store its `ImageMetadata`. Returns it, or None."""
+    probed_size = ImageMetadata.objects.filter(source=source).values_list('file_size', flat=True).first()
+    if probed_size and probed_size > MAX_FETCH_BYTES:
+        logger.warning(f"[IMAGE-METADATA] Skipping {source}: {probed_size} bytes")
+        return None
+    try:
+        data = read_source(source)
+        with PILImage.open(io.BytesIO(data)) as original:
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    except (OSError, ValueError, UnidentifiedImageError, PILImage.DecompressionBombError) as exc:
+        logger.warning(f"[IMAGE-METADATA] Cannot read {source}: {exc}")
+        return None
+
+    metadata, _ = ImageMetadata.objects.update_or_create(source=source, defaults={
+        'width': image.width,
+        'height': image.height,
+        'file_size': len(data),
+        'dominant_color': dominant_color(image),
+        'placeholder': lqip(image),
+    })
+    # Gallery rows keep their own dimension columns
+    if _is_url(source):
+        Image.objects.filter(image_url=source).update(width=image.width, height=image.height, file_size=len(data))
+    else:
+        Image.objects.filter(image_file=source).update(width=image.width, height=image.height)
+    return metadata
+
+
+def missing_sources(sources):
+    """The sources without a placeholder yet (probed-only rows count as missing)."""
+    existing = set(
+        ImageMetadata.objects.filter(source__in=sources).exclude(placeholder='').values_list('source', flat=True)
+    )
+    return set(sources) - existing
+
+
+def compute_missing(sources, on_done=None):
+    """Compute metadata for the sources that have none; call `on_done()` if any were stored."""
+    def published():
+        cache.delete(METADATA_CACHE_KEY)
+        if on_done:
+            on_done()
+
+    missing = missing_sources(sources)
+    if store_results(probe_many([s for s in missing if _is_url(s)])):
+        published()
+    stored = [s for s in sorted(missing) if compute_metadata(s)]
+    if stored:
+        published()
+    return stored
+
+
+def _run(sources, on_done):
+    try:
+        compute_missing(sources, on_done)
+    except Exception:
+        logger.exception('[IMAGE-METADATA] Background computation failed')
+    finally:
+        close_old_connections()
+
+
+def schedule(instance, on_done=None):
+    """Compute metadata for `instance`'s images after the current transaction commits."""
+    sources = image_sources(instance)
+    if not sources:
+        return
+
+    def submit():
+        if settings.IMAGE_METADATA_ASYNC:
+            _executor.submit(_run, sources, on_done)
+        else:
+            compute_missing(sources, on_done)
+
+    transaction.on_commit(submit)
+
+
+def _build_placeholders():
+    return {
+        source: {
+            'width': width,
+            'height': height,
+            'aspect_ratio': round(width / height, 4) if height else None,
+            'color': color or None,
+            'lqip': placeholder or None,
+        }
+        for source, width, height, color, placeholder in ImageMetadata.objects.values_list(
+            'source', 'width', 'height', 'dominant_color', 'placeholder',
+        )
+    }
+
+
+def get_placeholders(request=None):
+    """Return {source: placeholder dict}, memoized on `request`."""
+    placeholders = getattr(request, REQUEST_ATTR, None)
+    if placeholders is None:
+        placeholders = versioned_get_or_set(METADATA_CACHE_KEY, _build_placeholders)
+        if request is not None:
+            setattr(request, REQUEST_ATTR, placeholders)
+    return placeholders
+
+
+def placeholder_for(file, url=None, request=None):
+    """Placeholder dict for an image FieldFile (or its external URL), or None."""
+    source = file.name if file else url
+    if not source:
+        return None
+    return get_placeholders(request).get(source)
@@ -0,0 +1,121 @@
+"""
+Time-decayed popular blog posts.
+
+`views_count` is an all-time total: ordering by it keeps old posts on top
+forever and sorts the whole table per request. Every view is also recorded
+in two constant-time writes:
+
+    BlogPostViewDay      one counter row per post and day
+    BlogPost.popularity  log2(1 + S), S the sum of 2^((t - EPOCH) / half-life)
+                         over its views
+
+A post's decayed score at `now` is `S * 2^(-(now - EPOCH) / half-life)`. That
+factor is the same for every post, so ordering by the stored (indexed) column
+is ordering by the decayed score, and nothing ever rewrites the table to
+decay it. S itself would overflow a float after 1024 half-lives (19 years at
+7 days, under 3 at one day), so the column keeps its logarithm: a view at `t`
+adds its exponent through log2(2^p + 2^w) = max(p, w) + log2(1 + 2^-|p - w|),
+which grows linearly with time and never overflows. A post without views
+scores 0.
+
+    GET /api/blog/popular/?window=7d
+
+    1d, 7d, 30d, 90d   views of the last N days from the day buckets, a day's
+                       weight halving every N/2 days; one GROUP BY over at
+                       most N rows per post
+    all                the decayed all-time score (POPULAR_HALF_LIFE_DAYS)
+
+The top POPULAR_POSTS_SIZE of a window is computed by one query and cached for
+POPULAR_POSTS_TTL seconds, so requests only fetch those few posts by primary
+key. `manage.py rebuild_popularity` recomputes the column from the buckets
+(after changing POPULAR_HALF_LIFE_DAYS) and can prune old buckets.
+"""
+
+import math
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, FloatField, Sum, Value, When
+from django.db.models.functions import Abs, Greatest, Log, Power
+from django.utils import timezone
+
+from .models import BlogPost, BlogPostViewDay
+
+EPOCH = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+WINDOWS = {'1d': 1, '7d': 7, '30d': 30, '90d': 90, 'all': None}
+DEFAULT_WINDOW = '7d'
+CACHE_PREFIX = 'popular_posts'
+
+
+def view_exponent(when):
+    """log2 of the weight of a view at `when` in `BlogPost.popularity`."""
+    return (when - EPOCH) / timedelta(days=settings.POPULAR_HALF_LIFE_DAYS)
+
+
+def add_exponent(score, exponent):
+    """`score` (an expression) after adding a view of weight 2^`exponent`."""
+    exponent = Value(exponent, output_field=FloatField())
+    return Greatest(score, exponent) + Log(
+        Value(2.0), Value(1.0) + Power(Value(2.0), -Abs(score - exponent)), output_field=FloatField(),
+    )
+
+
+def log_score(weighted):
+    """The popularity of views given as (count, exponent) pairs."""
+    top, total = 0.0, 1.0  # the empty score: log2(1)
+    for count, exponent in weighted:
+        if exponent > top:
+            total, top = total * 2 ** (top - exponent), exponent
+        total += count * 2 ** (exponent - top)
+    return top + math.log2(total)
+
+
+def record_view(post_id, when=None):
+    when = when or timezone.now()
+    day = timezone.localdate(when)
+    bucket = BlogPostViewDay.objects.filter(post_id=post_id, day=day)
+    if not bucket.update(views=F('views') + 1):
+        try:
+            with transaction.atomic():
+                BlogPostViewDay.objects.create(post_id=post_id, day=day, views=1)
+        except IntegrityError:
+            # Created by a concurrent view of the same post
+            bucket.update(views=F('views') + 1)
+    BlogPost.objects.filter(pk=post_id).update(popularity=add_exponent(F('popularity'), view_exponent(when)))
+
+
+def rank(window, size):
+    """Primary keys of the `size` most popular published posts of `window`, best first."""
+    days = WINDOWS[window]
+    if days is None:
+        posts = BlogPost.objects.filter(status='published', popularity__gt=0).order_by('-popularity', '-id')
+        return list(posts.values_list('pk', flat=True)[:size])
+
+    today = timezone.localdate()
+    half_life = days / 2
+    weight = Case(
+        *[When(day=today - timedelta(days=age), then=Value(2 ** (-age / half_life))) for age in range(days)],
+        default=Value(0.0), output_field=FloatField(),
+    )
+    rows = (
+        BlogPostViewDay.objects.filter(day__gt=today - timedelta(days=days), post__status='published')
+        .values('post_id')
+        .annotate(score=Sum(F('views') * weight, output_field=FloatField()))
+        .order_by('-score', '-post_id')[:size]
+    )
+    return [row['post_id'] for row in rows]
+
+
+def top_posts(window):
+    """The precomputed ranking of `window`, rebuilt at most every POPULAR_POSTS_TTL seconds."""
+    return cache.get_or_set(
+        f'{CACHE_PREFIX}:{window}', lambda: rank(window, settings.POPULAR_POSTS_SIZE), settings.POPULAR_POSTS_TTL,
+    )
+
+
+def day_exponent(day):
+    """`view_exponent()` of the views of a whole day, counted at noon."""
+    noon = datetime.combine(day, time(12), tzinfo=timezone.get_current_timezone())
+    return view_exponent(noon)
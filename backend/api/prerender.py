@@ -0,0 +1,138 @@
+"""
+Crawler OG pages written to disk at publish time.
+
+The OG middleware renders a crawler's page on the first hit after each content
+change: a Django request, the route lookup and the profile query, then the
+cache. Pages of public content are prerendered instead, into
+OG_PRERENDER_DIR, one file per canonical detail path:
+
+    /blog/<slug>          -> OG_PRERENDER_DIR/blog/<slug>.html
+    /projects/<slug>      -> OG_PRERENDER_DIR/projects/<slug>.html
+    /experience/<id>      -> OG_PRERENDER_DIR/experience/<id>.html
+    ...                      (every route in api.og_middleware.ROUTES)
+
+    * saving an object of a route model rewrites its page after commit, or
+      removes it when the object is no longer public (draft, hidden)
+    * deleting an object removes its page, and changing its slug the page at
+      the old slug; saving the profile (site name) rebuilds them all
+    * `manage.py prerender_og_pages` rebuilds every page and removes files no
+      public object maps to (renamed slugs, content deleted while disabled)
+
+The files are plain HTML. The OG middleware sends them to crawlers without
+touching the database, and serves them at OG_PRERENDER_URL (/og/<path>.html),
+so an edge rule that rewrites crawler User-Agents to that prefix, or an nginx
+`try_files` on OG_PRERENDER_DIR, answers them with no Python at all. Paths
+without a file fall back to the dynamic page.
+
+Canonical links point at FRONTEND_URL, so nothing is written without it.
+og:image links to uploads need BACKEND_URL, the API's own origin.
+"""
+
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+
+from .models import BlogPost, Project
+from .og_cards import ensure_card
+from .og_middleware import ROUTES, _get_profile, render_og_page, route_for
+
+logger = logging.getLogger('django')
+
+
+def enabled():
+    return settings.OG_PRERENDER and bool(settings.OG_PRERENDER_BASE_URL)
+
+
+def page_file(path):
+    """File of the prerendered page at canonical `path` (e.g. /blog/<slug>)."""
+    return os.path.join(settings.OG_PRERENDER_DIR, path.strip('/') + '.html')
+
+
+def write_page(path, html):
+    """Atomically replace the page at `path`, so readers never see a partial file."""
+    filename = page_file(path)
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(filename), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(html)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, filename)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def remove_page(path):
+    """Remove the page at `path`. Returns whether there was one."""
+    try:
+        os.remove(page_file(path))
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _render(route, obj, profile):
+    # Off the crawler's request path: a missing OG card is rendered here
+    # instead of queued, so the file never keeps the fallback image
+    if route.model in (BlogPost, Project):
+        ensure_card(obj)
+    return render_og_page(route, obj, settings.OG_PRERENDER_BASE_URL, profile)['html']
+
+
+def refresh(obj):
+    """Write the page of `obj`, or remove it when `obj` is not public."""
+    route = route_for(type(obj))
+    if route is None or not enabled():
+        return
+    path = route.path_of(obj)
+    public = route.lookup(getattr(obj, route.key))
+    if public is None:
+        if remove_page(path):
+            logger.info(f"[OG-PRERENDER] Removed {path}")
+        return
+    write_page(path, _render(route, public, _get_profile()))
+    logger.info(f"[OG-PRERENDER] Wrote {path}")
+
+
+def previous_path(obj):
+    """
+    Canonical path `obj` had before the pending save when its key (slug)
+    changed, else None. Call from pre_save.
+    """
+    route = route_for(type(obj))
+    if route is None or obj.pk is None or route.key == 'pk':
+        return None
+    old = type(obj).objects.filter(pk=obj.pk).values_list(route.key, flat=True).first()
+    if old is None or old == getattr(obj, route.key):
+        return None
+    return route.path.format(old)
+
+
+def remove(obj):
+    """Remove the page of a deleted `obj`."""
+    route = route_for(type(obj))
+    if route is not None and remove_page(route.path_of(obj)):
+        logger.info(f"[OG-PRERENDER] Removed {route.path_of(obj)}")
+
+
+def rebuild():
+    """Write the pages of all public content and remove the rest. Returns (written, removed)."""
+    profile = _get_profile()
+    expected = set()
+    for route in ROUTES:
+        for obj in route.public().iterator():
+            path = route.path_of(obj)
+            write_page(path, _render(route, obj, profile))
+            expected.add(os.path.normpath(page_file(path)))
+
+    removed = 0
+    for directory, _, filenames in os.walk(settings.OG_PRERENDER_DIR):
+        for filename in filenames:
+            path = os.path.normpath(os.path.join(directory, filename))
+            if path not in expected:
+                os.remove(path)
+                removed += 1
+    return len(expected), removed
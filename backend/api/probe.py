@@ -0,0 +1,163 @@
+"""
+Probe external image URLs for dimensions and size without downloading them.
+
+Most image formats store their dimensions in the first few hundred bytes, so a
+probe asks for a small window with a `Range` header and feeds it to Pillow's
+incremental parser, doubling the window until the header has been parsed:
+
+    GET <url>   Range: bytes=0-16383     -> 206, Content-Range: bytes 0-16383/845211
+    (PNG/GIF/WebP: IHDR/LSD/VP8 chunk within the first window; JPEG: the SOF
+     marker, after any EXIF block, usually within the first one or two)
+
+Servers that ignore `Range` answer 200 with the whole body; the probe then
+reads it chunk by chunk and drops the connection as soon as the size is known.
+The total size comes from `Content-Range` (or `Content-Length` on a 200).
+
+Timeouts, connection errors, 5xx, 408 and 429 are retried with exponential
+backoff; other HTTP errors fail immediately. `probe_many()` runs probes on a
+bounded thread pool and `store_results()` writes them to `ImageMetadata` and
+the matching `Image` rows. Used by `manage.py probe_image_urls` and by the
+background job in `api.placeholders`.
+"""
+
+import http.client
+import logging
+import re
+import socket
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from PIL import ImageFile
+
+from .models import Image, ImageMetadata
+
+USER_AGENT = 'portfolio-image-probe'
+FIRST_WINDOW = 16 * 1024
+MAX_PROBE_BYTES = 1024 * 1024
+READ_CHUNK = 8 * 1024
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+BACKOFF = 0.5
+
+# EXIF orientations that rotate the image by 90 degrees
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+CONTENT_RANGE_RE = re.compile(r'bytes\s+\d+-\d+/(\d+)')
+
+logger = logging.getLogger('django')
+
+
+class ProbeError(Exception):
+    """The URL could not be probed (after retries)."""
+
+
+@dataclass
+class ProbeResult:
+    url: str
+    width: int
+    height: int
+    file_size: int | None
+    bytes_read: int
+
+
+def _size_from(parser):
+    image = parser.image
+    width, height = image.size
+    try:
+        if image.getexif().get(0x0112) in ROTATED_ORIENTATIONS:
+            width, height = height, width
+    except Exception:
+        # Truncated or malformed EXIF: keep the stored dimensions
+        pass
+    return width, height
+
+
+def _probe_once(url, timeout):
+    parser = ImageFile.Parser()
+    start, window, read, total = 0, FIRST_WINDOW, 0, None
+    while start < MAX_PROBE_BYTES:
+        request = urllib.request.Request(url, headers={
+            'User-Agent': USER_AGENT,
+            'Range': f'bytes={start}-{start + window - 1}',
+        })
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            if response.status == 206:
+                match = CONTENT_RANGE_RE.match(response.headers.get('Content-Range', ''))
+                total = int(match.group(1)) if match else total
+            else:
+                # Range ignored: stream the full body only as far as needed
+                length = response.headers.get('Content-Length')
+                total = int(length) if length and length.isdigit() else None
+                window = MAX_PROBE_BYTES
+            received = 0
+            while received < window:
+                chunk = response.read(min(READ_CHUNK, window - received))
+                if not chunk:
+                    break
+                received += len(chunk)
+                parser.feed(chunk)
+                if parser.image is not None:
+                    return ProbeResult(url, *_size_from(parser), total, read + received)
+        read += received
+        if received < window or (total is not None and start + received >= total):
+            break
+        start += received
+        window *= 2
+    raise ProbeError(f'no image header in the first {read} bytes')
+
+
+def probe_url(url, timeout=5, retries=2):
+    """Return a ProbeResult for `url` or raise ProbeError."""
+    for attempt in range(retries + 1):
+        try:
+            return _probe_once(url, timeout)
+        except urllib.error.HTTPError as exc:
+            if exc.code not in RETRY_STATUSES:
+                raise ProbeError(f'HTTP {exc.code}') from exc
+            error = exc
+        except (urllib.error.URLError, http.client.HTTPException, socket.timeout, ConnectionError) as exc:
+            error = exc
+        except (OSError, SyntaxError, ValueError) as exc:
+            # Pillow rejected the bytes: retrying will not help
+            raise ProbeError(str(exc)) from exc
+        if attempt < retries:
+            time.sleep(BACKOFF * 2 ** attempt)
+    raise ProbeError(str(error))
+
+
+def probe_many(urls, workers=8, timeout=5, retries=2):
+    """Probe `urls` concurrently. Returns {url: ProbeResult or None}."""
+
+    def probe(url):
+        try:
+            return url, probe_url(url, timeout=timeout, retries=retries)
+        except ProbeError as exc:
+            logger.warning(f"[IMAGE-PROBE] {url}: {exc}")
+            return url, None
+
+    urls = sorted(set(urls))
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(urls)), thread_name_prefix='image-probe') as executor:
+        return dict(executor.map(probe, urls))
+
+
+def store_results(results):
+    """Save successful probes to ImageMetadata and Image rows. Returns the count."""
+    stored = 0
+    for url, result in results.items():
+        if result is None:
+            continue
+        ImageMetadata.objects.update_or_create(source=url, defaults={
+            'width': result.width,
+            'height': result.height,
+            'file_size': result.file_size,
+        })
+        fields = {'width': result.width, 'height': result.height}
+        if result.file_size:
+            fields['file_size'] = result.file_size
+        Image.objects.filter(image_url=url).update(**fields)
+        stored += 1
+    return stored
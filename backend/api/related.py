@@ -0,0 +1,275 @@
+"""
+Precomputed "related posts" and "related projects".
+
+Ranking neighbours on request means comparing one item against the whole
+table. They are computed at write time instead and stored as the top-k rows of
+RelatedPost / RelatedProject per item, so the endpoints are a single join on
+indexed foreign keys:
+
+    GET /api/blog/<slug>/related/        published posts, most similar first
+    GET /api/projects/<slug>/related/    visible projects, most similar first
+
+Similarity of two items combines their text and their structured fields:
+
+    score = TEXT_WEIGHT * cosine(tf-idf) + FEATURE_WEIGHT * jaccard(features)
+
+    text      posts: title (twice), excerpt and Markdown content;
+              projects: title (twice), short description and description
+    features  posts: tags and category; projects: technologies
+
+Vectors are sparse dicts (sublinear tf, smoothed idf, L2-normalized). A row
+of the similarity matrix is one sparse vector times the transposed corpus,
+computed through inverted indexes of terms and features, so only items that
+share something with the source are ever scored.
+
+    * saving a post/project (or its tags) refreshes its own row and the rows
+      of items it enters or leaves the top-k of
+    * deleting one refreshes the rows that pointed at it
+    * `manage.py rebuild_related` recomputes every row (after an import, or
+      after changing the weights below)
+
+Either way the corpus is loaded with one query (plus the tags prefetch for
+posts) and the rows are rewritten in one transaction. That is too slow for
+the save's request, so `schedule()` queues the item after commit and a single
+background thread refreshes everything queued for a kind with one corpus
+load: a burst of saves (an import, a bulk admin action) costs one pass. Set
+RELATED_CONTENT_ASYNC=False where background threads do not outlive the
+request (serverless) to refresh during the save instead.
+"""
+
+import heapq
+import logging
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, NamedTuple
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Prefetch
+
+from .models import BlogPost, BlogTag, Project, RelatedPost, RelatedProject
+
+TEXT_WEIGHT = 0.6
+FEATURE_WEIGHT = 0.4
+MIN_SCORE = 0.05
+
+logger = logging.getLogger('django')
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='related-content')
+# model -> {pk queued: sources that pointed at it before a delete}
+_pending = {}
+_pending_lock = threading.Lock()
+
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*')
+STOP_WORDS = frozenset("""
+    a about above after again all also am an and any are as at be because been before being below between
+    both but by can could did do does doing down during each few for from further had has have having he
+    her here hers him his how i if in into is it its itself just me more most my no nor not now of off on
+    once only or other our ours out over own same she should so some such than that the their theirs them
+    then there these they this those through to too under until up very was we were what when where which
+    while who whom why will with would you your yours
+    http https www com org html png jpg
+""".split())
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOP_WORDS]
+
+
+def tfidf(texts):
+    """{pk: text} -> {pk: {term: weight}}, each vector of unit length."""
+    counts = {pk: Counter(tokenize(text)) for pk, text in texts.items()}
+    df = Counter(term for terms in counts.values() for term in terms)
+    n = len(counts)
+    idf = {term: math.log((1 + n) / (1 + d)) + 1 for term, d in df.items()}
+    vectors = {}
+    for pk, terms in counts.items():
+        vector = {term: (1 + math.log(tf)) * idf[term] for term, tf in terms.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        vectors[pk] = {term: w / norm for term, w in vector.items()}
+    return vectors
+
+
+def _invert(rows):
+    """{pk: {key: weight}} -> {key: [(pk, weight)]}"""
+    index = defaultdict(list)
+    for pk, row in rows.items():
+        for key, weight in row.items():
+            index[key].append((pk, weight))
+    return index
+
+
+class Corpus:
+    """The text vectors and feature sets of every public item of one kind."""
+
+    def __init__(self, texts, features):
+        self.vectors = tfidf(texts)
+        self.features = features
+        self.terms = _invert(self.vectors)
+        self.feature_index = _invert({pk: dict.fromkeys(f, 1) for pk, f in features.items()})
+
+    def __contains__(self, pk):
+        return pk in self.vectors
+
+    def scores(self, pk):
+        """{other pk: combined similarity} of every item sharing a term or a feature with `pk`."""
+        text = defaultdict(float)
+        for term, weight in self.vectors[pk].items():
+            for other, other_weight in self.terms[term]:
+                text[other] += weight * other_weight
+        shared = Counter()
+        for feature in self.features[pk]:
+            for other, _ in self.feature_index[feature]:
+                shared[other] += 1
+
+        own = len(self.features[pk])
+        scores = {}
+        for other in text.keys() | shared.keys():
+            if other == pk:
+                continue
+            union = own + len(self.features[other]) - shared[other]
+            jaccard = shared[other] / union if union else 0.0
+            score = TEXT_WEIGHT * text[other] + FEATURE_WEIGHT * jaccard
+            if score >= MIN_SCORE:
+                scores[other] = score
+        return scores
+
+    def neighbours(self, pk, k):
+        """The `k` best (target pk, score) of `pk`, best first."""
+        scores = self.scores(pk)
+        return [(other, scores[other]) for other in heapq.nlargest(k, scores, key=lambda o: (scores[o], -o))]
+
+
+def _post_corpus():
+    posts = (
+        BlogPost.objects.filter(status='published')
+        .only('id', 'title', 'excerpt', 'content', 'category_id')
+        .prefetch_related(Prefetch('tags', queryset=BlogTag.objects.only('id')))
+    )
+    texts, features = {}, {}
+    for post in posts.iterator(chunk_size=500):
+        texts[post.pk] = f"{post.title} {post.title} {post.excerpt} {post.content}"
+        features[post.pk] = {('tag', tag.pk) for tag in post.tags.all()}
+        if post.category_id:
+            features[post.pk].add(('category', post.category_id))
+    return Corpus(texts, features)
+
+
+def _project_corpus():
+    rows = Project.objects.filter(is_visible=True).values_list(
+        'id', 'title', 'short_description', 'description', 'technologies',
+    )
+    texts, features = {}, {}
+    for pk, title, summary, description, technologies in rows.iterator(chunk_size=500):
+        texts[pk] = f"{title} {title} {summary} {description}"
+        features[pk] = {t.strip().lower() for t in technologies.split(',') if t.strip()}
+    return Corpus(texts, features)
+
+
+class Kind(NamedTuple):
+    link_model: type
+    load: Callable[[], Corpus]
+
+
+KINDS = {
+    BlogPost: Kind(RelatedPost, _post_corpus),
+    Project: Kind(RelatedProject, _project_corpus),
+}
+
+
+def enabled():
+    return settings.RELATED_CONTENT
+
+
+def _links(kind, corpus, sources, k):
+    return [
+        kind.link_model(source_id=source, target_id=target, rank=rank, score=score)
+        for source in sources if source in corpus
+        for rank, (target, score) in enumerate(corpus.neighbours(source, k))
+    ]
+
+
+def rebuild(model):
+    """Recompute every row of `model`'s table. Returns the number of rows written."""
+    kind = KINDS[model]
+    corpus = kind.load()
+    links = _links(kind, corpus, corpus.vectors, settings.RELATED_CONTENT_SIZE)
+    with transaction.atomic():
+        kind.link_model.objects.all().delete()
+        kind.link_model.objects.bulk_create(links, batch_size=1000)
+    return len(links)
+
+
+def refresh(model, pks, also=()):
+    """
+    Recompute the rows that saving or deleting the items `pks` may have
+    changed: their own, those they were a neighbour in (plus `also`, the ones
+    captured before a delete cascaded), and those they now outscore the last
+    entry of. Returns the pks of the sources rewritten.
+    """
+    kind = KINDS[model]
+    k = settings.RELATED_CONTENT_SIZE
+    pks = set(pks)
+    corpus = kind.load()
+
+    current = defaultdict(list)
+    for source, target, score in kind.link_model.objects.values_list('source_id', 'target_id', 'score'):
+        current[source].append((target, score))
+
+    affected = pks | set(also)
+    affected |= {source for source, rows in current.items() if any(target in pks for target, _ in rows)}
+    for pk in pks & corpus.vectors.keys():
+        # Similarity is symmetric: pk's row tells whom it could enter
+        for other, score in corpus.scores(pk).items():
+            rows = current.get(other, [])
+            if len(rows) < k or score > min(s for _, s in rows):
+                affected.add(other)
+
+    with transaction.atomic():
+        kind.link_model.objects.filter(source_id__in=affected).delete()
+        kind.link_model.objects.bulk_create(_links(kind, corpus, affected, k), batch_size=1000)
+    return affected
+
+
+def _refresh_pending(model, on_done):
+    with _pending_lock:
+        pending = _pending.pop(model, {})
+    if not pending:
+        return
+    try:
+        refresh(model, pending, set().union(*pending.values()))
+    except Exception:
+        logger.exception(f"[RELATED] Refreshing the neighbours of {len(pending)} {model.__name__}(s) failed")
+        return
+    if on_done:
+        on_done()
+
+
+def _run(model, on_done):
+    try:
+        _refresh_pending(model, on_done)
+    finally:
+        close_old_connections()
+
+
+def schedule(model, pk, also=(), on_done=None):
+    """
+    Refresh the rows around item `pk` after the current transaction commits
+    (so the corpus is read with the change and its tags in it), then call
+    `on_done()`. Items queued while a refresh is pending join it.
+    """
+    def submit():
+        with _pending_lock:
+            queued = model in _pending
+            _pending.setdefault(model, {}).setdefault(pk, set()).update(also)
+        if queued:
+            return
+        if settings.RELATED_CONTENT_ASYNC:
+            _executor.submit(_run, model, on_done)
+        else:
+            _refresh_pending(model, on_done)
+
+    transaction.on_commit(submit)
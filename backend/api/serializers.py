@@ -1,6 +1,13 @@
-from rest_framework import serializers
+from functools import lru_cache
 
+from django.contrib.contenttypes.fields import GenericRelation
+from django.contrib.contenttypes.models import ContentType
+from rest_framework import serializers
 
+from .media import versioned_path
+from .og_cards import og_image_url
+from .placeholders import placeholder_for
+from .variants import srcset_for
 from .models import (
     Image, Profile, SocialLink, Skill, Education,
     WorkExperience, Project, Certificate, Achievement,
@@ -9,6 +16,56 @@ from .models import (
 )
 
 
+# ============================================
+# EXPANDABLE RELATIONS
+# ============================================
+# Serializers list heavy relations in `expandable_fields`. API views collapse
+# every relation the client did not ask for with `?expand=images,category,tags`
+# (or `?expand=*`) into a cheap reference that needs no extra query:
+#   images (generic relation) -> URL of the filtered /api/images/ list
+#   category (foreign key)    -> id
+#   tags (many-to-many)       -> [id, ...]
+
+def _collapse_method(model, name):
+    field = model._meta.get_field(name)
+    if isinstance(field, GenericRelation):
+        def collapse(self, obj):
+            content_type = ContentType.objects.get_for_model(obj)
+            path = f'/api/images/?content_type={content_type.pk}&object_id={obj.pk}'
+            request = self.context.get('request')
+            return request.build_absolute_uri(path) if request else path
+    elif field.many_to_many:
+        def collapse(self, obj):
+            return [related.pk for related in getattr(obj, name).all()]
+    else:
+        def collapse(self, obj):
+            return getattr(obj, field.attname)
+    return collapse
+
+
+@lru_cache(maxsize=None)
+def _collapsed_serializer(serializer_class, collapsed):
+    attrs = {'__module__': serializer_class.__module__, '__doc__': serializer_class.__doc__}
+    for name in collapsed:
+        attrs[name] = serializers.SerializerMethodField(method_name=f'collapse_{name}')
+        attrs[f'collapse_{name}'] = _collapse_method(serializer_class.Meta.model, name)
+    return type(serializer_class.__name__, (serializer_class,), attrs)
+
+
+def get_expanded_serializer(serializer_class, expand=()):
+    """
+    Return `serializer_class` with every expandable field not named in `expand`
+    collapsed to a reference. Fully expanded requests get the class itself.
+    """
+    if '*' in expand:
+        return serializer_class
+    expandable = getattr(serializer_class, 'expandable_fields', ())
+    collapsed = tuple(name for name in expandable if name not in expand)
+    if not collapsed:
+        return serializer_class
+    return _collapsed_serializer(serializer_class, collapsed)
+
+
 # ============================================
 # IMAGE SERIALIZER
 # ============================================
@@ -16,6 +73,8 @@ from .models import (
 class ImageSerializer(serializers.ModelSerializer):
     """Serializer for Image model with absolute URLs"""
     image_url = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
+    placeholder = serializers.SerializerMethodField()
     linked_object_type = serializers.SerializerMethodField()
     
     class Meta:
@@ -23,7 +82,7 @@ class ImageSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'filename', 'mime_type', 'file_size', 'width', 'height',
             'image_type', 'alt_text', 'caption', 'order', 'show_on_home',
-            'image_url', 'linked_object_type', 'created_at'
+            'image_url', 'srcset', 'placeholder', 'linked_object_type', 'created_at'
         ]
     
     def get_image_url(self, obj):
@@ -39,6 +98,14 @@ class ImageSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(f'/api/images/{obj.uuid}/data/')
         return None
     
+    def get_srcset(self, obj):
+        """Return srcsets of the resized image per format (None without variants)"""
+        return srcset_for(obj.image_file, self.context.get('request'))
+    
+    def get_placeholder(self, obj):
+        """Return size, dominant colour and blurred preview of the image (None until computed)"""
+        return placeholder_for(obj.image_file, obj.image_url, self.context.get('request'))
+    
     def get_linked_object_type(self, obj):
         """Return the name of the model this image is linked to"""
         if obj.content_type:
@@ -68,12 +135,14 @@ class SkillSerializer(serializers.ModelSerializer):
 class ProfileSerializer(serializers.ModelSerializer):
     """Basic profile serializer for list view"""
     profile_image = serializers.SerializerMethodField()
+    profile_image_srcset = serializers.SerializerMethodField()
+    profile_image_placeholder = serializers.SerializerMethodField()
     resume_url = serializers.SerializerMethodField()
     
     class Meta:
         model = Profile
         fields = [
-            'id', 'full_name', 'headline', 'bio', 'profile_image',
+            'id', 'full_name', 'headline', 'bio', 'profile_image', 'profile_image_srcset', 'profile_image_placeholder',
             'email', 'phone', 'location',
             'years_of_experience', 'current_role', 'current_company',
             'available_for_hire', 'resume_filename', 'resume_url',
@@ -88,11 +157,19 @@ class ProfileSerializer(serializers.ModelSerializer):
             return obj.profile_image_url
         return None
     
+    def get_profile_image_srcset(self, obj):
+        """Return srcsets of the resized profile image per format (None without variants)"""
+        return srcset_for(obj.profile_image_file, self.context.get('request'))
+    
+    def get_profile_image_placeholder(self, obj):
+        """Return size, dominant colour and blurred preview of the profile image (None until computed)"""
+        return placeholder_for(obj.profile_image_file, obj.profile_image_url, self.context.get('request'))
+    
     def get_resume_url(self, obj):
         """Return resume download URL (internal file endpoint or external URL)"""
         request = self.context.get('request')
         if obj.resume_file and request:
-            return request.build_absolute_uri(f'/api/profiles/{obj.pk}/resume/')
+            return request.build_absolute_uri(versioned_path(f'/api/profiles/{obj.pk}/resume/', obj.resume_file))
         if getattr(obj, 'resume_url', None):
             return obj.resume_url
         return None
@@ -114,14 +191,17 @@ class ProfileDetailSerializer(ProfileSerializer):
 
 class EducationSerializer(serializers.ModelSerializer):
     logo = serializers.SerializerMethodField()
+    logo_srcset = serializers.SerializerMethodField()
+    logo_placeholder = serializers.SerializerMethodField()
     images = ImageSerializer(many=True, read_only=True)
+    expandable_fields = ('images',)
     
     class Meta:
         model = Education
         fields = [
             'id', 'institution', 'slug', 'degree', 'field_of_study',
             'start_date', 'end_date', 'is_current', 'grade',
-            'description', 'location', 'logo', 'images', 'show_on_home'
+            'description', 'location', 'logo', 'logo_srcset', 'logo_placeholder', 'images', 'show_on_home'
         ]
     
     def get_logo(self, obj):
@@ -131,6 +211,14 @@ class EducationSerializer(serializers.ModelSerializer):
         if getattr(obj, 'logo_url', None):
             return obj.logo_url
         return None
+    
+    def get_logo_srcset(self, obj):
+        """Return srcsets of the resized logo per format (None without variants)"""
+        return srcset_for(obj.logo_file, self.context.get('request'))
+    
+    def get_logo_placeholder(self, obj):
+        """Return size, dominant colour and blurred preview of the logo (None until computed)"""
+        return placeholder_for(obj.logo_file, obj.logo_url, self.context.get('request'))
 
 
 # ============================================
@@ -139,12 +227,15 @@ class EducationSerializer(serializers.ModelSerializer):
 
 class WorkExperienceSerializer(serializers.ModelSerializer):
     company_logo = serializers.SerializerMethodField()
+    company_logo_srcset = serializers.SerializerMethodField()
+    company_logo_placeholder = serializers.SerializerMethodField()
     images = ImageSerializer(many=True, read_only=True)
+    expandable_fields = ('images',)
     
     class Meta:
         model = WorkExperience
         fields = [
-            'id', 'company_name', 'company_logo', 'company_url',
+            'id', 'company_name', 'company_logo', 'company_logo_srcset', 'company_logo_placeholder', 'company_url',
             'job_title', 'employment_type', 'work_mode', 'location',
             'start_date', 'end_date', 'is_current',
             'description', 'achievements', 'technologies_used',
@@ -158,6 +249,14 @@ class WorkExperienceSerializer(serializers.ModelSerializer):
         if getattr(obj, 'company_logo_url', None):
             return obj.company_logo_url
         return None
+    
+    def get_company_logo_srcset(self, obj):
+        """Return srcsets of the resized company logo per format (None without variants)"""
+        return srcset_for(obj.company_logo_file, self.context.get('request'))
+    
+    def get_company_logo_placeholder(self, obj):
+        """Return size, dominant colour and blurred preview of the company logo (None until computed)"""
+        return placeholder_for(obj.company_logo_file, obj.company_logo_url, self.context.get('request'))
 
 
 # ============================================
@@ -167,12 +266,14 @@ class WorkExperienceSerializer(serializers.ModelSerializer):
 class ProjectSerializer(serializers.ModelSerializer):
     """Basic project serializer for list view"""
     featured_image = serializers.SerializerMethodField()
+    featured_image_srcset = serializers.SerializerMethodField()
+    featured_image_placeholder = serializers.SerializerMethodField()
     
     class Meta:
         model = Project
         fields = [
             'id', 'title', 'slug', 'short_description',
-            'featured_image', 'featured_image_alt',
+            'featured_image', 'featured_image_srcset', 'featured_image_placeholder', 'featured_image_alt',
             'live_url', 'github_url', 'demo_url',
             'technologies', 'status', 'is_featured', 'show_on_home',
             'order', 'created_at', 'updated_at'
@@ -185,12 +286,21 @@ class ProjectSerializer(serializers.ModelSerializer):
         if getattr(obj, 'featured_image_url', None):
             return obj.featured_image_url
         return None
+    
+    def get_featured_image_srcset(self, obj):
+        """Return srcsets of the resized featured image per format (None without variants)"""
+        return srcset_for(obj.featured_image_file, self.context.get('request'))
+    
+    def get_featured_image_placeholder(self, obj):
+        """Return size, dominant colour and blurred preview of the featured image (None until computed)"""
+        return placeholder_for(obj.featured_image_file, obj.featured_image_url, self.context.get('request'))
 
 
 class ProjectDetailSerializer(ProjectSerializer):
     """Detailed project serializer with full data including SEO/OG fields"""
     images = ImageSerializer(many=True, read_only=True)
     og_image = serializers.SerializerMethodField()
+    expandable_fields = ('images',)
 
     class Meta(ProjectSerializer.Meta):
         fields = ProjectSerializer.Meta.fields + [
@@ -201,12 +311,8 @@ class ProjectDetailSerializer(ProjectSerializer):
         ]
 
     def get_og_image(self, obj):
-        """Return OG image URL (uploaded file preferred, then external URL, else None)"""
-        if obj.og_image_file:
-            return obj.og_image_file.url
-        if getattr(obj, 'og_image_url', None):
-            return obj.og_image_url
-        return None
+        """Return the absolute OG image URL (uploaded file preferred, then external URL, generated card, featured image)"""
+        return og_image_url(obj, self.context.get('request'))
 
 
 # ============================================
@@ -215,15 +321,20 @@ class ProjectDetailSerializer(ProjectSerializer):
 
 class CertificateSerializer(serializers.ModelSerializer):
     organization_logo = serializers.SerializerMethodField()
+    organization_logo_srcset = serializers.SerializerMethodField()
+    organization_logo_placeholder = serializers.SerializerMethodField()
     certificate_image = serializers.SerializerMethodField()
+    certificate_image_srcset = serializers.SerializerMethodField()
+    certificate_image_placeholder = serializers.SerializerMethodField()
     images = ImageSerializer(many=True, read_only=True)
+    expandable_fields = ('images',)
     
     class Meta:
         model = Certificate
         fields = [
-            'id', 'title', 'slug', 'issuing_organization', 'organization_logo',
+            'id', 'title', 'slug', 'issuing_organization', 'organization_logo', 'organization_logo_srcset', 'organization_logo_placeholder',
             'issue_date', 'expiry_date', 'does_not_expire',
-            'credential_id', 'credential_url', 'certificate_image',
+            'credential_id', 'credential_url', 'certificate_image', 'certificate_image_srcset', 'certificate_image_placeholder',
             'description', 'skills', 'order', 'images', 'show_on_home'
         ]
     
@@ -235,6 +346,14 @@ class CertificateSerializer(serializers.ModelSerializer):
             return obj.organization_logo_url
         return None
     
+    def get_organization_logo_srcset(self, obj):
+        """Return srcsets of the resized organization logo per format (None without variants)"""
+        return srcset_for(obj.organization_logo_file, self.context.get('request'))
+    
+    def get_organization_logo_placeholder(self, obj):
+        """Return size, dominant colour and blurred preview of the organization logo (None until computed)"""
+        return placeholder_for(obj.organization_logo_file, obj.organization_logo_url, self.context.get('request'))
+    
     def get_certificate_image(self, obj):
         """Return certificate image URL (file or external URL)"""
         if obj.certificate_image_file:
@@ -242,6 +361,14 @@ class CertificateSerializer(serializers.ModelSerializer):
         if getattr(obj, 'certificate_image_url', None):
             return obj.certificate_image_url
         return None
+    
+    def get_certificate_image_srcset(self, obj):
+        """Return srcsets of the resized certificate image per format (None without variants)"""
+        return srcset_for(obj.certificate_image_file, self.context.get('request'))
+    
+    def get_certificate_image_placeholder(self, obj):
+        """Return size, dominant colour and blurred preview of the certificate image (None until computed)"""
+        return placeholder_for(obj.certificate_image_file, obj.certificate_image_url, self.context.get('request'))
 
 
 # ============================================
@@ -250,13 +377,16 @@ class CertificateSerializer(serializers.ModelSerializer):
 
 class AchievementSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
+    image_placeholder = serializers.SerializerMethodField()
     images = ImageSerializer(many=True, read_only=True)
+    expandable_fields = ('images',)
     
     class Meta:
         model = Achievement
         fields = [
             'id', 'title', 'slug', 'achievement_type', 'issuer', 'date',
-            'description', 'url', 'image', 'order', 'images', 'show_on_home'
+            'description', 'url', 'image', 'image_srcset', 'image_placeholder', 'order', 'images', 'show_on_home'
         ]
     
     def get_image(self, obj):
@@ -266,6 +396,14 @@ class AchievementSerializer(serializers.ModelSerializer):
         if getattr(obj, 'image_url', None):
             return obj.image_url
         return None
+    
+    def get_image_srcset(self, obj):
+        """Return srcsets of the resized achievement image per format (None without variants)"""
+        return srcset_for(obj.image_file, self.context.get('request'))
+    
+    def get_image_placeholder(self, obj):
+        """Return size, dominant colour and blurred preview of the achievement image (None until computed)"""
+        return placeholder_for(obj.image_file, obj.image_url, self.context.get('request'))
 
 
 # ============================================
@@ -311,16 +449,19 @@ class BlogTagSerializer(serializers.ModelSerializer):
 class BlogPostListSerializer(serializers.ModelSerializer):
     """Serializer for blog post list view"""
     featured_image = serializers.SerializerMethodField()
+    featured_image_srcset = serializers.SerializerMethodField()
+    featured_image_placeholder = serializers.SerializerMethodField()
     category = BlogCategorySerializer(read_only=True)
     tags = BlogTagSerializer(many=True, read_only=True)
     author = serializers.SerializerMethodField()
+    expandable_fields = ('category', 'tags')
     
     class Meta:
         model = BlogPost
         fields = [
-            'id', 'title', 'slug', 'excerpt', 'featured_image',
+            'id', 'title', 'slug', 'excerpt', 'featured_image', 'featured_image_srcset', 'featured_image_placeholder',
             'featured_image_alt', 'category', 'tags', 'author',
-            'status', 'published_at', 'reading_time', 'views_count',
+            'status', 'published_at', 'reading_time', 'word_count', 'views_count',
             'is_featured', 'show_on_home', 'created_at', 'updated_at'
         ]
     
@@ -332,8 +473,18 @@ class BlogPostListSerializer(serializers.ModelSerializer):
             return obj.featured_image_url
         return None
     
+    def get_featured_image_srcset(self, obj):
+        """Return srcsets of the resized featured image per format (None without variants)"""
+        return srcset_for(obj.featured_image_file, self.context.get('request'))
+    
+    def get_featured_image_placeholder(self, obj):
+        """Return size, dominant colour and blurred preview of the featured image (None until computed)"""
+        return placeholder_for(obj.featured_image_file, obj.featured_image_url, self.context.get('request'))
+    
     def get_author(self, obj):
-        """Return basic author info"""
+        """Return basic author info (None for posts without a profile)"""
+        if obj.profile is None:
+            return None
         return {
             'id': obj.profile.id,
             'name': obj.profile.full_name
@@ -350,22 +501,20 @@ class BlogPostDetailSerializer(BlogPostSerializer):
     """Detailed blog post serializer with SEO data"""
     images = ImageSerializer(many=True, read_only=True)
     og_image = serializers.SerializerMethodField()
+    toc = serializers.JSONField(source='content_toc', read_only=True)
+    expandable_fields = BlogPostSerializer.expandable_fields + ('images',)
     
     class Meta(BlogPostSerializer.Meta):
         fields = BlogPostSerializer.Meta.fields + [
-            'images', 'allow_comments',
+            'content_html', 'toc', 'images', 'allow_comments',
             'meta_title', 'meta_description', 'meta_keywords',
             'canonical_url', 'og_title', 'og_description', 'og_image',
             'schema_type'
         ]
     
     def get_og_image(self, obj):
-        """Return OG image URL (file or external URL)"""
-        if obj.og_image_file:
-            return obj.og_image_file.url
-        if getattr(obj, 'og_image_url', None):
-            return obj.og_image_url
-        return None
+        """Return the absolute OG image URL (file, external URL, generated card or featured image)"""
+        return og_image_url(obj, self.context.get('request'))
 
 
 # ============================================
@@ -374,13 +523,16 @@ class BlogPostDetailSerializer(BlogPostSerializer):
 
 class TestimonialSerializer(serializers.ModelSerializer):
     author_image = serializers.SerializerMethodField()
+    author_image_srcset = serializers.SerializerMethodField()
+    author_image_placeholder = serializers.SerializerMethodField()
     images = ImageSerializer(many=True, read_only=True)
+    expandable_fields = ('images',)
     
     class Meta:
         model = Testimonial
         fields = [
             'id', 'author_name', 'slug', 'author_title', 'author_company',
-            'author_image', 'content', 'rating', 'relationship',
+            'author_image', 'author_image_srcset', 'author_image_placeholder', 'content', 'rating', 'relationship',
             'linkedin_url', 'is_featured', 'show_on_home', 'date', 'order', 'images'
         ]
     
@@ -391,6 +543,14 @@ class TestimonialSerializer(serializers.ModelSerializer):
         if getattr(obj, 'author_image_url', None):
             return obj.author_image_url
         return None
+    
+    def get_author_image_srcset(self, obj):
+        """Return srcsets of the resized author image per format (None without variants)"""
+        return srcset_for(obj.author_image_file, self.context.get('request'))
+    
+    def get_author_image_placeholder(self, obj):
+        """Return size, dominant colour and blurred preview of the author image (None until computed)"""
+        return placeholder_for(obj.author_image_file, obj.author_image_url, self.context.get('request'))
 
 
 # ============================================
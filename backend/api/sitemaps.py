@@ -0,0 +1,131 @@
+"""
+sitemap.xml for the frontend, generated from the database.
+
+The Next.js `sitemap.ts` lists local MDX files, so database content never
+reached search engines unless a crawler walked every API endpoint. The backend
+now serves a sitemap index and one child sitemap per detail route of the OG
+route table (api/og_middleware.py), so a new route is listed automatically:
+
+    /sitemap.xml                  index: every child with its lastmod
+    /sitemap-pages.xml            home and section listing pages
+    /sitemap-blog.xml             published posts      (-2, -3... past 50,000 URLs)
+    /sitemap-projects.xml         visible projects
+    /sitemap-certificates.xml     ... one per route
+
+    * page URLs are the frontend's (FRONTEND_URL, else the forwarded host)
+      and `lastmod` is the object's `updated_at`; the index links the child
+      sitemaps on the backend (BACKEND_URL, else the request's host), the
+      only place they are served. The frontend's robots.txt lists this index
+      next to its own sitemap of local MDX pages
+    * each child is one `values_list(key, updated_at)` query read with
+      iterator(), the index one COUNT/MAX aggregate per route; no model
+      instances are built
+    * documents are cached under the content version (see api/conditional.py),
+      so they are rebuilt only after a content change, and carry ETag /
+      Last-Modified for conditional GETs
+"""
+
+from xml.sax.saxutils import escape
+
+from django.db.models import Count, Max
+from django.http import Http404
+from django.urls import reverse
+
+from .conditional import cached_document
+from .og_cards import absolute_url
+from .og_middleware import ROUTES, resolve_base_url
+
+MAX_URLS = 50000
+CHUNK_SIZE = 2000
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def section_name(route):
+    """Child sitemap name of a route: the first segment of its path, e.g. 'blog'."""
+    return route.path.strip('/').split('/')[0]
+
+
+def _route(section):
+    return next((route for route in ROUTES if section_name(route) == section), None)
+
+
+def _stats(route):
+    return route.public().aggregate(count=Count('pk'), last=Max('updated_at'))
+
+
+def _entry(tag, loc, lastmod):
+    lastmod = f'<lastmod>{lastmod.isoformat(timespec="seconds")}</lastmod>' if lastmod else ''
+    return f'<{tag}><loc>{escape(loc)}</loc>{lastmod}</{tag}>\n'
+
+
+def _document(root, tag, entries):
+    """Sitemap XML for `entries` of (loc, lastmod) and the newest lastmod."""
+    parts = [XML_HEADER, f'<{root} xmlns="{XMLNS}">\n']
+    last = None
+    for loc, lastmod in entries:
+        parts.append(_entry(tag, loc, lastmod))
+        if lastmod and (last is None or lastmod > last):
+            last = lastmod
+    parts.append(f'</{root}>\n')
+    return ''.join(parts), last
+
+
+def _child_path(section, page=1):
+    kwargs = {'section': section} if page == 1 else {'section': section, 'page': page}
+    return reverse('sitemap-section', kwargs=kwargs)
+
+
+def build_index(backend_url):
+    stats = [(route, _stats(route)) for route in ROUTES]
+    newest = max((s['last'] for _, s in stats if s['last']), default=None)
+    entries = [(backend_url + _child_path('pages'), newest)]
+    for route, s in stats:
+        pages = max(1, -(-s['count'] // MAX_URLS))
+        for page in range(1, pages + 1):
+            entries.append((backend_url + _child_path(section_name(route), page), s['last']))
+    return _document('sitemapindex', 'sitemap', entries)
+
+
+def build_pages(base_url):
+    sections = [(f"/{section_name(route)}", _stats(route)['last']) for route in ROUTES]
+    newest = max((last for _, last in sections if last), default=None)
+    entries = [(f'{base_url}/', newest)] + [(f'{base_url}{path}', last) for path, last in sections]
+    return _document('urlset', 'url', entries)
+
+
+def build_section(base_url, route, page):
+    """Child sitemap `page` of `route`, or None past its last page."""
+    values = (
+        route.public().order_by(route.key).values_list(route.key, 'updated_at')
+        [(page - 1) * MAX_URLS:page * MAX_URLS]
+    )
+    rows = values.iterator(chunk_size=CHUNK_SIZE)
+    xml, last = _document('urlset', 'url', (
+        (base_url + route.path.format(key), updated_at) for key, updated_at in rows
+    ))
+    if last is None and page > 1:
+        return None
+    return xml, last
+
+
+def _serve(request, name, base_url, build):
+    return cached_document(
+        request, f'sitemap|{base_url}|{name}', lambda: build(base_url), 'application/xml; charset=utf-8',
+    )
+
+
+def sitemap_index(request):
+    return _serve(request, 'index', absolute_url('/', request).rstrip('/'), build_index)
+
+
+def sitemap_section(request, section, page=1):
+    page = int(page)
+    base_url = resolve_base_url(request)
+    if section == 'pages' and page == 1:
+        return _serve(request, section, base_url, build_pages)
+    route = _route(section)
+    if route is None or page < 1:
+        raise Http404('No such sitemap')
+    return _serve(request, f'{section}-{page}', base_url, lambda base_url: build_section(base_url, route, page))
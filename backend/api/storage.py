@@ -0,0 +1,108 @@
+"""
+Content-addressed media storage.
+
+Uploads are hashed (SHA-256) while they are written and stored as
+
+    cas/<aa>/<bb>/<sha256><ext>
+
+regardless of the field's `upload_to`, so the same logo uploaded for several
+certificates (or an education entry and a work experience) is stored once and
+every record points at the same name. `MediaBlob` is the reference table:
+digest -> stored name, used to skip writing content that already exists.
+
+Because a stored name can only ever hold one content, URLs under `cas/` are
+immutable and can be cached forever.
+
+Blobs are shared, so `delete()` leaves content-addressed files in place
+(the admin "clear"/"replace" actions would otherwise break other records);
+`manage.py prune_media` removes blobs that no FileField references any more.
+`manage.py dedupe_media` moves files uploaded before this storage was enabled.
+
+`URLCacheMixin` memoizes `storage.url(name)` in a bounded LRU, per storage
+instance. A stored name always maps to the same URL, but building it is pure
+CPU work repeated on every cold payload build: cheap for the filesystem, a
+full URL builder run per call for Cloudinary. It is switched on per storage
+with the `url_cache_size` option in STORAGES (0 turns it off) and cleared when
+MEDIA_URL or STORAGES change (tests). `manage.py benchmark_storage_urls`
+measures the difference.
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+
+from django.core.files.storage import FileSystemStorage
+from django.core.signals import setting_changed
+
+CAS_DIRECTORY = 'cas'
+
+
+def content_name(digest, original_name=''):
+    """Stored name for content with the given SHA-256 `digest`."""
+    ext = os.path.splitext(original_name)[1].lower()
+    return f'{CAS_DIRECTORY}/{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+
+def is_content_addressed(name):
+    return bool(name) and name.startswith(f'{CAS_DIRECTORY}/')
+
+
+def file_digest(content):
+    """Return (sha256 hexdigest, size) of a django File, reading it in chunks."""
+    sha = hashlib.sha256()
+    size = 0
+    for chunk in content.chunks():
+        sha.update(chunk)
+        size += len(chunk)
+    content.seek(0)
+    return sha.hexdigest(), size
+
+
+class URLCacheMixin:
+    """Memoize `url()` for up to `url_cache_size` names (storage option, 0 = off)."""
+
+    def __init__(self, *args, url_cache_size=0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.url_cache_size = url_cache_size
+        if url_cache_size:
+            self.url = lru_cache(maxsize=url_cache_size)(super().url)
+            setting_changed.connect(self._clear_url_cache)
+
+    def _clear_url_cache(self, setting=None, **kwargs):
+        if setting in ('MEDIA_URL', 'STORAGES'):
+            self.url.cache_clear()
+
+
+class CachedURLFileSystemStorage(URLCacheMixin, FileSystemStorage):
+    """FileSystemStorage with memoized URLs."""
+
+
+class ContentAddressedStorage(CachedURLFileSystemStorage):
+    """FileSystemStorage that deduplicates uploads by content hash."""
+
+    def _save(self, name, content):
+        from .models import MediaBlob
+
+        digest, size = file_digest(content)
+        blob = MediaBlob.objects.filter(sha256=digest).first()
+        if blob is not None and self.exists(blob.name):
+            return blob.name
+
+        target = content_name(digest, name)
+        if not self.exists(target):
+            target = super()._save(target, content)
+        MediaBlob.objects.update_or_create(sha256=digest, defaults={'name': target, 'size': size})
+        return target
+
+    def delete(self, name):
+        # Shared content: removed by `prune_media` once nothing references it
+        if is_content_addressed(name):
+            return
+        super().delete(name)
+
+    def delete_blob(self, name):
+        """Actually remove a content-addressed file (used by `prune_media`)."""
+        super().delete(name)
+        # Precompressed copies written by `compress_media`
+        for suffix in ('.gz', '.br'):
+            super().delete(name + suffix)
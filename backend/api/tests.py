@@ -1,3 +1,1595 @@
-from django.test import TestCase
+import importlib
+import io
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import tempfile
+from unittest import mock
+
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.files.storage import default_storage, storages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image as PILImage
+from rest_framework.renderers import JSONRenderer
+
+from . import og_cards, placeholders, popularity, related, transform
+from .compiled_serializers import compile_serializer, get_list_serializer, serialize_instance
+from .conditional import bump_content_version, get_content_version
+from .loaders import ImageLoader
+from .markup import measure_markdown
+from .media_middleware import MediaFilesMiddleware
+from .models import (
+    Achievement, BlogCategory, BlogPost, BlogPostViewDay, BlogTag, Certificate, Education, Image, ImageMetadata, ImageVariant,
+    MediaBlob, OGCard, Profile, Project, RelatedPost, RelatedProject, Skill, SocialLink, Testimonial, WorkExperience,
+)
+from .og_cards import card_url, ensure_card
+from .og_middleware import _is_crawler, match_route
+from .placeholders import placeholder_for
+from .probe import ProbeError, probe_many, probe_url, store_results
+from .serializers import (
+    AchievementSerializer, BlogCategorySerializer, BlogPostDetailSerializer, BlogPostListSerializer, BlogPostSerializer,
+    BlogTagSerializer, CertificateSerializer, EducationSerializer, ImageSerializer, ProfileDetailSerializer,
+    ProfileSerializer, ProjectDetailSerializer, ProjectSerializer, SkillSerializer, SocialLinkSerializer,
+    TestimonialSerializer, WorkExperienceSerializer, get_expanded_serializer,
+)
+from .storage import CachedURLFileSystemStorage, is_content_addressed
+from .transform import TransformError, parse_params
+from .uploads import optimize_upload
+from .variants import srcset_for
+
+
+# Query counts of a deployment whose cache every process shares (CACHE_URL), so
+# the content version needs no query; the test runner is one process.
+shared_cache = override_settings(CONTENT_VERSION_IN_CACHE=True)
+
+
+def _jpeg(size, orientation=None):
+    image = PILImage.effect_noise(size, 64).convert('RGB')
+    exif = image.getexif()
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=95, exif=exif)
+    return buffer.getvalue()
+
+
+def _png(size):
+    buffer = io.BytesIO()
+    PILImage.effect_noise(size, 64).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class StubImageHandler(BaseHTTPRequestHandler):
+    """
+    /range/<name>    honours Range requests
+    /full/<name>     ignores Range and sends the whole body
+    /flaky/<name>    503 on the first request, then like /range/
+    /slow/<name>     answers after the probe timeout
+    anything else    404
+    """
+    files = {}
+    hits = Counter()
+    bytes_sent = Counter()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.hits[self.path] += 1
+        mode, _, name = self.path.strip('/').partition('/')
+        body = self.files.get(name)
+        if body is None:
+            self.send_error(404)
+            return
+        if mode == 'flaky' and self.hits[self.path] == 1:
+            self.send_error(503)
+            return
+        if mode == 'slow':
+            time.sleep(0.5)
+
+        match = re.match(r'bytes=(\d+)-(\d+)', self.headers.get('Range', ''))
+        if match and mode != 'full':
+            start, end = int(match.group(1)), min(int(match.group(2)), len(body) - 1)
+            payload = body[start:end + 1]
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(body)}')
+        else:
+            payload = body
+            self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        try:
+            for i in range(0, len(payload), 4096):
+                self.wfile.write(payload[i:i + 4096])
+                self.bytes_sent[self.path] += len(payload[i:i + 4096])
+        except (BrokenPipeError, ConnectionResetError):
+            # The probe hung up once it had the header
+            pass
+
+
+@mock.patch('api.probe.BACKOFF', 0)
+class ImageProbeTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        StubImageHandler.files = {
+            'photo.jpg': _jpeg((1200, 800), orientation=6),
+            'shot.png': _png((900, 400)),
+            'text.jpg': b'not an image at all' * 100,
+        }
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubImageHandler)
+        cls.base = f'http://127.0.0.1:{cls.server.server_port}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        StubImageHandler.hits.clear()
+        StubImageHandler.bytes_sent.clear()
+
+    def test_ranged_probe_reads_only_the_header(self):
+        body = StubImageHandler.files['photo.jpg']
+        result = probe_url(f'{self.base}/range/photo.jpg')
+        # EXIF orientation 6 rotates by 90 degrees
+        self.assertEqual((result.width, result.height), (800, 1200))
+        self.assertEqual(result.file_size, len(body))
+        self.assertLess(StubImageHandler.bytes_sent['/range/photo.jpg'], len(body) // 4)
+
+    def test_server_ignoring_range_is_cut_off(self):
+        body = StubImageHandler.files['shot.png']
+        result = probe_url(f'{self.base}/full/shot.png')
+        self.assertEqual((result.width, result.height), (900, 400))
+        self.assertEqual(result.file_size, len(body))
+        self.assertLess(result.bytes_read, len(body))
+
+    def test_retries_server_errors(self):
+        result = probe_url(f'{self.base}/flaky/shot.png', retries=1)
+        self.assertEqual((result.width, result.height), (900, 400))
+        self.assertEqual(StubImageHandler.hits['/flaky/shot.png'], 2)
+
+    def test_client_errors_are_not_retried(self):
+        with self.assertRaises(ProbeError):
+            probe_url(f'{self.base}/range/missing.jpg', retries=3)
+        self.assertEqual(StubImageHandler.hits['/range/missing.jpg'], 1)
+
+    def test_timeout(self):
+        with self.assertRaises(ProbeError):
+            probe_url(f'{self.base}/slow/shot.png', timeout=0.1, retries=1)
+        self.assertEqual(StubImageHandler.hits['/slow/shot.png'], 2)
+
+    def test_not_an_image(self):
+        with self.assertRaises(ProbeError):
+            probe_url(f'{self.base}/range/text.jpg')
+
+    def test_probe_many_and_store_results(self):
+        urls = [f'{self.base}/range/photo.jpg', f'{self.base}/range/shot.png', f'{self.base}/range/missing.jpg']
+        results = probe_many(urls, workers=3)
+        self.assertIsNone(results[urls[2]])
+        self.assertEqual(store_results(results), 2)
+        self.assertEqual(
+            ImageMetadata.objects.get(source=urls[1]).file_size, len(StubImageHandler.files['shot.png'])
+        )
+
+    def test_command_fills_image_rows(self):
+        url = f'{self.base}/range/shot.png'
+        image = Image.objects.create(
+            filename='shot.png', image_url=url,
+            content_type=ContentType.objects.get_for_model(Image), object_id=1,
+        )
+        call_command('probe_image_urls', '--workers', '2', stdout=io.StringIO())
+        image.refresh_from_db()
+        self.assertEqual((image.width, image.height), (900, 400))
+        self.assertEqual(image.file_size, len(StubImageHandler.files['shot.png']))
+
+
+class UploadOptimizationTests(SimpleTestCase):
+    def test_applies_orientation_and_strips_exif(self):
+        upload = SimpleUploadedFile('photo.jpg', _jpeg((600, 400), orientation=6), content_type='image/jpeg')
+        result = optimize_upload(upload, 'featured_image_file')
+        self.assertEqual((result.name, result.content_type), ('photo.webp', 'image/webp'))
+        with PILImage.open(result) as image:
+            self.assertEqual(image.format, 'WEBP')
+            self.assertEqual(image.size, (400, 600))
+            self.assertFalse(image.getexif())
+
+    def test_og_images_fit_the_budget(self):
+        upload = SimpleUploadedFile('og.png', _png((2400, 1260)), content_type='image/png')
+        self.assertGreater(upload.size, 300 * 1024)
+        result = optimize_upload(upload, 'og_image_file')
+        self.assertLessEqual(result.size, 300 * 1024)
+        with PILImage.open(result) as image:
+            self.assertEqual(image.format, 'JPEG')
+            self.assertLessEqual(image.width, 1200)
+
+    def test_small_clean_uploads_are_kept(self):
+        buffer = io.BytesIO()
+        PILImage.new('RGB', (64, 64), 'red').save(buffer, 'WEBP')
+        upload = SimpleUploadedFile('icon.webp', buffer.getvalue(), content_type='image/webp')
+        self.assertIs(optimize_upload(upload, 'logo_file'), upload)
+
+        svg = SimpleUploadedFile('logo.svg', b'<svg xmlns="http://www.w3.org/2000/svg"/>', content_type='image/svg+xml')
+        self.assertIs(optimize_upload(svg, 'logo_file'), svg)
+
+    def test_archives_originals(self):
+        data = _jpeg((300, 200), orientation=3)
+        with tempfile.TemporaryDirectory() as archive, override_settings(IMAGE_UPLOAD_ARCHIVE_DIR=archive):
+            optimize_upload(SimpleUploadedFile('photo.jpg', data), 'image_file')
+            [archived] = os.listdir(archive)
+            with open(os.path.join(archive, archived), 'rb') as fh:
+                self.assertEqual(fh.read(), data)
+
+
+class OGCardTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.enterContext(mock.patch.object(default_storage, '_wrapped', storages.create_storage(storages.backends['default'])))
+        category = BlogCategory.objects.create(name='Engineering')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post = BlogPost.objects.create(
+                title='A fairly long title about rendering social preview cards on the server side with Pillow',
+                excerpt='Excerpt', content='Body', category=category, status='published',
+            )
+
+    def test_card_rendered_on_publish(self):
+        card = OGCard.objects.get()
+        self.assertLessEqual(card.size, 300 * 1024)
+        with card.file.open('rb') as fh, PILImage.open(fh) as image:
+            self.assertEqual((image.format, image.size), ('JPEG', (1200, 630)))
+
+        response = self.client.get(f'/api/blog/{self.post.slug}/')
+        self.assertEqual(response.json()['og_image'], f'http://testserver{card.file.url}')
+
+    def test_card_follows_content_version(self):
+        first = card_url(self.post)
+        self.post.title = 'Short title'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.save()
+        self.assertEqual(OGCard.objects.count(), 1)
+        self.assertNotEqual(card_url(self.post), first)
+
+        # View counting does not touch updated_at and keeps the card
+        self.post.increment_views()
+        self.assertEqual(ensure_card(self.post).version, OGCard.objects.get().version)
+
+    def test_crawler_html_uses_card(self):
+        response = self.client.get(f'/blog/{self.post.slug}', HTTP_USER_AGENT='WhatsApp/2.23')
+        self.assertContains(response, f'<meta property="og:image" content="http://testserver{card_url(self.post)}"')
+
+    def test_urls_are_absolute(self):
+        path = OGCard.objects.get().file.url
+        request = RequestFactory().get('/', secure=True)
+        self.assertEqual(card_url(self.post, request), f'https://testserver{path}')
+        self.assertEqual(card_url(self.post), path)
+        with override_settings(BACKEND_BASE_URL='https://media.example.com'):
+            self.assertEqual(card_url(self.post), f'https://media.example.com{path}')
+            self.assertEqual(card_url(self.post, request), f'https://media.example.com{path}')
+            response = self.client.get(f'/blog/{self.post.slug}', HTTP_USER_AGENT='WhatsApp/2.23')
+            self.assertContains(response, f'<meta property="og:image" content="https://media.example.com{path}"')
+            self.assertEqual(
+                self.client.get(f'/api/blog/{self.post.slug}/').json()['og_image'], f'https://media.example.com{path}',
+            )
+
+    def test_crawler_hit_queues_a_missing_card(self):
+        OGCard.objects.all().delete()
+        BlogPost.objects.filter(pk=self.post.pk).update(featured_image_url='https://cdn.example.com/featured.jpg')
+        crawler = {'HTTP_USER_AGENT': 'WhatsApp/2.23'}
+        with mock.patch.object(og_cards._executor, 'submit') as submit:
+            response = self.client.get(f'/blog/{self.post.slug}', **crawler)
+            cache.clear()
+            self.client.get(f'/blog/{self.post.slug}', **crawler)
+        # Not rendered during the request: the page falls back to the featured image
+        self.assertContains(response, '<meta property="og:image" content="https://cdn.example.com/featured.jpg"')
+        self.assertFalse(OGCard.objects.exists())
+        submit.assert_called_once()
+
+        version = get_content_version()
+        submit.call_args.args[0](*submit.call_args.args[1:])
+        self.assertTrue(OGCard.objects.exists())
+        self.assertNotEqual(get_content_version(), version)
+        response = self.client.get(f'/blog/{self.post.slug}', **crawler)
+        self.assertContains(response, f'<meta property="og:image" content="http://testserver{card_url(self.post)}"')
+
+    @override_settings(OG_CARD_ASYNC=False)
+    def test_crawler_hit_renders_inline_without_background_threads(self):
+        OGCard.objects.all().delete()
+        with mock.patch.object(og_cards._executor, 'submit') as submit:
+            self.client.get(f'/blog/{self.post.slug}', HTTP_USER_AGENT='WhatsApp/2.23')
+        submit.assert_not_called()
+        self.assertTrue(OGCard.objects.exists())
+
+    def test_featured_image_copy_still_gets_a_card(self):
+        # save() copies the featured image into the empty OG field
+        with mock.patch.object(og_cards, 'read_source', wraps=og_cards.read_source) as read:
+            with self.captureOnCommitCallbacks(execute=True):
+                project = Project.objects.create(
+                    title='Pictured', short_description='Short',
+                    featured_image_file=SimpleUploadedFile('featured.jpg', _jpeg((800, 600))),
+                )
+        self.assertEqual(project.og_image_file.name, project.featured_image_file.name)
+        self.assertFalse(og_cards.has_own_og_image(project))
+        read.assert_called_once_with(project.featured_image_file.name)
+        card = OGCard.objects.get(object_id=project.pk, content_type=ContentType.objects.get_for_model(Project))
+        response = self.client.get(f'/api/projects/{project.slug}/')
+        self.assertEqual(response.json()['og_image'], f'http://testserver{card.file.url}')
+
+        url = 'https://cdn.example.com/featured.jpg'
+        self.assertFalse(og_cards.has_own_og_image(BlogPost(featured_image_url=url, og_image_url=url)))
+
+    def test_own_og_image_wins(self):
+        self.post.og_image_url = 'https://cdn.example.com/og.jpg'
+        self.post.save()
+        self.assertIsNone(ensure_card(self.post))
+        response = self.client.get(f'/api/blog/{self.post.slug}/')
+        self.assertEqual(response.json()['og_image'], 'https://cdn.example.com/og.jpg')
+
+
+class MediaFilesMiddlewareTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.root = media.name
+        self.enterContext(override_settings(MEDIA_ROOT=self.root, MEDIA_SERVE=True))
+        self.write('images/logo.svg', b'<svg xmlns="http://www.w3.org/2000/svg">' + b'<g/>' * 500 + b'</svg>')
+        self.write('cas/ab/cd/abcd.png', _png((8, 8)))
+        call_command('compress_media', stdout=io.StringIO())
+        self.middleware = MediaFilesMiddleware(lambda request: HttpResponse('fallthrough', status=404))
+        self.factory = RequestFactory()
+
+    def write(self, name, data):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as fh:
+            fh.write(data)
+        return path
+
+    def get(self, url, **headers):
+        with self.assertNumQueries(0):
+            return self.middleware(self.factory.get(url, **headers))
+
+    def test_serves_indexed_files_with_caching_headers(self):
+        response = self.get('/portfolio_media/images/logo.svg')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+        self.assertEqual(response['Cache-Control'], 'max-age=3600, public')
+
+        response = self.get('/portfolio_media/cas/ab/cd/abcd.png')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.get('/portfolio_media/cas/ab/cd/abcd.png', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_precompressed_copy(self):
+        response = self.get('/portfolio_media/images/logo.svg', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertLess(int(response['Content-Length']), os.path.getsize(os.path.join(self.root, 'images/logo.svg')))
+
+    def test_files_added_and_removed_after_startup(self):
+        path = self.write('images/new.png', _png((4, 4)))
+        self.assertEqual(self.get('/portfolio_media/images/new.png').status_code, 200)
+        os.remove(path)
+        self.assertEqual(self.get('/portfolio_media/images/new.png').content, b'fallthrough')
+
+    def test_unknown_and_non_canonical_paths_fall_through(self):
+        self.assertEqual(self.get('/portfolio_media/missing.png').content, b'fallthrough')
+        self.assertEqual(self.get('/portfolio_media/images/../images/logo.svg').content, b'fallthrough')
+
+
+class MediaEndpointTests(TestCase):
+    data = bytes(range(256)) * 4
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.enterContext(mock.patch.object(default_storage, '_wrapped', storages.create_storage(storages.backends['default'])))
+        self.profile = Profile.get_profile()
+        self.profile.resume_file = SimpleUploadedFile('cv.pdf', self.data, content_type='application/pdf')
+        self.profile.save()
+        self.url = f'/api/profiles/{self.profile.pk}/resume/'
+
+    def test_full_file_and_revalidation(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.getvalue(), self.data)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        # The content-addressed name carries the digest: ETag and caching follow from it
+        self.assertTrue(self.profile.resume_file.name.startswith('cas/'))
+        self.assertIn(response['ETag'].strip('"'), self.profile.resume_file.name)
+        self.assertIn('immutable', response['Cache-Control'])
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+    def test_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 100-199/1024')
+        self.assertEqual(response.getvalue(), self.data[100:200])
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=-10').getvalue(), self.data[-10:])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_if_range(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag).status_code, 206)
+        # A stale If-Range gets the whole current file
+        stale = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(stale.getvalue(), self.data)
+
+    def test_plain_names_are_versioned_by_url(self):
+        # Uploaded before content addressing, or with CONTENT_ADDRESSED_MEDIA off
+        name = CachedURLFileSystemStorage().save('resumes/cv.pdf', io.BytesIO(b'first'))
+        Profile.objects.filter(pk=self.profile.pk).update(resume_file=name)
+        self.profile.refresh_from_db()
+        first = self.client.get(self.url)
+        self.assertIn('no-cache', first['Cache-Control'])
+
+        versioned = ProfileSerializer(self.profile, context={'request': RequestFactory().get('/')}).data['resume_url']
+        self.assertIn('?v=', versioned)
+        self.assertIn('immutable', self.client.get(versioned)['Cache-Control'])
+
+        # The same name rewritten with other content gets a new ETag
+        with open(default_storage.path(name), 'wb') as fh:
+            fh.write(b'second version')
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.getvalue(), b'second version')
+        # ... and a new token: the old URL is no longer cached as immutable
+        self.assertIn('no-cache', self.client.get(versioned)['Cache-Control'])
+        renewed = ProfileSerializer(self.profile, context={'request': RequestFactory().get('/')}).data['resume_url']
+        self.assertNotEqual(renewed, versioned)
+        self.assertIn('immutable', self.client.get(renewed)['Cache-Control'])
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name, IMAGE_VARIANTS=False))
+        self.storage = storages.create_storage(storages.backends['default'])
+        self.enterContext(mock.patch.object(default_storage, '_wrapped', self.storage))
+
+    def _certificate(self, data):
+        return Certificate.objects.create(
+            title='Cloud', issuing_organization='Org', issue_date='2024-01-01',
+            organization_logo_file=SimpleUploadedFile('logo.bin', data),
+        )
+
+    def test_identical_uploads_share_one_file(self):
+        first = self._certificate(b'same logo')
+        second = self._certificate(b'same logo')
+        other = self._certificate(b'another logo')
+        self.assertEqual(first.organization_logo_file.name, second.organization_logo_file.name)
+        self.assertNotEqual(first.organization_logo_file.name, other.organization_logo_file.name)
+        self.assertTrue(is_content_addressed(first.organization_logo_file.name))
+        self.assertEqual(MediaBlob.objects.count(), 2)
+        blob = MediaBlob.objects.get(name=first.organization_logo_file.name)
+        self.assertEqual(blob.size, len(b'same logo'))
+        self.assertEqual(self.storage.open(blob.name).read(), b'same logo')
+
+    def test_delete_keeps_shared_blobs_until_pruned(self):
+        first = self._certificate(b'same logo')
+        second = self._certificate(b'same logo')
+        name = first.organization_logo_file.name
+        first.organization_logo_file.delete()
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(second.organization_logo_file.read(), b'same logo')
+
+        def prune(*args):
+            out = io.StringIO()
+            call_command('prune_media', *args, stdout=out)
+            return out.getvalue()
+
+        # Still referenced by `second`; then unreferenced but too young
+        self.assertIn('0 blob(s)', prune('--min-age', '0'))
+        second.organization_logo_file.delete()
+        self.assertIn('0 blob(s)', prune())
+        self.assertIn(f'Would delete {name}', prune('--min-age', '0', '--dry-run'))
+        self.assertTrue(self.storage.exists(name))
+
+        self.assertIn(f'Deleting {name}', prune('--min-age', '0'))
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(MediaBlob.objects.exists())
+        # Uploading the content again writes it back
+        self.assertEqual(self._certificate(b'same logo').organization_logo_file.name, name)
+        self.assertTrue(self.storage.exists(name))
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name, IMAGE_VARIANT_WIDTHS=[320, 640, 960]))
+        self.enterContext(mock.patch.object(default_storage, '_wrapped', storages.create_storage(storages.backends['default'])))
+        cache.clear()
+
+    def _project(self, name, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Project.objects.create(
+                title=name, short_description='Short',
+                featured_image_file=SimpleUploadedFile(name, data),
+            )
+
+    def _variants(self, project):
+        return sorted(
+            ImageVariant.objects.filter(source=project.featured_image_file.name)
+            .values_list('format', 'width', 'height'),
+        )
+
+    def test_widths_and_formats(self):
+        project = self._project('wide.jpg', _jpeg((800, 600)))
+        # Every configured width below the original, plus the original width
+        self.assertEqual(self._variants(project), [
+            ('jpeg', 320, 240), ('jpeg', 640, 480), ('jpeg', 800, 600),
+            ('webp', 320, 240), ('webp', 640, 480), ('webp', 800, 600),
+        ])
+        self.assertEqual(self._variants(self._project('small.jpg', _jpeg((200, 100)))), [
+            ('jpeg', 200, 100), ('webp', 200, 100),
+        ])
+        # Larger than every width: the original is not repeated
+        self.assertEqual([w for f, w, h in self._variants(self._project('huge.jpg', _jpeg((1200, 300))))
+                          if f == 'webp'], [320, 640, 960])
+
+        buffer = io.BytesIO()
+        PILImage.new('RGBA', (400, 400), (255, 0, 0, 128)).save(buffer, 'PNG')
+        formats = {f for f, w, h in self._variants(self._project('alpha.png', buffer.getvalue()))}
+        self.assertEqual(formats, {'png', 'webp'})
+
+    def test_srcset_strings(self):
+        project = self._project('wide.jpg', _jpeg((800, 600)))
+        variants = {
+            (v.format, v.width): v.file.url for v in ImageVariant.objects.filter(source=project.featured_image_file.name)
+        }
+        expected = {
+            fmt: ', '.join(f'{variants[fmt, width]} {width}w' for width in (320, 640, 800)) for fmt in ('webp', 'jpeg')
+        }
+        self.assertEqual(srcset_for(project.featured_image_file), expected)
+        data = self.client.get('/api/projects/').json()['results'][0]
+        self.assertEqual(data['featured_image_srcset'], expected)
+
+        # Served from the cached map; none for external or missing images
+        with CaptureQueriesContext(connection) as ctx:
+            srcset_for(project.featured_image_file)
+        self.assertFalse(any('"api_imagevariant"' in q['sql'] for q in ctx.captured_queries))
+        self.assertIsNone(srcset_for(Project(featured_image_url='https://cdn.example.com/x.jpg').featured_image_file))
+        with override_settings(IMAGE_VARIANTS=False):
+            self.assertIsNone(srcset_for(project.featured_image_file))
+
+
+class ImageTransformTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.cache_dir = os.path.join(media.name, 'transform-cache')
+        self.enterContext(override_settings(
+            MEDIA_ROOT=media.name, IMAGE_VARIANTS=False, IMAGE_TRANSFORM_CACHE_DIR=self.cache_dir,
+            IMAGE_TRANSFORM_MAX_DIMENSION=1000,
+        ))
+        self.enterContext(mock.patch.object(default_storage, '_wrapped', storages.create_storage(storages.backends['default'])))
+        project = Project.objects.create(title='Shots', short_description='Short')
+        self.image = Image.objects.create(
+            filename='shot.png', image_file=SimpleUploadedFile('shot.png', _png((400, 300))),
+            content_type=ContentType.objects.get_for_model(project), object_id=project.pk,
+        )
+        self.url = f'/api/media/transform/{self.image.uuid}/'
+
+    def _size(self, response):
+        return PILImage.open(io.BytesIO(response.getvalue())).size
+
+    def test_parameter_validation(self):
+        self.assertEqual(
+            parse_params({'w': '640', 'fmt': 'JPG', 'fit': 'cover'}),
+            # cover needs both sides
+            {'w': 640, 'h': None, 'fit': 'contain', 'fmt': 'jpeg', 'q': settings.IMAGE_VARIANT_QUALITY},
+        )
+        self.assertEqual(parse_params({'w': '1', 'h': '1000', 'q': '100', 'fit': 'fill'})['fit'], 'fill')
+        for query in (
+            {}, {'w': 'wide'}, {'w': '0'}, {'h': '1001'}, {'w': '10', 'fit': 'crop'},
+            {'w': '10', 'fmt': 'gif'}, {'w': '10', 'q': '0'}, {'w': '10', 'q': '101'}, {'w': '10', 'q': 'best'},
+        ):
+            with self.subTest(query=query), self.assertRaises(TransformError):
+                parse_params(query)
+        response = self.client.get(self.url, {'w': '5000'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'w must be between 1 and 1000'})
+
+    def test_resizes_and_encodes(self):
+        response = self.client.get(self.url, {'w': 200})
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertEqual(self._size(response), (200, 150))
+        self.assertEqual(self._size(self.client.get(self.url, {'w': 100, 'h': 100, 'fit': 'cover'})), (100, 100))
+        self.assertEqual(self._size(self.client.get(self.url, {'w': 100, 'h': 100, 'fit': 'fill', 'fmt': 'png'})), (100, 100))
+        # contain never upscales
+        response = self.client.get(self.url, {'w': 800, 'fmt': 'jpeg'})
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(self._size(response), (400, 300))
+
+    def test_renderings_are_cached(self):
+        with mock.patch('api.transform.render', wraps=transform.render) as render:
+            first = self.client.get(self.url, {'w': 120, 'q': 70})
+            body = first.getvalue()
+            # Same normalized parameters: same file, rendered once
+            second = self.client.get(self.url, {'w': '120', 'q': '70', 'fmt': 'webp'})
+            revalidated = self.client.get(self.url, {'w': 120, 'q': 70}, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.client.get(self.url, {'w': 121, 'q': 70})
+        self.assertEqual(render.call_count, 2)
+        self.assertEqual(second.getvalue(), body)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+        files = [os.path.join(root, name) for root, _, names in os.walk(self.cache_dir) for name in names]
+        self.assertEqual(len(files), 2)
+        self.assertEqual(transform.evict(limit=0), 2)
+        self.assertEqual(self.client.get(self.url, {'w': 120, 'q': 70}).getvalue(), body)
+
+    def test_rewritten_source_is_rendered_again(self):
+        storage = CachedURLFileSystemStorage()
+        name = storage.save('images/reused.png', io.BytesIO(_png((400, 300))))
+        Image.objects.filter(pk=self.image.pk).update(image_file=name)
+        self.assertEqual(self._size(self.client.get(self.url, {'w': 100})), (100, 75))
+        with open(storage.path(name), 'wb') as fh:
+            fh.write(_png((200, 400)))
+        self.assertEqual(self._size(self.client.get(self.url, {'w': 100})), (100, 200))
+
+    def test_cache_is_walked_only_to_evict(self):
+        with mock.patch('api.transform._scan', wraps=transform._scan) as scan:
+            for width in (100, 110, 120):
+                self.client.get(self.url, {'w': width})
+            # Counted once, then tracked per write
+            self.assertEqual(scan.call_count, 1)
+            with override_settings(IMAGE_TRANSFORM_CACHE_SIZE=1):
+                params = parse_params({'w': '130'})
+                transform.get_transformed(self.image.image_file, params)
+            self.assertEqual(scan.call_count, 2)
+        self.assertEqual([name for _, _, names in os.walk(self.cache_dir) for name in names], [])
+        self.assertEqual(transform._usage[self.cache_dir], 0)
+
+    def test_external_images_redirect(self):
+        Image.objects.filter(pk=self.image.pk).update(image_file=None, image_url='https://cdn.example.com/shot.png')
+        response = self.client.get(self.url, {'w': 100})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], 'https://cdn.example.com/shot.png')
+
+
+class ImagePlaceholderTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name, IMAGE_VARIANTS=False, IMAGE_METADATA_ASYNC=False))
+        self.enterContext(mock.patch.object(default_storage, '_wrapped', storages.create_storage(storages.backends['default'])))
+        cache.clear()
+
+    def _red(self, size):
+        buffer = io.BytesIO()
+        PILImage.new('RGB', size, (200, 10, 10)).save(buffer, 'PNG')
+        return SimpleUploadedFile('red.png', buffer.getvalue())
+
+    def test_gallery_upload_gets_dimensions_and_placeholder(self):
+        project = Project.objects.create(title='Shots', short_description='Short')
+        with self.captureOnCommitCallbacks(execute=True):
+            image = Image.objects.create(
+                filename='red.png', image_file=self._red((64, 32)),
+                content_type=ContentType.objects.get_for_model(project), object_id=project.pk,
+            )
+        image.refresh_from_db()
+        self.assertEqual((image.width, image.height), (64, 32))
+
+        placeholder = placeholder_for(image.image_file)
+        self.assertEqual(
+            {k: placeholder[k] for k in ('width', 'height', 'aspect_ratio', 'color')},
+            {'width': 64, 'height': 32, 'aspect_ratio': 2.0, 'color': '#c80a0a'},
+        )
+        self.assertTrue(placeholder['lqip'].startswith('data:image/webp;base64,'))
+        data = self.client.get('/api/images/', {'object_id': project.pk}).json()['results'][0]
+        self.assertEqual(data['placeholder'], placeholder)
+        self.assertEqual((data['width'], data['height']), (64, 32))
+
+    def test_field_uploads_invalidate_responses(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            project = Project.objects.create(title='Red', short_description='Short')
+        response = self.client.get('/api/projects/')
+        self.assertIsNone(response.json()['results'][0]['featured_image_placeholder'])
+
+        version = get_content_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            project.featured_image_file = self._red((30, 60))
+            project.save()
+        self.assertNotEqual(get_content_version(), version)
+        placeholder = self.client.get('/api/projects/').json()['results'][0]['featured_image_placeholder']
+        self.assertEqual((placeholder['width'], placeholder['height'], placeholder['aspect_ratio']), (30, 60, 0.5))
+        # Unrelated saves do not recompute it
+        with mock.patch('api.placeholders.compute_metadata') as compute, self.captureOnCommitCallbacks(execute=True):
+            project.title = 'Still red'
+            project.save()
+        compute.assert_not_called()
+
+    @override_settings(IMAGE_METADATA_ASYNC=True)
+    def test_computed_in_the_background_after_commit(self):
+        with mock.patch.object(placeholders._executor, 'submit') as submit:
+            with self.captureOnCommitCallbacks(execute=True):
+                project = Project.objects.create(title='Red', short_description='Short', featured_image_file=self._red((8, 8)))
+                submit.assert_not_called()
+        submit.assert_called_once()
+        self.assertEqual(submit.call_args.args[1], {project.featured_image_file.name})
+        self.assertFalse(ImageMetadata.objects.exists())
+
+
+class StorageURLCacheTests(SimpleTestCase):
+    def test_urls_are_memoized_and_follow_media_url(self):
+        storage = CachedURLFileSystemStorage(url_cache_size=2)
+        self.assertEqual(storage.url('a.png'), '/portfolio_media/a.png')
+        storage.url('a.png')
+        self.assertEqual(storage.url.cache_info().hits, 1)
+
+        with override_settings(MEDIA_URL='/cdn/'):
+            self.assertEqual(storage.url('a.png'), '/cdn/a.png')
+        self.assertEqual(storage.url('a.png'), '/portfolio_media/a.png')
+
+    def test_disabled(self):
+        storage = CachedURLFileSystemStorage()
+        self.assertFalse(hasattr(storage.url, 'cache_info'))
+
+
+class OGMetaMiddlewareTests(TestCase):
+    crawler = {'HTTP_USER_AGENT': 'Slackbot-LinkExpanding 1.0'}
+
+    def setUp(self):
+        cache.clear()
+        self.post = BlogPost.objects.create(
+            title='Cached previews', excerpt='Excerpt', content='Body', status='published',
+            og_image_url='https://cdn.example.com/og.jpg',
+        )
+        self.url = f'/blog/{self.post.slug}'
+
+    @shared_cache
+    def test_repeated_crawler_hits_are_served_from_cache(self):
+        first = self.client.get(self.url, **self.crawler)
+        self.assertContains(first, '<title>Cached previews | ')
+        self.assertTrue(first.has_header('Last-Modified'))
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url, **self.crawler)
+            revalidated = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'], **self.crawler)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_edits_invalidate_the_page(self):
+        etag = self.client.get(self.url, **self.crawler)['ETag']
+        self.post.meta_title = 'Renamed'
+        self.post.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag, **self.crawler)
+        self.assertContains(response, '<title>Renamed | ')
+
+    @shared_cache
+    def test_unknown_slugs_fall_through_once(self):
+        self.client.get('/blog/missing', **self.crawler)
+        with self.assertNumQueries(0):
+            self.client.get('/blog/missing', **self.crawler)
+
+    def test_non_content_paths_skip_the_user_agent_check(self):
+        _is_crawler.cache_clear()
+        for path in ('/api/portfolio-data/', '/admin/', '/blog', '/blog/a/b'):
+            self.client.get(path, **self.crawler)
+        self.assertEqual(_is_crawler.cache_info().misses, 0)
+        self.client.get(self.url, HTTP_USER_AGENT='Mozilla/5.0')
+        self.client.get(self.url, HTTP_USER_AGENT='Mozilla/5.0')
+        self.assertEqual(_is_crawler.cache_info()[:2], (1, 1))
+
+    def test_route_table_covers_detail_pages(self):
+        self.assertEqual(match_route('/projects/demo/')[1]['slug'], 'demo')
+        self.assertEqual(match_route('/experience/7')[1]['pk'], '7')
+        self.assertIsNone(match_route('/experience/demo'))
+        self.assertIsNone(match_route('/api/blog/demo/'))
+
+        certificate = Certificate.objects.create(
+            title='Cloud Architect', issuing_organization='Example Org', issue_date='2024-01-01',
+            certificate_image_url='https://cdn.example.com/cert.png',
+        )
+        response = self.client.get(f'/certificates/{certificate.slug}', **self.crawler)
+        self.assertContains(response, '<title>Cloud Architect | Certificates | ')
+        self.assertContains(response, 'Issued by Example Org')
+        self.assertContains(response, 'content="https://cdn.example.com/cert.png"')
+
+        job = WorkExperience.objects.create(
+            company_name='Acme', job_title='Engineer', start_date='2023-01-01', description='Built things',
+        )
+        response = self.client.get(f'/experience/{job.pk}/', **self.crawler)
+        self.assertContains(response, '<title>Engineer at Acme | Experience | ')
+
+    def test_hidden_content_falls_through(self):
+        testimonial = Testimonial.objects.create(
+            author_name='Ada', author_title='CTO', content='Great', is_visible=False,
+        )
+        response = self.client.get(f'/testimonials/{testimonial.slug}', **self.crawler)
+        self.assertNotContains(response, 'og:title', status_code=response.status_code)
+
+
+def _gallery_image(obj, name):
+    return Image.objects.create(
+        filename=name, image_url=f'https://cdn.example.com/{name}',
+        content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk,
+    )
+
+
+class ImageLoaderTests(TestCase):
+    def setUp(self):
+        self.jobs = [
+            WorkExperience.objects.create(company_name=f'Co {i}', job_title='Dev', start_date='2020-01-01', description='x')
+            for i in range(3)
+        ]
+        self.degree = Education.objects.create(institution='Uni', degree='BSc', field_of_study='CS', start_date='2015-09-01')
+        for job in self.jobs[:2]:
+            _gallery_image(job, f'job-{job.pk}.png')
+        _gallery_image(self.degree, 'degree.png')
+
+    def test_one_query_across_content_types(self):
+        loader = ImageLoader()
+        with self.assertNumQueries(1):
+            loader.prime(self.jobs + [self.degree])
+        with self.assertNumQueries(0):
+            self.assertEqual([i.filename for i in self.degree.images.all()], ['degree.png'])
+            self.assertEqual(self.jobs[2].images.all()._result_cache, [])
+            self.assertEqual(len(loader.get(self.jobs[0])), 1)
+
+    def test_request_scoped(self):
+        request = RequestFactory().get('/')
+        self.assertIs(ImageLoader.for_request(request), ImageLoader.for_request(request))
+        self.assertIsNot(ImageLoader.for_request(None), ImageLoader.for_request(None))
+
+    def test_list_queries_do_not_grow_with_rows(self):
+        def queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get('/api/work-experience/', {'expand': 'images'})
+            self.assertEqual(response.status_code, 200)
+            return [q['sql'] for q in ctx.captured_queries]
+
+        queries()  # warm the content type cache
+        before = queries()
+        for i in range(5):
+            job = WorkExperience.objects.create(company_name=f'More {i}', job_title='Dev', start_date='2021-01-01', description='x')
+            _gallery_image(job, f'more-{i}.png')
+        after = queries()
+        self.assertEqual(len(after), len(before))
+        self.assertEqual(sum('FROM "api_image"' in sql for sql in after), 1)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        base = timezone.make_aware(datetime(2026, 1, 1))
+        for i in range(7):
+            # Two posts share each date, so the id breaks ties
+            BlogPost.objects.create(
+                title=f'Post {i}', content='x', status='published', published_at=base + timedelta(days=i // 2),
+            )
+
+    def _page(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cursor_round_trip_matches_offset_order(self):
+        offset = [p['slug'] for p in self._page('/api/blog/', {'limit': 100})['results']]
+
+        forward, pages = [], []
+        data = self._page('/api/blog/', {'cursor': '', 'limit': 3})
+        self.assertIsNone(data['previous'])
+        self.assertNotIn('count', data)
+        while True:
+            pages.append(data)
+            forward += [p['slug'] for p in data['results']]
+            if not data['next']:
+                break
+            data = self._page(data['next'])
+        self.assertEqual(forward, offset)
+        self.assertEqual([len(p['results']) for p in pages], [3, 3, 1])
+
+        # Walking back from the last page returns the same pages
+        back = self._page(pages[-1]['previous'])
+        self.assertEqual(back['results'], pages[-2]['results'])
+        first = self._page(back['previous'])
+        self.assertEqual(first['results'], pages[0]['results'])
+        self.assertIsNone(first['previous'])
+
+    def test_count_and_limit_offset_still_work(self):
+        self.assertEqual(self._page('/api/blog/', {'cursor': '', 'count': 'true'})['count'], 7)
+        self.assertEqual(self._page('/api/blog/', {'limit': 2, 'offset': 2})['count'], 7)
+
+    def test_invalid_cursor_is_404(self):
+        for cursor in ['not-base64!', 'eyJ2IjpbMV19', 'eyJ4IjoxfQ']:  # garbage, wrong arity, no values
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get('/api/blog/', {'cursor': cursor}).status_code, 404)
+
+    def test_published_posts_always_have_a_position(self):
+        post = BlogPost.objects.first()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            BlogPost.objects.filter(pk=post.pk).update(published_at=None)
+        # Saving fills it in instead
+        post.published_at = None
+        post.save()
+        self.assertIsNotNone(post.published_at)
+
+
+class CompiledSerializerTests(TestCase):
+    """The compiled fast path must render the same JSON as the DRF serializers."""
+
+    def setUp(self):
+        profile = Profile.get_profile()
+        SocialLink.objects.create(platform='github', url='https://github.com/example')
+        Skill.objects.create(name='Python')
+        Education.objects.create(institution='Uni', degree='BSc', field_of_study='CS', start_date='2015-09-01')
+        WorkExperience.objects.create(company_name='Acme', job_title='Engineer', start_date='2020-01-01', description='Built')
+        Certificate.objects.create(
+            title='Cloud', issuing_organization='Org', issue_date='2024-01-01', certificate_image_url='https://cdn.example.com/c.png',
+        )
+        Achievement.objects.create(title='Award', date='2023-05-01')
+        Testimonial.objects.create(author_name='Ada', author_title='CTO', content='Great')
+
+        # One project with a file image and a gallery image, one with neither
+        project = Project.objects.create(
+            title='Full', short_description='Short', description='Long', technologies='Django',
+            featured_image_file=SimpleUploadedFile('full.jpg', _jpeg((64, 48)), content_type='image/jpeg'),
+        )
+        Image.objects.create(
+            filename='shot.png', image_url='https://cdn.example.com/shot.png', width=640, height=480,
+            content_object=project, content_type=ContentType.objects.get_for_model(Project), object_id=project.pk,
+        )
+        Project.objects.create(title='Bare', short_description='Short', description='Long', technologies='')
+
+        category = BlogCategory.objects.create(name='Python')
+        tag = BlogTag.objects.create(name='Django')
+        tagged = BlogPost.objects.create(title='Tagged', content='# Hi', status='published', category=category)
+        tagged.tags.set([tag])
+        # No category, no tags, no profile, no published_at
+        bare = BlogPost.objects.create(title='Bare', content='Body')
+        BlogPost.objects.filter(pk=bare.pk).update(profile=None, published_at=None)
+        self.profile = profile
+
+    def _assert_same(self, serializer_class, queryset):
+        render = JSONRenderer().render
+        request = RequestFactory().get('/api/')
+        context = {'request': request}
+        instances = list(queryset)
+        self.assertTrue(instances)
+        compile_serializer(serializer_class)  # raises if this path would fall back to DRF
+
+        expected = render(serializer_class(instances, many=True, context=context).data)
+        self.assertEqual(render(get_list_serializer(serializer_class, instances, context=context).data), expected)
+        for instance in instances:
+            self.assertEqual(
+                render(serialize_instance(serializer_class, instance, context=context)),
+                render(serializer_class(instance, context=context).data),
+            )
+
+    def test_every_serializer(self):
+        cases = [
+            (ImageSerializer, Image.objects.all()),
+            (SocialLinkSerializer, SocialLink.objects.all()),
+            (SkillSerializer, Skill.objects.all()),
+            (ProfileSerializer, Profile.objects.all()),
+            (ProfileDetailSerializer, Profile.objects.prefetch_related('social_links', 'skills')),
+            (EducationSerializer, Education.objects.all()),
+            (WorkExperienceSerializer, WorkExperience.objects.all()),
+            (ProjectSerializer, Project.objects.all()),
+            (ProjectDetailSerializer, Project.objects.all()),
+            (CertificateSerializer, Certificate.objects.all()),
+            (AchievementSerializer, Achievement.objects.all()),
+            (BlogCategorySerializer, BlogCategory.objects.all()),
+            (BlogTagSerializer, BlogTag.objects.all()),
+            (BlogPostListSerializer, BlogPost.objects.select_related('category', 'profile').prefetch_related('tags')),
+            (BlogPostSerializer, BlogPost.objects.all()),
+            (BlogPostDetailSerializer, BlogPost.objects.all()),
+            (TestimonialSerializer, Testimonial.objects.all()),
+        ]
+        for serializer_class, queryset in cases:
+            with self.subTest(serializer_class.__name__):
+                self._assert_same(serializer_class, queryset)
+
+    def test_expanded_and_collapsed_shapes(self):
+        shapes = [(), ('*',), ('category',), ('tags',), ('images',), ('category', 'tags', 'images')]
+        for serializer_class in [BlogPostListSerializer, BlogPostDetailSerializer, ProjectDetailSerializer, CertificateSerializer]:
+            model = serializer_class.Meta.model
+            for expand in shapes:
+                with self.subTest(serializer_class.__name__, expand=expand):
+                    self._assert_same(get_expanded_serializer(serializer_class, expand), model.objects.all())
+
+        data = get_list_serializer(
+            get_expanded_serializer(BlogPostListSerializer, ()), BlogPost.objects.order_by('title'),
+        ).data
+        self.assertEqual([post['tags'] for post in data], [[], [BlogTag.objects.get().pk]])
+        self.assertEqual(data[0]['category'], None)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tag = BlogTag.objects.create(name='Django')
+        self.post = BlogPost.objects.create(title='Validated', content='Body', status='published')
+        self.url = f'/api/blog/{self.post.slug}/'
+
+    def test_list_and_detail_revalidate(self):
+        for url in ('/api/blog/', self.url):
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, 200)
+            self.assertIn('no-cache', first['Cache-Control'])
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code, 304)
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_etag_changes_on_save_and_tag_change(self):
+        etags = [self.client.get(self.url)['ETag']]
+        self.post.title = 'Validated again'
+        self.post.save()
+        etags.append(self.client.get(self.url)['ETag'])
+        self.post.tags.set([self.tag])
+        etags.append(self.client.get(self.url)['ETag'])
+        self.assertEqual(len(set(etags)), 3)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etags[0])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['tags'], [self.tag.pk])
+
+    def test_version_is_shared_through_the_database(self):
+        first = self.client.get('/api/portfolio-data/')
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                self.client.get('/api/portfolio-data/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304,
+            )
+        # A save made by another process: no signal runs here and this
+        # process's cache is left alone
+        Project.objects.bulk_create([Project(title='Elsewhere', slug='elsewhere', short_description='Short')])
+        with mock.patch('api.conditional.cache'):
+            bump_content_version()
+        revalidated = self.client.get('/api/portfolio-data/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertNotEqual(revalidated['ETag'], first['ETag'])
+        self.assertEqual([p['title'] for p in revalidated.json()['projects']], ['Elsewhere'])
+
+    @shared_cache
+    def test_shared_cache_revalidates_without_queries(self):
+        first = self.client.get('/api/portfolio-data/')
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.client.get('/api/portfolio-data/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304,
+            )
+        # An evicted version is read back from the database rather than restarted
+        version = get_content_version()
+        cache.clear()
+        self.assertEqual(get_content_version(), version)
+
+
+class ExpandTests(TestCase):
+    def setUp(self):
+        self.category = BlogCategory.objects.create(name='Python')
+        self.tags = [BlogTag.objects.create(name='Django'), BlogTag.objects.create(name='ORM')]
+        self.post = BlogPost.objects.create(title='Expanded', content='Body', status='published', category=self.category)
+        self.post.tags.set(self.tags)
+        self.job = WorkExperience.objects.create(company_name='Acme', job_title='Dev', start_date='2020-01-01', description='x')
+        _gallery_image(self.job, 'office.png')
+
+    def _get(self, url, expand=None):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {'expand': expand} if expand else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json(), [q['sql'] for q in ctx.captured_queries]
+
+    def test_post_relations_collapse_to_ids(self):
+        self._get('/api/blog/')  # warm the content type cache
+        data, queries = self._get('/api/blog/')
+        post = data['results'][0]
+        self.assertEqual(post['category'], self.category.pk)
+        self.assertEqual(sorted(post['tags']), sorted(t.pk for t in self.tags))
+        self.assertFalse(any('"api_blogcategory"' in sql for sql in queries))
+        self.assertFalse(any('"api_blogtag"."slug"' in sql for sql in queries))
+
+        for expand in ('category,tags', '*'):
+            post = self._get('/api/blog/', expand)[0]['results'][0]
+            self.assertEqual(post['category']['slug'], 'python')
+            self.assertEqual(sorted(t['slug'] for t in post['tags']), ['django', 'orm'])
+        post = self._get('/api/blog/', 'tags')[0]['results'][0]
+        self.assertEqual(post['category'], self.category.pk)
+        self.assertEqual(len(post['tags'][0]), len(BlogTagSerializer(self.tags[0]).data))
+
+    def test_images_collapse_to_the_filtered_list(self):
+        job = self._get('/api/work-experience/')[0]['results'][0]
+        content_type = ContentType.objects.get_for_model(WorkExperience)
+        self.assertEqual(
+            job['images'], f'http://testserver/api/images/?content_type={content_type.pk}&object_id={self.job.pk}',
+        )
+        self.assertEqual(self.client.get(job['images']).json()['results'][0]['filename'], 'office.png')
+        job = self._get('/api/work-experience/', 'images')[0]['results'][0]
+        self.assertEqual([image['filename'] for image in job['images']], ['office.png'])
+
+        detail = self.client.get(f'/api/blog/{self.post.slug}/').json()
+        self.assertIsInstance(detail['images'], str)
+        self.assertEqual(self.client.get(f'/api/blog/{self.post.slug}/', {'expand': '*'}).json()['images'], [])
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        shapes = [('/api/blog/', None), ('/api/blog/', 'category,tags'), ('/api/blog/', '*'),
+                  ('/api/work-experience/', None), ('/api/work-experience/', 'images')]
+        self._get('/api/blog/')  # warm the content type cache
+        before = [len(self._get(url, expand)[1]) for url, expand in shapes]
+        for i in range(4):
+            post = BlogPost.objects.create(title=f'More {i}', content='Body', status='published', category=self.category)
+            post.tags.set(self.tags)
+            job = WorkExperience.objects.create(company_name=f'Co {i}', job_title='Dev', start_date='2021-01-01', description='x')
+            _gallery_image(job, f'more-{i}.png')
+        after = [len(self._get(url, expand)[1]) for url, expand in shapes]
+        self.assertEqual(after, before)
+        # Collapsed lists skip the category join and the image query
+        self.assertLess(before[0], before[1])
+        self.assertLess(before[3], before[4])
+
+
+class OGPrerenderTests(TestCase):
+    crawler = {'HTTP_USER_AGENT': 'WhatsApp/2.23'}
+
+    def setUp(self):
+        cache.clear()
+        pages = tempfile.TemporaryDirectory()
+        self.addCleanup(pages.cleanup)
+        self.root = pages.name
+        self.enterContext(override_settings(
+            OG_PRERENDER=True, OG_PRERENDER_BASE_URL='https://example.com', OG_PRERENDER_DIR=self.root, OG_CARDS=False,
+        ))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post = BlogPost.objects.create(title='Prerendered', excerpt='Excerpt', content='Body', status='published')
+        self.file = os.path.join(self.root, 'blog', f'{self.post.slug}.html')
+
+    def test_publishing_writes_the_page(self):
+        with open(self.file, encoding='utf-8') as f:
+            html = f.read()
+        self.assertIn('<title>Prerendered | ', html)
+        self.assertIn(f'href="https://example.com/blog/{self.post.slug}"', html)
+
+    def test_crawlers_get_the_file_without_queries(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/blog/{self.post.slug}/', **self.crawler)
+            direct = self.client.get(f'/og/blog/{self.post.slug}.html')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'<title>Prerendered | ', b''.join(response.streaming_content))
+        self.assertEqual(direct['ETag'], response['ETag'])
+
+    def test_unpublishing_and_deleting_remove_pages(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            project = Project.objects.create(title='Demo', short_description='Short', description='Long')
+        project_file = os.path.join(self.root, 'projects', f'{project.slug}.html')
+        self.assertTrue(os.path.exists(project_file))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.status = 'draft'
+            self.post.save()
+            project.delete()
+        self.assertFalse(os.path.exists(self.file))
+        self.assertFalse(os.path.exists(project_file))
+        response = self.client.get(f'/blog/{self.post.slug}', **self.crawler)
+        self.assertNotContains(response, 'og:title', status_code=response.status_code)
+
+    def test_admin_bulk_actions_and_renames_update_pages(self):
+        from .admin import BlogPostAdmin, portfolio_admin_site
+        post_admin = BlogPostAdmin(BlogPost, portfolio_admin_site)
+        posts = BlogPost.objects.filter(pk=self.post.pk)
+        version = get_content_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            post_admin.make_draft(None, posts)
+        self.assertFalse(os.path.exists(self.file))
+        self.assertNotEqual(get_content_version(), version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post_admin.make_published(None, posts)
+        self.assertTrue(os.path.exists(self.file))
+        self.assertIsNotNone(posts.get().published_at)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post = posts.get()
+            post.slug = 'renamed'
+            post.save()
+        self.assertFalse(os.path.exists(self.file))
+        self.assertTrue(os.path.exists(os.path.join(self.root, 'blog', 'renamed.html')))
+
+    def test_rebuild_removes_stale_files(self):
+        stale = os.path.join(self.root, 'blog', 'renamed.html')
+        with open(stale, 'w') as f:
+            f.write('old')
+        os.remove(self.file)
+        call_command('prerender_og_pages', stdout=io.StringIO())
+        self.assertTrue(os.path.exists(self.file))
+        self.assertFalse(os.path.exists(stale))
+
+
+class SitemapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.enterContext(mock.patch.dict(os.environ, {'FRONTEND_URL': 'https://example.com'}))
+        self.post = BlogPost.objects.create(title='Mapped', excerpt='Excerpt', content='Body', status='published')
+        BlogPost.objects.create(title='Draft', excerpt='Excerpt', content='Body', status='draft')
+
+    def test_index_lists_a_child_per_route(self):
+        response = self.client.get('/sitemap.xml')
+        self.assertEqual(response['Content-Type'], 'application/xml; charset=utf-8')
+        for section in ('pages', 'blog', 'projects', 'certificates', 'experience'):
+            # Children are served by the backend only, not under FRONTEND_URL
+            self.assertContains(response, f'<loc>http://testserver/sitemap-{section}.xml</loc>')
+        with override_settings(BACKEND_BASE_URL='https://api.example.com'):
+            response = self.client.get('/sitemap.xml')
+        self.assertContains(response, '<loc>https://api.example.com/sitemap-blog.xml</loc>')
+
+    def test_children_list_public_content_with_lastmod(self):
+        response = self.client.get('/sitemap-blog.xml')
+        lastmod = self.post.updated_at.isoformat(timespec='seconds')
+        self.assertContains(
+            response, f'<url><loc>https://example.com/blog/{self.post.slug}</loc><lastmod>{lastmod}</lastmod></url>',
+        )
+        self.assertNotContains(response, 'draft')
+        self.assertEqual(self.client.get('/sitemap-blog-2.xml').status_code, 404)
+        self.assertEqual(self.client.get('/sitemap-unknown.xml').status_code, 404)
+
+    @shared_cache
+    def test_cached_until_content_changes(self):
+        first = self.client.get('/sitemap-blog.xml')
+        with self.assertNumQueries(0):
+            revalidated = self.client.get('/sitemap-blog.xml', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        BlogPost.objects.create(title='Another', excerpt='Excerpt', content='Body', status='published')
+        self.assertContains(self.client.get('/sitemap-blog.xml', HTTP_IF_NONE_MATCH=first['ETag']), '/blog/another<')
+
+
+class BlogFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.enterContext(mock.patch.dict(os.environ, {'FRONTEND_URL': 'https://example.com'}))
+        category = BlogCategory.objects.create(name='Engineering')
+        self.post = BlogPost.objects.create(
+            title='Fed', excerpt='Feed excerpt', content='Body', status='published', category=category,
+        )
+        BlogPost.objects.create(title='Unpublished', excerpt='Excerpt', content='Body', status='draft')
+
+    def test_formats(self):
+        rss = self.client.get('/api/blog/feed.rss')
+        self.assertEqual(rss['Content-Type'], 'application/rss+xml; charset=utf-8')
+        self.assertContains(rss, f'<link>https://example.com/blog/{self.post.slug}</link>')
+        self.assertContains(rss, '<category>Engineering</category>')
+        self.assertNotContains(rss, 'Unpublished')
+
+        atom = self.client.get('/api/blog/feed.atom')
+        self.assertContains(atom, '<summary type="html">Feed excerpt</summary>')
+
+        feed = self.client.get('/api/blog/feed.json').json()
+        self.assertEqual(feed['version'], 'https://jsonfeed.org/version/1.1')
+        self.assertEqual([item['title'] for item in feed['items']], ['Fed'])
+        self.assertEqual(self.client.get('/api/blog/feed.xml').status_code, 404)
+
+    @shared_cache
+    def test_polling_is_cached_until_a_post_changes(self):
+        first = self.client.get('/api/blog/feed.rss')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/blog/feed.rss').content, first.content)
+            revalidated = self.client.get('/api/blog/feed.rss', HTTP_IF_NONE_MATCH=first['ETag'])
+            since = self.client.get('/api/blog/feed.rss', HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual((revalidated.status_code, since.status_code), (304, 304))
+
+        self.post.increment_views()
+        self.assertEqual(self.client.get('/api/blog/feed.rss', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        self.post.title = 'Renamed'
+        self.post.save()
+        self.assertContains(self.client.get('/api/blog/feed.rss', HTTP_IF_NONE_MATCH=first['ETag']), 'Renamed')
+
+
+class MarkdownRenderingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.post = BlogPost.objects.create(
+            title='Rendered', excerpt='Excerpt', status='published',
+            content='## Setup *first*\n\nRun it <script>alert(1)</script>\n\n### Install\n\n[x](javascript:alert(1))',
+        )
+
+    def test_rendered_once_per_content_version(self):
+        self.assertIn('<h2 id="setup-first">Setup <em>first</em>', self.post.content_html)
+        self.assertNotIn('script', self.post.content_html)
+        self.assertNotIn('javascript:', self.post.content_html)
+        self.assertEqual(self.post.content_toc, [{
+            'level': 2, 'id': 'setup-first', 'name': 'Setup first',
+            'children': [{'level': 3, 'id': 'install', 'name': 'Install', 'children': []}],
+        }])
+        with mock.patch('api.models.render_markdown', return_value=('<h2>Changed</h2>', [])) as render:
+            self.post.meta_title = 'Edited'
+            self.post.save()
+            self.post.increment_views()
+            render.assert_not_called()
+            self.post.content = '## Changed'
+            self.post.save(update_fields=['content'])
+            render.assert_called_once()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.content_html, '<h2>Changed</h2>')
+
+    def test_detail_serves_the_stored_html(self):
+        with mock.patch('api.models.render_markdown') as render:
+            data = self.client.get(f'/api/blog/{self.post.slug}/').json()
+            render.assert_not_called()
+        self.assertEqual(data['content_html'], self.post.content_html)
+        self.assertEqual(data['toc'][0]['id'], 'setup-first')
+
+
+class PostStatsTests(TestCase):
+    CONTENT = '## Intro\n\n' + 'word ' * 459 + '\n\n```python\nprint(1)\n```\n\n[link text](https://example.com/a-b-c)'
+
+    def test_computed_on_save(self):
+        content = self.CONTENT
+        post = BlogPost.objects.create(title='Long', content=content)
+        self.assertEqual(post.word_count, 1 + 459 + 2)
+        self.assertEqual(post.reading_time, 3)
+        self.assertTrue(post.excerpt.startswith('Intro word word'))
+        self.assertLessEqual(len(post.excerpt), 300)
+        self.assertEqual(post.meta_description, post.excerpt[:160])
+
+        post.excerpt = 'Hand written'
+        post.reading_time = 9
+        with mock.patch('api.models.measure_markdown') as measure:
+            post.save()
+            measure.assert_not_called()
+        self.assertEqual((post.excerpt, post.reading_time), ('Hand written', 9))
+
+    def test_migration_measures_existing_posts(self):
+        backfill = importlib.import_module('api.migrations.0015_backfill_post_stats')
+        content = self.CONTENT
+        post = BlogPost.objects.create(title='Old', excerpt='Kept', content=content)
+        BlogPost.objects.filter(pk=post.pk).update(word_count=0, reading_time=12)
+        backfill.measure_existing_posts(django_apps, None)
+        post.refresh_from_db()
+        stats = measure_markdown(content)
+        self.assertEqual((post.word_count, post.reading_time), (stats.word_count, stats.reading_time))
+
+    def test_unmatched_delimiters_stay_linear(self):
+        # Every unmatched `<`, `![` and `](` used to rescan to the end of the post.
+        content = 'a < b ![c ](d ' * 20000
+        started = time.monotonic()
+        stats = measure_markdown(content)
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(stats.word_count, 20000 * 6)
+        self.assertEqual(measure_markdown('a <b>bold</b> ![alt](x.png) [t](u) c').word_count, 4)
+
+    def test_recompute_command(self):
+        post = BlogPost.objects.create(title='Old', excerpt='Kept', content='one two three')
+        BlogPost.objects.filter(pk=post.pk).update(word_count=0, reading_time=12)
+        blank = BlogPost.objects.create(title='Blank', content='four five')
+        BlogPost.objects.filter(pk=blank.pk).update(excerpt='')
+        out = io.StringIO()
+        call_command('recompute_post_stats', chunk_size=1, stdout=out)
+        self.assertIn('Updated 2 of 2', out.getvalue())
+        post.refresh_from_db()
+        blank.refresh_from_db()
+        self.assertEqual((post.word_count, post.reading_time, post.excerpt), (3, 1, 'Kept'))
+        self.assertEqual(blank.excerpt, 'four five')
+
+
+@override_settings(RELATED_CONTENT_ASYNC=False)
+class RelatedContentTests(TestCase):
+    def setUp(self):
+        self.django = BlogTag.objects.create(name='Django', slug='django')
+        self.cooking = BlogTag.objects.create(name='Cooking', slug='cooking')
+
+    def _post(self, title, content, tags=()):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = BlogPost.objects.create(title=title, content=content, status='published')
+            post.tags.set(tags)
+        return post
+
+    def _related(self, source):
+        return list(RelatedPost.objects.filter(source=source).values_list('target__title', flat=True))
+
+    def test_refreshed_on_save_and_delete(self):
+        orm = self._post('Django ORM tips', 'Querysets, select_related and prefetch in Django.', [self.django])
+        views = self._post('Django class based views', 'Generic views and mixins in Django.', [self.django])
+        bread = self._post('Sourdough bread', 'Flour, water, salt and a starter.', [self.cooking])
+        self.assertEqual(self._related(orm), ['Django class based views'])
+        self.assertEqual(self._related(views), ['Django ORM tips'])
+        self.assertEqual(self._related(bread), [])
+
+        # A newcomer enters the lists of existing posts
+        signals = self._post('Django signals', 'post_save, querysets and prefetch in Django.', [self.django])
+        self.assertEqual(self._related(orm), ['Django signals', 'Django class based views'])
+        self.assertEqual(self._related(signals)[0], 'Django ORM tips')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            signals.delete()
+        self.assertEqual(self._related(orm), ['Django class based views'])
+
+        # Unpublished posts leave every list
+        with self.captureOnCommitCallbacks(execute=True):
+            views.status = 'draft'
+            views.save()
+        self.assertEqual(self._related(orm), [])
+        self.assertFalse(RelatedPost.objects.filter(source=views).exists())
+
+    @shared_cache
+    def test_endpoint_is_one_join(self):
+        orm = self._post('Django ORM tips', 'Querysets in Django.', [self.django])
+        self._post('Django views', 'Views in Django.', [self.django])
+        self._post('Django forms', 'Forms and querysets in Django.', [self.django])
+        url = f'/api/blog/{orm.slug}/related/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['title'] for p in response.json()], ['Django forms', 'Django views'])
+        # The source's existence, ETag aggregate, the posts join and the tags prefetch
+        with self.assertNumQueries(4):
+            self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.client.get('/api/blog/missing/related/').status_code, 404)
+        self.assertEqual(self.client.get('/api/projects/missing/related/').status_code, 404)
+
+    def test_saves_queued_meanwhile_share_one_refresh(self):
+        with mock.patch.object(related._executor, 'submit') as submit, \
+                override_settings(RELATED_CONTENT_ASYNC=True):
+            orm = self._post('Django ORM tips', 'Querysets in Django.', [self.django])
+            views = self._post('Django views', 'Views and querysets in Django.', [self.django])
+        # Queued after commit, not refreshed in the saving request
+        submit.assert_called_once()
+        self.assertFalse(RelatedPost.objects.exists())
+        with mock.patch('api.related.refresh', wraps=related.refresh) as refresh:
+            submit.call_args.args[0](*submit.call_args.args[1:])
+        refresh.assert_called_once()
+        self.assertEqual(set(refresh.call_args.args[1]), {orm.pk, views.pk})
+        self.assertEqual(self._related(orm), ['Django views'])
+        self.assertEqual(self._related(views), ['Django ORM tips'])
+
+    def test_projects_and_rebuild(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            api = Project.objects.create(title='Shop API', short_description='REST backend', description='Orders', technologies='Django, PostgreSQL')
+            Project.objects.create(title='Blog engine', short_description='CMS', description='Posts', technologies='django, Redis')
+            Project.objects.create(title='Game', short_description='Arcade', description='Sprites', technologies='Unity')
+        response = self.client.get(f'/api/projects/{api.slug}/related/')
+        self.assertEqual([p['title'] for p in response.json()], ['Blog engine'])
+
+        RelatedProject.objects.all().delete()
+        out = io.StringIO()
+        call_command('rebuild_related', stdout=out)
+        self.assertIn('Related content rebuilt', out.getvalue())
+        self.assertEqual(list(RelatedProject.objects.filter(source=api).values_list('target__title', flat=True)), ['Blog engine'])
+
+
+class PopularPostsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.old = BlogPost.objects.create(title='Old favourite', content='a', status='published')
+        self.new = BlogPost.objects.create(title='New hit', content='b', status='published')
+
+    def _views(self, post, count, days_ago):
+        when = timezone.now() - timedelta(days=days_ago)
+        for _ in range(count):
+            popularity.record_view(post.pk, when)
+
+    def _titles(self, window):
+        cache.clear()
+        response = self.client.get('/api/blog/popular/', {'window': window})
+        self.assertEqual(response.status_code, 200)
+        return [p['title'] for p in response.json()]
+
+    def test_recent_views_outweigh_old_ones(self):
+        self._views(self.old, 20, days_ago=40)
+        self._views(self.new, 3, days_ago=0)
+        self.assertEqual(BlogPostViewDay.objects.get(post=self.old).views, 20)
+        self.assertEqual(self._titles('7d'), ['New hit'])
+        self.assertEqual(self._titles('90d'), ['Old favourite', 'New hit'])
+        # 20 views ~6 half-lives ago weigh less than 3 today
+        self.assertEqual(self._titles('all'), ['New hit', 'Old favourite'])
+        self.assertEqual(self.client.get('/api/blog/popular/', {'window': '2w'}).status_code, 400)
+
+    @shared_cache
+    def test_served_from_precomputed_ranking(self):
+        self._views(self.new, 1, days_ago=0)
+        response = self.client.get('/api/blog/popular/')
+        # The ranking is reused: only the posts and their tags are fetched
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get('/api/blog/popular/').json(), response.json())
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/blog/popular/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_detail_views_are_recorded(self):
+        url = f'/api/blog/{self.new.slug}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.new.refresh_from_db()
+        self.assertEqual(self.new.views_count, 2)
+        self.assertEqual(BlogPostViewDay.objects.get(post=self.new).views, 2)
+        self.assertGreater(self.new.popularity, 0)
+
+    def test_rebuild_command(self):
+        self._views(self.old, 2, days_ago=200)
+        self._views(self.new, 2, days_ago=1)
+        expected = BlogPost.objects.get(pk=self.new.pk).popularity
+        BlogPost.objects.update(popularity=0)
+        call_command('rebuild_popularity', prune_days=90, stdout=io.StringIO())
+        self.assertFalse(BlogPostViewDay.objects.filter(post=self.old).exists())
+        self.old.refresh_from_db()
+        self.new.refresh_from_db()
+        self.assertEqual(self.old.popularity, 0)
+        # Counted at noon instead of the exact time: within half a day's decay
+        self.assertAlmostEqual(self.new.popularity, expected, delta=0.5 / settings.POPULAR_HALF_LIFE_DAYS)
+
+    @override_settings(POPULAR_HALF_LIFE_DAYS=1)
+    def test_scores_do_not_overflow(self):
+        # 2^(days / half-life) passes the float range after ~2.8 years at one day
+        later = popularity.EPOCH + timedelta(days=365 * 30)
+        popularity.record_view(self.old.pk, later)
+        popularity.record_view(self.old.pk, later)
+        popularity.record_view(self.new.pk, later + timedelta(days=1))
+        self.old.refresh_from_db()
+        self.new.refresh_from_db()
+        # Two views, one half-life earlier, tie with one
+        self.assertAlmostEqual(self.old.popularity, self.new.popularity)
+        self.assertAlmostEqual(self.old.popularity, popularity.log_score([(2, popularity.view_exponent(later))]))
+        self.assertAlmostEqual(popularity.log_score([(1, 0.0), (1, 0.0)]), math.log2(3))
+
+
+class BlogFacetsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.python = BlogCategory.objects.create(name='Python')
+        BlogCategory.objects.create(name='Empty')
+        self.django = BlogTag.objects.create(name='Django')
+        self.orm = BlogTag.objects.create(name='ORM')
+        for title, month, category, tags in [
+            ('One', (2026, 3), self.python, [self.django]),
+            ('Two', (2026, 3), self.python, [self.django, self.orm]),
+            ('Three', (2025, 11), None, [self.orm]),
+        ]:
+            post = BlogPost.objects.create(
+                title=title, content=title, status='published', category=category,
+                published_at=timezone.make_aware(datetime(*month, 15)),
+            )
+            post.tags.set(tags)
+        BlogPost.objects.create(title='Draft', content='x', category=self.python)
+
+    def test_counts(self):
+        data = self.client.get('/api/blog/facets/').json()
+        self.assertEqual(data['count'], 3)
+        self.assertEqual({c['slug']: c['count'] for c in data['categories']}, {'python': 2, 'empty': 0})
+        self.assertEqual({t['slug']: t['count'] for t in data['tags']}, {'django': 2, 'orm': 2})
+        self.assertEqual(data['years'], [{'year': 2026, 'count': 2}, {'year': 2025, 'count': 1}])
+        self.assertEqual(data['months'], [{'month': '2026-03', 'count': 2}, {'month': '2025-11', 'count': 1}])
+
+        # The counts follow the list filters
+        data = self.client.get('/api/blog/facets/', {'tags': 'orm'}).json()
+        self.assertEqual(data['count'], 2)
+        self.assertEqual({t['slug']: t['count'] for t in data['tags']}, {'django': 1, 'orm': 2})
+        self.assertEqual([m['month'] for m in data['months']], ['2026-03', '2025-11'])
+        self.assertEqual(self.client.get('/api/blog/facets/', {'search': 'Three'}).json()['count'], 1)
+
+    @shared_cache
+    def test_cached_per_filter_set_until_content_changes(self):
+        get_content_version()  # read from the database once, into the cleared cache
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/blog/facets/', {'category': 'python'})
+        # Pagination parameters share the entry; a 304 needs no query either
+        with self.assertNumQueries(0):
+            self.client.get('/api/blog/facets/', {'category': 'python', 'page_size': 5})
+            self.assertEqual(self.client.get(
+                '/api/blog/facets/', {'category': 'python'}, HTTP_IF_NONE_MATCH=response['ETag'],
+            ).status_code, 304)
+
+        BlogPost.objects.filter(title='Draft').get().delete()
+        with self.assertNumQueries(3):
+            self.assertEqual(self.client.get('/api/blog/facets/', {'category': 'python'}).json()['count'], 2)
 
-# Create your tests here.
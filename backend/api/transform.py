@@ -0,0 +1,247 @@
+"""
+On-the-fly image transformation for self-hosted media.
+
+    GET /api/media/transform/<image uuid>/?w=640&h=360&fit=cover&fmt=webp&q=75
+
+Cloudinary deployments resize through URL transformations; with filesystem
+storage this endpoint does the same with Pillow:
+
+    w, h  target size in pixels (at least one, up to IMAGE_TRANSFORM_MAX_DIMENSION)
+    fit   contain (default, never upscales), cover (crop to w x h), fill (stretch)
+    fmt   webp (default), jpeg, png, avif (when Pillow supports it)
+    q     quality 1-100 (default IMAGE_VARIANT_QUALITY)
+
+Rendered files are kept in an on-disk cache (IMAGE_TRANSFORM_CACHE_DIR) keyed
+by the source's version token (see api/media.py), which changes with its
+content even when a name is reused, and the normalized parameters. Like the
+originals, renderings of content-addressed sources are sent as immutable;
+others only with the source's `?v=` token.
+
+Hits refresh the file's mtime. Each process walks the cache once to learn its
+size and then adds what it writes; when that pushes the total over
+IMAGE_TRANSFORM_CACHE_SIZE, `evict()` walks it again, deletes the least
+recently used files and resets the count (which also picks up what other
+processes wrote meanwhile).
+
+Concurrent requests for the same rendering in one process wait for the first
+one instead of decoding the source again. Separate processes may render the
+same key twice; files are written to a temporary name and renamed, so readers
+never see a partial file.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from PIL import Image as PILImage, ImageOps, features
+
+from .media import IMMUTABLE_MAX_AGE, VERSION_QUERY_PARAM, media_version
+from .storage import is_content_addressed
+from .variants import encode_image
+
+FITS = ('contain', 'cover', 'fill')
+FORMATS = {'webp': 'image/webp', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+if features.check('avif'):
+    FORMATS['avif'] = 'image/avif'
+
+# Fraction of the size limit to shrink to when evicting, so a full cache does
+# not rescan the directory on every write.
+EVICT_TO = 0.9
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+# Cache directory -> its size in bytes as known to this process
+_usage = {}
+_usage_lock = threading.Lock()
+
+
+class TransformError(ValueError):
+    """Invalid transformation parameters (reported as 400)."""
+
+
+def parse_params(query):
+    """Validate and normalize the query parameters into a dict."""
+    limit = settings.IMAGE_TRANSFORM_MAX_DIMENSION
+
+    def dimension(name):
+        value = query.get(name)
+        if not value:
+            return None
+        try:
+            value = int(value)
+        except ValueError:
+            raise TransformError(f'{name} must be an integer')
+        if not 1 <= value <= limit:
+            raise TransformError(f'{name} must be between 1 and {limit}')
+        return value
+
+    width, height = dimension('w'), dimension('h')
+    if width is None and height is None:
+        raise TransformError('w or h is required')
+
+    fit = query.get('fit') or 'contain'
+    if fit not in FITS:
+        raise TransformError(f"fit must be one of {', '.join(FITS)}")
+    if width is None or height is None:
+        # cover/fill need both sides
+        fit = 'contain'
+
+    fmt = (query.get('fmt') or 'webp').lower()
+    fmt = 'jpeg' if fmt == 'jpg' else fmt
+    if fmt not in FORMATS:
+        raise TransformError(f"fmt must be one of {', '.join(FORMATS)}")
+
+    try:
+        quality = int(query.get('q') or settings.IMAGE_VARIANT_QUALITY)
+    except ValueError:
+        raise TransformError('q must be an integer')
+    if not 1 <= quality <= 100:
+        raise TransformError('q must be between 1 and 100')
+
+    return {'w': width, 'h': height, 'fit': fit, 'fmt': fmt, 'q': quality}
+
+
+def cache_key(version, params):
+    """Cache key of the rendering of the source with version token `version`."""
+    raw = '|'.join([version] + [f'{k}={params[k]}' for k in sorted(params)])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _cache_path(key, fmt):
+    return os.path.join(settings.IMAGE_TRANSFORM_CACHE_DIR, key[:2], f'{key}.{fmt}')
+
+
+def render(file, params):
+    """Return the transformed image bytes for FieldFile `file`."""
+    with file.storage.open(file.name, 'rb') as fh, PILImage.open(fh) as original:
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    width, height, fit = params['w'], params['h'], params['fit']
+    if fit == 'cover':
+        image = ImageOps.fit(image, (width, height), PILImage.LANCZOS)
+    elif fit == 'fill':
+        image = image.resize((width, height), PILImage.LANCZOS)
+    else:
+        scale = min(width / image.width if width else 1, height / image.height if height else 1, 1)
+        if scale < 1:
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            image = image.resize(size, PILImage.LANCZOS)
+
+    if params['fmt'] == 'jpeg' or image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'PA', 'P') else 'RGB')
+    return encode_image(image, params['fmt'], params['q'])
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _scan(directory):
+    """(mtime, size, path) of every file in `directory` and their total size."""
+    entries, total = [], 0
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+    return entries, total
+
+
+def _record_write(size):
+    """Count `size` freshly written bytes and return the cache's size."""
+    directory = settings.IMAGE_TRANSFORM_CACHE_DIR
+    with _usage_lock:
+        if directory in _usage:
+            _usage[directory] += size
+        else:
+            # The first write of this process: the scan already sees the file
+            _usage[directory] = _scan(directory)[1]
+        return _usage[directory]
+
+
+def evict(limit=None):
+    """Delete least recently used renderings until the cache fits `limit` bytes."""
+    limit = settings.IMAGE_TRANSFORM_CACHE_SIZE if limit is None else limit
+    directory = settings.IMAGE_TRANSFORM_CACHE_DIR
+    entries, total = _scan(directory)
+    removed = 0
+    if total > limit:
+        target = limit * EVICT_TO
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+    with _usage_lock:
+        _usage[directory] = total
+    return removed
+
+
+def _lock_for(key):
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def get_transformed(file, params, version=None):
+    """
+    Return the key and path of the cached rendering, rendering it on a miss.
+    `version` is the source's `media_version()` when the caller has it.
+    """
+    key = cache_key(version or media_version(file), params)
+    path = _cache_path(key, params['fmt'])
+    lock = _lock_for(key)
+    try:
+        with lock:
+            if os.path.exists(path):
+                os.utime(path)
+                return key, path
+            data = render(file, params)
+            _write_atomic(path, data)
+    finally:
+        with _locks_guard:
+            if _locks.get(key) is lock and not lock.locked():
+                del _locks[key]
+    if _record_write(len(data)) > settings.IMAGE_TRANSFORM_CACHE_SIZE:
+        evict()
+    return key, path
+
+
+def transform_response(request, file, params):
+    """Serve the transformed `file` with validators and cache headers."""
+    version = media_version(file)
+    key = cache_key(version, params)
+    etag = quote_etag(key[:32])
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        _, path = get_transformed(file, params, version)
+        response = FileResponse(open(path, 'rb'), content_type=FORMATS[params['fmt']])
+    response['ETag'] = etag
+    if is_content_addressed(file.name) or request.GET.get(VERSION_QUERY_PARAM) == version:
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
@@ -0,0 +1,144 @@
+"""
+Re-encode uploaded images before they are stored.
+
+Admin uploads used to be stored byte for byte: multi-megabyte PNG screenshots,
+phone photos with EXIF (camera model, GPS position) and sideways images that
+rely on the EXIF orientation flag. `optimize_upload()` runs on every image the
+admin forms receive and:
+
+    * applies the EXIF orientation and drops all metadata except the ICC
+      colour profile
+    * scales the image down to IMAGE_UPLOAD_MAX_DIMENSION (OG images to
+      OG_IMAGE_WIDTH, the width crawlers display)
+    * re-encodes it as IMAGE_UPLOAD_FORMAT (webp, or avif where Pillow supports
+      it); OG images become JPEG, which every crawler accepts
+    * steps quality down, then size, until the file fits the byte budget of
+      its kind (IMAGE_UPLOAD_BUDGETS, e.g. the 300 KB WhatsApp limit for OG
+      images)
+
+    field                                  kind      default budget
+    og_image_file                          og        300 KB
+    *logo_file                             logo      150 KB
+    profile_image_file, author_image_file  avatar    200 KB
+    everything else                        default   500 KB
+
+Files Pillow cannot read (SVG, PDF), animated images and uploads that are
+already small enough in the target format without metadata are stored as they
+are. With IMAGE_UPLOAD_ARCHIVE_DIR set, the untouched original is kept there
+under its SHA-256, outside MEDIA_ROOT, since it may still carry GPS data.
+"""
+
+import hashlib
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image as PILImage, ImageOps, UnidentifiedImageError, features
+
+from .variants import encode_image
+
+OG_IMAGE_WIDTH = 1200
+MIN_QUALITY = 45
+QUALITY_STEP = 10
+SCALE_STEP = 0.8
+MIN_DIMENSION = 320
+
+MIME_TYPES = {'webp': 'image/webp', 'avif': 'image/avif', 'jpeg': 'image/jpeg'}
+EXTENSIONS = {'webp': '.webp', 'avif': '.avif', 'jpeg': '.jpg'}
+PIL_FORMATS = {'WEBP': 'webp', 'AVIF': 'avif', 'JPEG': 'jpeg'}
+
+logger = logging.getLogger('django')
+
+
+def upload_kind(field_name):
+    """Budget kind of an image field, see the table above."""
+    if field_name.startswith('og_image'):
+        return 'og'
+    if 'logo' in field_name:
+        return 'logo'
+    if field_name in ('profile_image_file', 'author_image_file'):
+        return 'avatar'
+    return 'default'
+
+
+def target_format(kind):
+    if kind == 'og':
+        return 'jpeg'
+    fmt = settings.IMAGE_UPLOAD_FORMAT
+    if fmt == 'avif' and not features.check('avif'):
+        return 'webp'
+    return fmt
+
+
+def archive_original(data, name):
+    """Keep the untouched upload in IMAGE_UPLOAD_ARCHIVE_DIR. Returns its name there."""
+    storage = FileSystemStorage(location=settings.IMAGE_UPLOAD_ARCHIVE_DIR)
+    archived = hashlib.sha256(data).hexdigest() + os.path.splitext(name)[1].lower()
+    if not storage.exists(archived):
+        storage.save(archived, io.BytesIO(data))
+    return archived
+
+
+def encode_within_budget(image, fmt, budget, icc_profile=None):
+    """Encode `image`, lowering quality and then size until it fits `budget` bytes.
+
+    Returns the smallest encoding found when even MIN_DIMENSION at MIN_QUALITY
+    is too large.
+    """
+    while True:
+        for quality in range(settings.IMAGE_UPLOAD_QUALITY, MIN_QUALITY - 1, -QUALITY_STEP):
+            data = encode_image(image, fmt, quality, icc_profile)
+            if len(data) <= budget:
+                return data
+        if max(image.size) <= MIN_DIMENSION:
+            logger.warning(f"[IMAGE-UPLOAD] {len(data)} bytes exceeds the {budget} byte budget")
+            return data
+        size = (max(1, round(image.width * SCALE_STEP)), max(1, round(image.height * SCALE_STEP)))
+        image = image.resize(size, PILImage.Resampling.LANCZOS)
+
+
+def optimize_upload(upload, field_name):
+    """Return a re-encoded copy of the uploaded image `upload`, or `upload` itself."""
+    if not settings.IMAGE_UPLOAD_OPTIMIZE:
+        return upload
+    upload.seek(0)
+    data = upload.read()
+    upload.seek(0)
+    try:
+        with PILImage.open(io.BytesIO(data)) as original:
+            if getattr(original, 'is_animated', False):
+                return upload
+            source_format = PIL_FORMATS.get(original.format)
+            has_metadata = bool(original.getexif()) or any(k in original.info for k in ('exif', 'xmp', 'comment'))
+            # A CMYK/greyscale profile would be wrong after the RGB conversion below
+            icc_profile = original.info.get('icc_profile') if original.mode in ('RGB', 'RGBA') else None
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    except (OSError, ValueError, UnidentifiedImageError, PILImage.DecompressionBombError):
+        # Not a raster image Pillow understands (SVG, PDF, ...)
+        return upload
+
+    kind = upload_kind(field_name)
+    fmt = target_format(kind)
+    budget = settings.IMAGE_UPLOAD_BUDGETS.get(kind, settings.IMAGE_UPLOAD_BUDGETS['default'])
+    max_width = OG_IMAGE_WIDTH if kind == 'og' else settings.IMAGE_UPLOAD_MAX_DIMENSION
+    max_height = settings.IMAGE_UPLOAD_MAX_DIMENSION
+
+    if (source_format == fmt and not has_metadata and len(data) <= budget
+            and image.width <= max_width and image.height <= max_height):
+        return upload
+
+    if settings.IMAGE_UPLOAD_ARCHIVE_DIR:
+        archive_original(data, upload.name)
+
+    image.thumbnail((max_width, max_height), PILImage.Resampling.LANCZOS)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    encoded = encode_within_budget(image, fmt, budget, icc_profile)
+
+    name = os.path.splitext(os.path.basename(upload.name))[0] + EXTENSIONS[fmt]
+    logger.info(f"[IMAGE-UPLOAD] {upload.name}: {len(data)} -> {len(encoded)} bytes ({fmt})")
+    return SimpleUploadedFile(name, encoded, content_type=MIME_TYPES[fmt])
@@ -1,5 +1,6 @@
 from django.urls import path, include
 from . import views
+from .feeds import blog_feed
 from django.urls import path
 
 urlpatterns = [
@@ -35,6 +36,7 @@ urlpatterns = [
     path('projects/featured/', views.ProjectViewSet.as_view({'get': 'featured'}), name='project-featured'),
     path('projects/<slug:slug>/', views.ProjectViewSet.as_view({'get': 'retrieve'}), name='project-detail'),
     path('projects/<slug:slug>/image/', views.ProjectViewSet.as_view({'get': 'image'}), name='project-image'),
+    path('projects/<slug:slug>/related/', views.ProjectViewSet.as_view({'get': 'related'}), name='project-related'),
 
     # Certificates & Achievements
     path('certificates/', views.CertificateViewSet.as_view({'get': 'list'}), name='certificate-list'),
@@ -54,11 +56,15 @@ urlpatterns = [
     # Blog posts
     path('blog/', views.BlogPostViewSet.as_view({'get': 'list'}), name='blogpost-list'),
     path('blog/featured/', views.BlogPostViewSet.as_view({'get': 'featured'}), name='blogpost-featured'),
+    path('blog/popular/', views.BlogPostViewSet.as_view({'get': 'popular'}), name='blogpost-popular'),
+    path('blog/facets/', views.BlogPostViewSet.as_view({'get': 'facets'}), name='blogpost-facets'),
+    path('blog/feed.<str:fmt>', blog_feed, name='blogpost-feed'),
     path('blog/category/<slug:category_slug>/', views.BlogPostViewSet.as_view({'get': 'by_category'}), name='blogpost-by-category'),
     path('blog/tag/<slug:tag_slug>/', views.BlogPostViewSet.as_view({'get': 'by_tag'}), name='blogpost-by-tag'),
     path('blog/<slug:slug>/', views.BlogPostViewSet.as_view({'get': 'retrieve'}), name='blogpost-detail'),
     path('blog/<slug:slug>/image/', views.BlogPostViewSet.as_view({'get': 'image'}), name='blogpost-image'),
     path('blog/<slug:slug>/og-image/', views.BlogPostViewSet.as_view({'get': 'og_image'}), name='blogpost-og-image'),
+    path('blog/<slug:slug>/related/', views.BlogPostViewSet.as_view({'get': 'related'}), name='blogpost-related'),
 
     # Testimonials
     path('testimonials/', views.TestimonialViewSet.as_view({'get': 'list'}), name='testimonial-list'),
@@ -73,6 +79,7 @@ urlpatterns = [
     path('images/', views.ImageViewSet.as_view({'get': 'list'}), name='image-list'),
     path('images/<int:pk>/', views.ImageViewSet.as_view({'get': 'retrieve'}), name='image-detail'),
     path('images/<uuid:uuid>/data/', views.ImageViewSet.as_view({'get': 'data'}), name='image-data'),
+    path('media/transform/<uuid:uuid>/', views.ImageViewSet.as_view({'get': 'transform'}), name='image-transform'),
 
     # Site configuration
     path('config/', views.SiteConfigurationViewSet.as_view({'get': 'list'}), name='config-list'),
@@ -0,0 +1,174 @@
+"""
+Responsive image variants.
+
+Serializers used to return only the original upload, so thumbnails and cards
+downloaded full-resolution images whenever Cloudinary was off. When an image
+field is saved, `ensure_variants()` writes resized copies of every uploaded
+image with Pillow:
+
+    * one per width in IMAGE_VARIANT_WIDTHS smaller than the original, plus the
+      original width when it is below the largest configured width
+    * each as WebP and as a JPEG fallback (PNG when the image has transparency)
+
+Rows live in `ImageVariant`, keyed by the stored name of the original. Stored
+names never change content (see api/storage.py), so variants are generated
+once per upload and shared by every record using it.
+
+The serializers expose them as ready-to-use `srcset` strings, e.g.
+
+    "featured_image_srcset": {
+        "webp": "/portfolio_media/.../a-320w.webp 320w, ... 1280w",
+        "jpeg": "/portfolio_media/.../a-320w.jpg 320w, ... 1280w"
+    }
+
+or null when an image has no variants (external URL, not generated yet). The
+source -> srcset map is built in one query and kept in the cache until
+variants change, so serializing a list costs no extra queries.
+"""
+
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import models
+from PIL import Image as PILImage, ImageOps, UnidentifiedImageError
+
+from .conditional import versioned_get_or_set
+from .models import ImageVariant, OGCard
+
+SRCSET_CACHE_KEY = 'image_variant_srcsets'
+REQUEST_ATTR = '_image_srcsets'
+
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg', 'png': 'png'}
+
+logger = logging.getLogger('django')
+
+
+def image_fields(model):
+    """The ImageFields of `model` whose uploads get variants."""
+    if model in (ImageVariant, OGCard):
+        # Generated images
+        return []
+    return [f for f in model._meta.concrete_fields if isinstance(f, models.ImageField)]
+
+
+def _has_alpha(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+
+
+def _target_widths(width):
+    widths = sorted(set(settings.IMAGE_VARIANT_WIDTHS))
+    if not widths:
+        return []
+    targets = [w for w in widths if w < width]
+    if width <= widths[-1]:
+        targets.append(width)
+    return targets
+
+
+def encode_image(image, fmt, quality=None, icc_profile=None):
+    """Encode a Pillow image as webp/jpeg/png/avif bytes (without metadata)."""
+    buffer = io.BytesIO()
+    quality = quality or settings.IMAGE_VARIANT_QUALITY
+    extra = {'icc_profile': icc_profile} if icc_profile else {}
+    if fmt == 'webp':
+        image.save(buffer, 'WEBP', quality=quality, method=4, **extra)
+    elif fmt == 'avif':
+        image.save(buffer, 'AVIF', quality=quality, **extra)
+    elif fmt == 'jpeg':
+        if _has_alpha(image):
+            background = PILImage.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.convert('RGBA').getchannel('A'))
+            image = background
+        image.convert('RGB').save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True, **extra)
+    else:
+        image.save(buffer, 'PNG', optimize=True, **extra)
+    return buffer.getvalue()
+
+
+def generate_variants(name):
+    """Write the variants of the stored image `name`. Returns the new rows."""
+    try:
+        with default_storage.open(name, 'rb') as fh, PILImage.open(fh) as original:
+            if getattr(original, 'is_animated', False):
+                # Resizing would drop every frame but the first
+                return []
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    except (OSError, UnidentifiedImageError, PILImage.DecompressionBombError) as exc:
+        logger.warning(f"[IMAGE-VARIANTS] Cannot read {name}: {exc}")
+        return []
+
+    alpha = _has_alpha(image)
+    image = image.convert('RGBA' if alpha else 'RGB')
+    formats = ('webp', 'png' if alpha else 'jpeg')
+    stem = os.path.splitext(os.path.basename(name))[0]
+
+    variants = []
+    for width in _target_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), PILImage.LANCZOS)
+        for fmt in formats:
+            data = encode_image(resized, fmt)
+            variant = ImageVariant(source=name, format=fmt, width=width, height=height, size=len(data))
+            variant.file.save(f'{stem}-{width}w.{EXTENSIONS[fmt]}', ContentFile(data), save=False)
+            variants.append(variant)
+
+    ImageVariant.objects.bulk_create(variants, ignore_conflicts=True)
+    cache.delete(SRCSET_CACHE_KEY)
+    return variants
+
+
+def delete_variants(names):
+    """Remove the variants of the given source names (rows and files)."""
+    variants = list(ImageVariant.objects.filter(source__in=names))
+    for variant in variants:
+        variant.file.delete(save=False)
+    ImageVariant.objects.filter(pk__in=[v.pk for v in variants]).delete()
+    cache.delete(SRCSET_CACHE_KEY)
+    return len(variants)
+
+
+def ensure_variants(instance):
+    """Generate missing variants for every uploaded image on `instance`."""
+    names = {f.name for f in (getattr(instance, field.name) for field in image_fields(type(instance))) if f}
+    if not names:
+        return False
+    existing = set(ImageVariant.objects.filter(source__in=names).values_list('source', flat=True).distinct())
+    created = False
+    for name in sorted(names - existing):
+        created = bool(generate_variants(name)) or created
+    return created
+
+
+def _build_srcsets():
+    srcsets = {}
+    for source, fmt, width, file in ImageVariant.objects.order_by('source', 'format', 'width').values_list(
+        'source', 'format', 'width', 'file',
+    ):
+        srcsets.setdefault(source, {}).setdefault(fmt, []).append(f'{default_storage.url(file)} {width}w')
+    return {
+        source: {fmt: ', '.join(entries) for fmt, entries in formats.items()}
+        for source, formats in srcsets.items()
+    }
+
+
+def get_srcsets(request=None):
+    """Return {source name: {format: srcset}}, memoized on `request`."""
+    srcsets = getattr(request, REQUEST_ATTR, None)
+    if srcsets is None:
+        srcsets = versioned_get_or_set(SRCSET_CACHE_KEY, _build_srcsets)
+        if request is not None:
+            setattr(request, REQUEST_ATTR, srcsets)
+    return srcsets
+
+
+def srcset_for(file, request=None):
+    """The srcset dict for an image FieldFile, or None."""
+    if not file or not settings.IMAGE_VARIANTS:
+        return None
+    return get_srcsets(request).get(file.name)
@@ -4,9 +4,10 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
 import django_filters
-from django.db.models import Q
+from django.db.models import Q, F, Prefetch
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
+from PIL import Image as PILImage
 
 
 from .models import (
@@ -22,8 +23,79 @@ from .serializers import (
     CertificateSerializer, AchievementSerializer,
     BlogCategorySerializer, BlogTagSerializer, 
     BlogPostSerializer, BlogPostDetailSerializer, BlogPostListSerializer,
-    TestimonialSerializer, ContactMessageSerializer, SiteConfigurationSerializer
+    TestimonialSerializer, ContactMessageSerializer, SiteConfigurationSerializer,
+    get_expanded_serializer
 )
+from .loaders import ImageLoader
+from .compiled_serializers import get_list_serializer, serialize_instance
+from .pagination import KeysetPagination
+from .conditional import (
+    ConditionalGetMixin, bump_content_version, conditional_response, get_content_version, make_etag,
+)
+from .media import serve_media
+from .variants import ensure_variants, image_fields
+from .placeholders import schedule as schedule_image_metadata
+from .transform import TransformError, parse_params, transform_response
+from .og_cards import ensure_card as ensure_og_card
+from .og_middleware import ROUTES as OG_ROUTES
+from . import popularity, prerender, related
+from .facets import build_facets, cached_facets
+
+
+class CompiledListMixin:
+    """
+    Serialize list responses through the compiled fast path
+    (see `api/compiled_serializers.py`). Output is identical to the DRF classes.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        if args and kwargs.get('many'):
+            context = kwargs.get('context') or self.get_serializer_context()
+            return get_list_serializer(self.get_serializer_class(), args[0], context=context)
+        return super().get_serializer(*args, **kwargs)
+
+
+class ExpandMixin:
+    """
+    Opt-in nested expansion: `?expand=images,category,tags` (or `?expand=*`).
+    Relations that were not requested are collapsed to ids / URLs by
+    `get_expanded_serializer()` and should not be prefetched.
+    Views overriding `get_serializer_class` wrap their result with `expanded()`.
+    """
+    expand_query_param = 'expand'
+
+    def get_expand(self):
+        if not hasattr(self, '_expand'):
+            request = getattr(self, 'request', None)
+            values = request.query_params.getlist(self.expand_query_param) if request else []
+            self._expand = frozenset(
+                name.strip() for value in values for name in value.split(',') if name.strip()
+            )
+        return self._expand
+
+    def is_expanded(self, name):
+        expand = self.get_expand()
+        return name in expand or '*' in expand
+
+    def expanded(self, serializer_class):
+        return get_expanded_serializer(serializer_class, self.get_expand())
+
+    def get_serializer_class(self):
+        return self.expanded(super().get_serializer_class())
+
+
+class BatchedImagesMixin:
+    """
+    Resolve the generic `images` of every object in a list response with a
+    single query (see `ImageLoader`) instead of one query per object.
+    Skipped when the view collapses images (see `ExpandMixin`).
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        if args and kwargs.get('many') and self.is_expanded('images'):
+            instances = ImageLoader.for_request(self.request).prime(args[0])
+            args = (instances,) + args[1:]
+        return super().get_serializer(*args, **kwargs)
 
 
 # ============================================
@@ -34,7 +106,7 @@ from .serializers import (
     list=extend_schema(tags=['Profile'], description='List all profiles'),
     retrieve=extend_schema(tags=['Profile'], description='Retrieve profile details with related data'),
 )
-class ProfileViewSet(viewsets.ReadOnlyModelViewSet):
+class ProfileViewSet(ConditionalGetMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for Profile model.
     GET /api/profile/ - List all profiles
@@ -51,33 +123,21 @@ class ProfileViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=['get'])
     def resume(self, request, pk=None):
         """Download resume file or redirect to external resume URL"""
-        from django.http import FileResponse
-        from django.shortcuts import redirect
         profile = self.get_object()
-        if profile.resume_file:
-            return FileResponse(profile.resume_file.open('rb'), content_type=profile.resume_mime or 'application/pdf')
-        if profile.resume_url:
-            return redirect(profile.resume_url)
-        return Response({'error': 'Resume not found'}, status=status.HTTP_404_NOT_FOUND)
+        return serve_media(request, profile.resume_file, profile.resume_mime or 'application/pdf', profile.resume_url, 'Resume not found')
 
     @action(detail=True, methods=['get'])
     def photo(self, request, pk=None):
         """Serve profile image (redirect to external URL or stream file)"""
-        from django.http import FileResponse
-        from django.shortcuts import redirect
         profile = self.get_object()
-        if profile.profile_image_file:
-            return FileResponse(profile.profile_image_file.open('rb'), content_type=profile.profile_image_mime or 'image/jpeg')
-        if profile.profile_image_url:
-            return redirect(profile.profile_image_url)
-        return Response({'error': 'Photo not found'}, status=status.HTTP_404_NOT_FOUND)
+        return serve_media(request, profile.profile_image_file, profile.profile_image_mime or 'image/jpeg', profile.profile_image_url, 'Photo not found')
 
 
 # ============================================
 # RELATED MODELS VIEWSETS
 # ============================================
 
-class SocialLinkViewSet(viewsets.ReadOnlyModelViewSet):
+class SocialLinkViewSet(ConditionalGetMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """Social links for a profile"""
     queryset = SocialLink.objects.all()
     serializer_class = SocialLinkSerializer
@@ -86,7 +146,7 @@ class SocialLinkViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_fields = ['profile', 'platform', 'show_on_home']
 
 
-class SkillViewSet(viewsets.ReadOnlyModelViewSet):
+class SkillViewSet(ConditionalGetMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """Skills for a profile"""
     queryset = Skill.objects.all()
     serializer_class = SkillSerializer
@@ -96,7 +156,7 @@ class SkillViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_fields = ['profile', 'skill_type', 'proficiency', 'show_on_home']
 
 
-class EducationViewSet(viewsets.ReadOnlyModelViewSet):
+class EducationViewSet(ConditionalGetMixin, ExpandMixin, BatchedImagesMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """Education history"""
     queryset = Education.objects.all()
     serializer_class = EducationSerializer
@@ -108,17 +168,11 @@ class EducationViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=['get'])
     def logo(self, request, slug=None):
         """Serve institution logo (redirect to external URL or stream file)"""
-        from django.http import FileResponse
-        from django.shortcuts import redirect
         edu = self.get_object()
-        if edu.logo_file:
-            return FileResponse(edu.logo_file.open('rb'), content_type=edu.logo_mime or 'image/png')
-        if edu.logo_url:
-            return redirect(edu.logo_url)
-        return Response({'error': 'Logo not found'}, status=status.HTTP_404_NOT_FOUND)
+        return serve_media(request, edu.logo_file, edu.logo_mime or 'image/png', edu.logo_url, 'Logo not found')
 
 
-class WorkExperienceViewSet(viewsets.ReadOnlyModelViewSet):
+class WorkExperienceViewSet(ConditionalGetMixin, ExpandMixin, BatchedImagesMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """Work experience history"""
     queryset = WorkExperience.objects.all()
     serializer_class = WorkExperienceSerializer
@@ -131,14 +185,8 @@ class WorkExperienceViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=['get'])
     def logo(self, request, pk=None):
         """Serve company logo (redirect to external URL or stream file)"""
-        from django.http import FileResponse
-        from django.shortcuts import redirect
         work = self.get_object()
-        if work.company_logo_file:
-            return FileResponse(work.company_logo_file.open('rb'), content_type=work.company_logo_mime or 'image/png')
-        if work.company_logo_url:
-            return redirect(work.company_logo_url)
-        return Response({'error': 'Logo not found'}, status=status.HTTP_404_NOT_FOUND)
+        return serve_media(request, work.company_logo_file, work.company_logo_mime or 'image/png', work.company_logo_url, 'Logo not found')
 
 
 # ============================================
@@ -149,17 +197,21 @@ class WorkExperienceViewSet(viewsets.ReadOnlyModelViewSet):
     list=extend_schema(tags=['Projects'], description='List all visible projects'),
     retrieve=extend_schema(tags=['Projects'], description='Retrieve project details by slug'),
     featured=extend_schema(tags=['Projects'], description='Get featured projects'),
+    related=extend_schema(tags=['Projects'], description='Most similar visible projects, precomputed (see api/related.py)'),
 )
-class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
+class ProjectViewSet(ConditionalGetMixin, ExpandMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """
     Portfolio projects
     GET /api/projects/ - List all visible projects
     GET /api/projects/{slug}/ - Retrieve single project by slug
     GET /api/projects/featured/ - Get featured projects
+    GET /api/projects/{slug}/related/ - Most similar projects
     """
     queryset = Project.objects.filter(is_visible=True)
     permission_classes = [AllowAny]
     lookup_field = 'slug'
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-is_featured', 'order', '-created_at', '-id')
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['profile', 'status', 'is_featured', 'show_on_home']
     search_fields = ['title', 'short_description', 'description', 'technologies']
@@ -167,39 +219,42 @@ class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
-            return ProjectDetailSerializer
+            return self.expanded(ProjectDetailSerializer)
         return ProjectSerializer
     
     @action(detail=False, methods=['get'])
     def featured(self, request):
         """Get featured projects"""
         projects = self.queryset.filter(is_featured=True)
-        serializer = self.get_serializer(projects, many=True)
-        return Response(serializer.data)
+        return self.conditional_list(projects, lambda: Response(self.get_serializer(projects, many=True).data))
+
+    @action(detail=True, methods=['get'])
+    def related(self, request, slug=None):
+        """Precomputed most similar projects, best first"""
+        if not self.queryset.filter(slug=slug).exists():
+            return Response({'error': 'Project not found'}, status=status.HTTP_404_NOT_FOUND)
+        projects = self.queryset.filter(neighbour_of__source__slug=slug).order_by('neighbour_of__rank')
+        return self.conditional_list(projects, lambda: Response(self.get_serializer(projects, many=True).data))
 
     @action(detail=True, methods=['get'])
     def image(self, request, slug=None):
         """Serve featured image (redirect to external URL or stream file)"""
-        from django.http import FileResponse
-        from django.shortcuts import redirect
         project = self.get_object()
-        if project.featured_image_file:
-            return FileResponse(project.featured_image_file.open('rb'), content_type=project.featured_image_mime or 'image/jpeg')
-        if project.featured_image_url:
-            return redirect(project.featured_image_url)
-        return Response({'error': 'Image not found'}, status=status.HTTP_404_NOT_FOUND)
+        return serve_media(request, project.featured_image_file, project.featured_image_mime or 'image/jpeg', project.featured_image_url, 'Image not found')
 
 
 # ============================================
 # CERTIFICATES & ACHIEVEMENTS VIEWSETS
 # ============================================
 
-class CertificateViewSet(viewsets.ReadOnlyModelViewSet):
+class CertificateViewSet(ConditionalGetMixin, ExpandMixin, BatchedImagesMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """Professional certifications"""
     queryset = Certificate.objects.all()
     serializer_class = CertificateSerializer
     permission_classes = [AllowAny]
     lookup_field = 'slug'
+    pagination_class = KeysetPagination
+    keyset_ordering = ('order', '-issue_date', '-id')
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['profile', 'does_not_expire', 'show_on_home']
     search_fields = ['title', 'issuing_organization', 'skills']
@@ -208,29 +263,17 @@ class CertificateViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=['get'])
     def org_logo(self, request, slug=None):
         """Serve organization logo (redirect to external URL or stream file)"""
-        from django.http import FileResponse
-        from django.shortcuts import redirect
         cert = self.get_object()
-        if cert.organization_logo_file:
-            return FileResponse(cert.organization_logo_file.open('rb'), content_type=cert.organization_logo_mime or 'image/png')
-        if cert.organization_logo_url:
-            return redirect(cert.organization_logo_url)
-        return Response({'error': 'Logo not found'}, status=status.HTTP_404_NOT_FOUND)
+        return serve_media(request, cert.organization_logo_file, cert.organization_logo_mime or 'image/png', cert.organization_logo_url, 'Logo not found')
 
     @action(detail=True, methods=['get'])
     def cert_image(self, request, slug=None):
         """Serve certificate image (redirect to external URL or stream file)"""
-        from django.http import FileResponse
-        from django.shortcuts import redirect
         cert = self.get_object()
-        if cert.certificate_image_file:
-            return FileResponse(cert.certificate_image_file.open('rb'), content_type=cert.certificate_image_mime or 'image/jpeg')
-        if cert.certificate_image_url:
-            return redirect(cert.certificate_image_url)
-        return Response({'error': 'Image not found'}, status=status.HTTP_404_NOT_FOUND)
+        return serve_media(request, cert.certificate_image_file, cert.certificate_image_mime or 'image/jpeg', cert.certificate_image_url, 'Image not found')
 
 
-class AchievementViewSet(viewsets.ReadOnlyModelViewSet):
+class AchievementViewSet(ConditionalGetMixin, ExpandMixin, BatchedImagesMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """Awards, honors, and achievements"""
     queryset = Achievement.objects.all()
     serializer_class = AchievementSerializer
@@ -244,14 +287,8 @@ class AchievementViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=['get'])
     def image(self, request, slug=None):
         """Serve achievement image (redirect to external URL or stream file)"""
-        from django.http import FileResponse
-        from django.shortcuts import redirect
         achievement = self.get_object()
-        if achievement.image_file:
-            return FileResponse(achievement.image_file.open('rb'), content_type=achievement.image_mime or 'image/jpeg')
-        if achievement.image_url:
-            return redirect(achievement.image_url)
-        return Response({'error': 'Image not found'}, status=status.HTTP_404_NOT_FOUND)
+        return serve_media(request, achievement.image_file, achievement.image_mime or 'image/jpeg', achievement.image_url, 'Image not found')
 
 
 # ============================================
@@ -259,7 +296,7 @@ class AchievementViewSet(viewsets.ReadOnlyModelViewSet):
 # ============================================
 
 @extend_schema(tags=['Blog'])
-class BlogCategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class BlogCategoryViewSet(ConditionalGetMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """Blog categories"""
     queryset = BlogCategory.objects.all()
     serializer_class = BlogCategorySerializer
@@ -268,7 +305,7 @@ class BlogCategoryViewSet(viewsets.ReadOnlyModelViewSet):
 
 
 @extend_schema(tags=['Blog'])
-class BlogTagViewSet(viewsets.ReadOnlyModelViewSet):
+class BlogTagViewSet(ConditionalGetMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """Blog tags"""
     queryset = BlogTag.objects.all()
     serializer_class = BlogTagSerializer
@@ -294,97 +331,154 @@ class BlogPostFilter(django_filters.rest_framework.FilterSet):
     featured=extend_schema(tags=['Blog'], description='Get featured blog posts'),
     by_category=extend_schema(tags=['Blog'], description='Get posts by category slug'),
     by_tag=extend_schema(tags=['Blog'], description='Get posts by tag slug'),
+    related=extend_schema(tags=['Blog'], description='Most similar published posts, precomputed (see api/related.py)'),
+    facets=extend_schema(tags=['Blog'], description='Category, tag and year/month counts of the posts matching the list filters'),
+    popular=extend_schema(
+        tags=['Blog'], description='Most viewed posts of a window, views decayed by age (see api/popularity.py)',
+        parameters=[OpenApiParameter('window', OpenApiTypes.STR, enum=list(popularity.WINDOWS), description='Default: 7d')],
+    ),
 )
-class BlogPostViewSet(viewsets.ReadOnlyModelViewSet):
+class BlogPostViewSet(ConditionalGetMixin, ExpandMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """
     Blog posts with SEO support
     GET /api/blog/ - List published posts
     GET /api/blog/{slug}/ - Retrieve single post by slug
     GET /api/blog/featured/ - Get featured posts
     GET /api/blog/category/{category_slug}/ - Filter by category
+    GET /api/blog/{slug}/related/ - Most similar posts
+    GET /api/blog/popular/?window=7d - Most viewed posts, decayed by age
+    GET /api/blog/facets/ - Archive and facet counts for the current filters
     """
-    queryset = BlogPost.objects.filter(status='published').select_related('category', 'profile').prefetch_related('tags')
+    queryset = BlogPost.objects.filter(status='published').select_related('profile')
     permission_classes = [AllowAny]
     lookup_field = 'slug'
+    pagination_class = KeysetPagination
+    # Never NULL for published posts (constraint published_post_has_published_at)
+    keyset_ordering = ('-published_at', '-id')
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = BlogPostFilter
     search_fields = ['title', 'excerpt', 'content', 'meta_keywords', 'tags__name']
     ordering_fields = ['published_at', 'views_count', 'reading_time']
-    ordering = ['-published_at']
+    ordering = ['-published_at', '-id']
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'retrieve':
+            # Only the detail serializer ships the rendered body
+            queryset = queryset.defer('content_html', 'content_toc')
+        if self.is_expanded('category'):
+            queryset = queryset.select_related('category')
+        if self.is_expanded('tags'):
+            return queryset.prefetch_related('tags')
+        # Collapsed tags only need their ids
+        return queryset.prefetch_related(Prefetch('tags', queryset=BlogTag.objects.only('id')))
+
     def get_serializer_class(self):
         if self.action == 'list':
-            return BlogPostListSerializer
+            return self.expanded(BlogPostListSerializer)
         elif self.action == 'retrieve':
-            return BlogPostDetailSerializer
-        return BlogPostSerializer
+            return self.expanded(BlogPostDetailSerializer)
+        return self.expanded(BlogPostSerializer)
     
     def retrieve(self, request, *args, **kwargs):
-        """Increment view count when retrieving a post"""
-        instance = self.get_object()
-        instance.increment_views()
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        """Increment view count when retrieving a post (also on 304 revalidations)"""
+        def build():
+            instance = self.get_object()
+            instance.increment_views()
+            popularity.record_view(instance.pk)
+            return Response(self.get_serializer(instance).data)
+
+        response = self.conditional_detail(build)
+        if response.status_code == status.HTTP_304_NOT_MODIFIED:
+            post_id = self.get_queryset().filter(slug=kwargs['slug']).values_list('pk', flat=True).first()
+            if post_id is not None:
+                BlogPost.objects.filter(pk=post_id).update(views_count=F('views_count') + 1)
+                popularity.record_view(post_id)
+        return response
     
     @action(detail=False, methods=['get'])
     def featured(self, request):
         """Get featured blog posts"""
-        posts = self.queryset.filter(is_featured=True)
-        serializer = BlogPostListSerializer(posts, many=True)
-        return Response(serializer.data)
+        posts = self.get_queryset().filter(is_featured=True)
+        return self.conditional_list(posts, lambda: Response(self._list_serializer(posts).data))
     
     @action(detail=False, methods=['get'], url_path='category/(?P<category_slug>[^/.]+)')
     def by_category(self, request, category_slug=None):
         """Get posts by category slug"""
-        posts = self.queryset.filter(category__slug=category_slug)
-        page = self.paginate_queryset(posts)
-        if page is not None:
-            serializer = BlogPostListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = BlogPostListSerializer(posts, many=True)
-        return Response(serializer.data)
+        posts = self.get_queryset().filter(category__slug=category_slug)
+        return self.conditional_list(posts, lambda: self._list_posts(posts))
     
     @action(detail=False, methods=['get'], url_path='tag/(?P<tag_slug>[^/.]+)')
     def by_tag(self, request, tag_slug=None):
         """Get posts by tag slug"""
-        posts = self.queryset.filter(tags__slug=tag_slug)
+        posts = self.get_queryset().filter(tags__slug=tag_slug)
+        return self.conditional_list(posts, lambda: self._list_posts(posts))
+
+    @action(detail=True, methods=['get'])
+    def related(self, request, slug=None):
+        """Precomputed most similar posts, best first"""
+        if not self.queryset.filter(slug=slug).exists():
+            return Response({'error': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
+        posts = self.get_queryset().filter(neighbour_of__source__slug=slug).order_by('neighbour_of__rank')
+        return self.conditional_list(posts, lambda: Response(self._list_serializer(posts).data))
+
+    @action(detail=False, methods=['get'])
+    def popular(self, request):
+        """Most viewed posts of the window, from its precomputed ranking"""
+        window = request.query_params.get('window', popularity.DEFAULT_WINDOW)
+        if window not in popularity.WINDOWS:
+            return Response(
+                {'error': f"window must be one of: {', '.join(popularity.WINDOWS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        ranking = popularity.top_posts(window)
+
+        def build():
+            posts = {post.pk: post for post in self.get_queryset().filter(pk__in=ranking)}
+            return Response(self._list_serializer([posts[pk] for pk in ranking if pk in posts]).data)
+
+        return conditional_response(request, make_etag(request, 'popular', *ranking), None, build)
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Archive and facet counts of the posts matching the list filters"""
+        names = {*self.filterset_class.base_filters, 'search'}
+        params = {name: value for name, value in request.query_params.items() if name in names}
+
+        def build():
+            posts = self.filter_queryset(self.get_queryset())
+            return Response(cached_facets(params, lambda: build_facets(posts)))
+
+        # The counts change only with the content version, which the ETag carries
+        return conditional_response(request, make_etag(request, 'facets'), None, build)
+
+    def _list_serializer(self, posts):
+        return get_list_serializer(self.expanded(BlogPostListSerializer), posts)
+
+    def _list_posts(self, posts):
         page = self.paginate_queryset(posts)
         if page is not None:
-            serializer = BlogPostListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = BlogPostListSerializer(posts, many=True)
-        return Response(serializer.data)
+            return self.get_paginated_response(self._list_serializer(page).data)
+        return Response(self._list_serializer(posts).data)
 
     @action(detail=True, methods=['get'])
     def image(self, request, slug=None):
         """Serve featured image (redirect to external URL or stream file)"""
-        from django.http import FileResponse
-        from django.shortcuts import redirect
         post = self.get_object()
-        if post.featured_image_file:
-            return FileResponse(post.featured_image_file.open('rb'), content_type=post.featured_image_mime or 'image/jpeg')
-        if post.featured_image_url:
-            return redirect(post.featured_image_url)
-        return Response({'error': 'Image not found'}, status=status.HTTP_404_NOT_FOUND)
+        return serve_media(request, post.featured_image_file, post.featured_image_mime or 'image/jpeg', post.featured_image_url, 'Image not found')
 
     @action(detail=True, methods=['get'])
     def og_image(self, request, slug=None):
         """Serve OG image (redirect to external URL or stream file)"""
-        from django.http import FileResponse
-        from django.shortcuts import redirect
         post = self.get_object()
-        if post.og_image_file:
-            return FileResponse(post.og_image_file.open('rb'), content_type=post.og_image_mime or 'image/jpeg')
-        if post.og_image_url:
-            return redirect(post.og_image_url)
-        return Response({'error': 'Image not found'}, status=status.HTTP_404_NOT_FOUND)
+        return serve_media(request, post.og_image_file, post.og_image_mime or 'image/jpeg', post.og_image_url, 'Image not found')
 
 
 # ============================================
 # TESTIMONIALS VIEWSET
 # ============================================
 
-class TestimonialViewSet(viewsets.ReadOnlyModelViewSet):
+class TestimonialViewSet(ConditionalGetMixin, ExpandMixin, BatchedImagesMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """Client/colleague testimonials"""
     queryset = Testimonial.objects.filter(is_visible=True)
     serializer_class = TestimonialSerializer
@@ -398,20 +492,13 @@ class TestimonialViewSet(viewsets.ReadOnlyModelViewSet):
     def featured(self, request):
         """Get featured testimonials"""
         testimonials = self.queryset.filter(is_featured=True)
-        serializer = self.get_serializer(testimonials, many=True)
-        return Response(serializer.data)
+        return self.conditional_list(testimonials, lambda: Response(self.get_serializer(testimonials, many=True).data))
 
     @action(detail=True, methods=['get'])
     def photo(self, request, slug=None):
         """Serve author image (redirect to external URL or stream file)"""
-        from django.http import FileResponse
-        from django.shortcuts import redirect
         testimonial = self.get_object()
-        if testimonial.author_image_file:
-            return FileResponse(testimonial.author_image_file.open('rb'), content_type=testimonial.author_image_mime or 'image/jpeg')
-        if testimonial.author_image_url:
-            return redirect(testimonial.author_image_url)
-        return Response({'error': 'Photo not found'}, status=status.HTTP_404_NOT_FOUND)
+        return serve_media(request, testimonial.author_image_file, testimonial.author_image_mime or 'image/jpeg', testimonial.author_image_url, 'Photo not found')
 
 
 # ============================================
@@ -446,26 +533,53 @@ class ContactMessageViewSet(viewsets.ModelViewSet):
 # IMAGE VIEWSET
 # ============================================
 
-class ImageViewSet(viewsets.ReadOnlyModelViewSet):
+@extend_schema_view(
+    transform=extend_schema(
+        tags=['Images'],
+        description='Resize and re-encode an uploaded image (external images redirect to their URL)',
+        parameters=[
+            OpenApiParameter('w', OpenApiTypes.INT, description='Target width in pixels'),
+            OpenApiParameter('h', OpenApiTypes.INT, description='Target height in pixels'),
+            OpenApiParameter('fit', OpenApiTypes.STR, enum=['contain', 'cover', 'fill'], description='Resize mode (default contain)'),
+            OpenApiParameter('fmt', OpenApiTypes.STR, enum=['webp', 'jpeg', 'png', 'avif'], description='Output format (default webp)'),
+            OpenApiParameter('q', OpenApiTypes.INT, description='Quality 1-100'),
+        ],
+        responses={(200, 'image/*'): OpenApiTypes.BINARY},
+    ),
+)
+class ImageViewSet(ConditionalGetMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """Gallery images"""
-    queryset = Image.objects.all()
+    queryset = Image.objects.select_related('content_type')
     serializer_class = ImageSerializer
     permission_classes = [AllowAny]
     lookup_field = 'uuid'
+    pagination_class = KeysetPagination
+    keyset_ordering = ('order', '-created_at', '-id')
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['image_type', 'content_type', 'object_id', 'show_on_home']
 
     @action(detail=True, methods=['get'])
     def data(self, request, uuid=None):
         """Return image (redirect to external URL or stream file) using UUID"""
-        from django.http import FileResponse
-        from django.shortcuts import redirect
         image = self.get_object()
-        if image.image_file:
-            return FileResponse(image.image_file.open('rb'), content_type=image.mime_type or 'image/jpeg')
-        if image.image_url:
-            return redirect(image.image_url)
-        return Response({'error': 'Image not found'}, status=status.HTTP_404_NOT_FOUND)
+        return serve_media(request, image.image_file, image.mime_type or 'image/jpeg', image.image_url, 'Image not found')
+
+    @action(detail=True, methods=['get'])
+    def transform(self, request, uuid=None):
+        """Serve a resized / re-encoded copy of the image file (see api/transform.py)"""
+        image = self.get_object()
+        if not image.image_file:
+            return serve_media(request, None, image.mime_type, image.image_url, 'Image not found')
+        try:
+            params = parse_params(request.query_params)
+        except TransformError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return transform_response(request, image.image_file, params)
+        except FileNotFoundError:
+            return Response({'error': 'Image not found'}, status=status.HTTP_404_NOT_FOUND)
+        except (OSError, PILImage.DecompressionBombError):
+            return Response({'error': 'Image cannot be transformed'}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
 
 
 # ============================================
@@ -475,7 +589,7 @@ class ImageViewSet(viewsets.ReadOnlyModelViewSet):
 @extend_schema_view(
     list=extend_schema(tags=['Configuration'], description='Get site configuration for frontend'),
 )
-class SiteConfigurationViewSet(viewsets.ReadOnlyModelViewSet):
+class SiteConfigurationViewSet(ConditionalGetMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for SiteConfiguration.
     GET /api/config/ - Get the current site configuration
@@ -491,9 +605,10 @@ class SiteConfigurationViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def current(self, request):
         """Get current site configuration - preferred endpoint"""
-        config = SiteConfiguration.get_config()
-        serializer = self.get_serializer(config)
-        return Response(serializer.data)
+        return self.conditional_list(
+            self.get_queryset(),
+            lambda: Response(self.get_serializer(SiteConfiguration.get_config()).data),
+        )
 
 
 # ============================================
@@ -503,8 +618,10 @@ class SiteConfigurationViewSet(viewsets.ReadOnlyModelViewSet):
 from rest_framework.views import APIView
 import time
 import logging
+from django.conf import settings
 from django.core.cache import cache
-from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save, m2m_changed
 
 logger = logging.getLogger('django')
 
@@ -519,9 +636,19 @@ class PortfolioDataView(APIView):
     permission_classes = [AllowAny]
     
     def get(self, request, *args, **kwargs):
-        # 1. Try to fetch from Django's shared cache first (e.g. locmem, redis, file, db)
-        cached_data = cache.get(CACHE_KEY)
-        if cached_data is not None:
+        # The payload only changes when the invalidation signals below fire, so
+        # the content version alone validates it - no database access for a 304.
+        etag = make_etag(request, CACHE_KEY)
+        return conditional_response(request, etag, None, lambda: self.build_response(request))
+
+    def build_response(self, request):
+        # 1. Try to fetch from Django's cache first (e.g. locmem, redis, file, db).
+        # The payload is stored with the content version it was built at, since
+        # another process may have bumped it since (see api/conditional.py)
+        version = get_content_version()
+        cached = cache.get(CACHE_KEY)
+        if cached is not None and cached[0] == version:
+            cached_data = cached[1]
             # Styled console log for immediate local dev visibility
             print("\n>>> [PORTFOLIO-DATA-CACHE] Serving home page dataset from cache (0.0ms)!\n")
             return Response(cached_data)
@@ -529,84 +656,86 @@ class PortfolioDataView(APIView):
         # 2. Cache miss -> Fetch and build the payload
         start_time = time.time()
         timings = {}
-        from django.db.models import Prefetch
-        
-        # Define prefetch rules for generic images with content_type pre-fetched
-        image_prefetch = Prefetch(
-            'images',
-            queryset=Image.objects.select_related('content_type')
-        )
-        
-        # 1. Profile Detail
+
+        # Collect every image-bearing object first so their generic images can be
+        # resolved by the request-scoped loader in a single query.
         t_start = time.time()
+        loader = ImageLoader.for_request(request)
         profile_obj = Profile.objects.prefetch_related(
             Prefetch('social_links', queryset=SocialLink.objects.all()),
             Prefetch('skills', queryset=Skill.objects.all()),
-            image_prefetch
         ).first()
+        experience = list(WorkExperience.objects.all().order_by('-start_date'))
+        education = list(Education.objects.all().order_by('-start_date'))
+        certificates = list(Certificate.objects.all().order_by('-issue_date'))
+        achievements = list(Achievement.objects.all().order_by('-date'))
+        testimonials = list(Testimonial.objects.filter(is_visible=True, is_featured=True).order_by('order', '-date'))
+        loader.load(profile_obj)
+        for instances in (experience, education, certificates, achievements, testimonials):
+            loader.load_many(instances)
+        loader.dispatch()
+        timings['0_image_batch'] = (time.time() - t_start) * 1000
+        
+        # 1. Profile Detail
+        t_start = time.time()
         profile_data = None
         if profile_obj:
-            profile_data = ProfileDetailSerializer(profile_obj, context={'request': request}).data
+            profile_data = serialize_instance(ProfileDetailSerializer, profile_obj, context={'request': request})
         timings['1_profile'] = (time.time() - t_start) * 1000
             
         # 2. Projects (all visible)
         t_start = time.time()
         projects = Project.objects.filter(is_visible=True).order_by('order', '-created_at')
-        projects_data = ProjectSerializer(projects, many=True, context={'request': request}).data
+        projects_data = get_list_serializer(ProjectSerializer, projects, context={'request': request}).data
         timings['2_projects'] = (time.time() - t_start) * 1000
         
         # 3. Featured & Show on Home Projects
         t_start = time.time()
         featured_projects = Project.objects.filter(is_visible=True, is_featured=True, show_on_home=True).order_by('order', '-created_at')
-        featured_projects_data = ProjectSerializer(featured_projects, many=True, context={'request': request}).data
+        featured_projects_data = get_list_serializer(ProjectSerializer, featured_projects, context={'request': request}).data
         timings['3_featured_projects'] = (time.time() - t_start) * 1000
         
         # 4. Blog posts shown on home
         t_start = time.time()
         blog_posts = BlogPost.objects.filter(status='published', show_on_home=True).select_related('category', 'profile').prefetch_related('tags').order_by('-published_at')
-        blog_posts_data = BlogPostListSerializer(blog_posts, many=True, context={'request': request}).data
+        blog_posts_data = get_list_serializer(BlogPostListSerializer, blog_posts, context={'request': request}).data
         timings['4_blog_posts'] = (time.time() - t_start) * 1000
         
         # 5. Work Experience
         t_start = time.time()
-        experience = WorkExperience.objects.prefetch_related(image_prefetch).all().order_by('-start_date')
-        experience_data = WorkExperienceSerializer(experience, many=True, context={'request': request}).data
+        experience_data = get_list_serializer(WorkExperienceSerializer, experience, context={'request': request}).data
         timings['5_experience'] = (time.time() - t_start) * 1000
         
         # 6. Education
         t_start = time.time()
-        education = Education.objects.prefetch_related(image_prefetch).all().order_by('-start_date')
-        education_data = EducationSerializer(education, many=True, context={'request': request}).data
+        education_data = get_list_serializer(EducationSerializer, education, context={'request': request}).data
         timings['6_education'] = (time.time() - t_start) * 1000
         
         # 7. Certificates
         t_start = time.time()
-        certificates = Certificate.objects.prefetch_related(image_prefetch).all().order_by('-issue_date')
-        certificates_data = CertificateSerializer(certificates, many=True, context={'request': request}).data
+        certificates_data = get_list_serializer(CertificateSerializer, certificates, context={'request': request}).data
         timings['7_certificates'] = (time.time() - t_start) * 1000
         
         # 8. Achievements
         t_start = time.time()
-        achievements = Achievement.objects.prefetch_related(image_prefetch).all().order_by('-date')
-        achievements_data = AchievementSerializer(achievements, many=True, context={'request': request}).data
+        achievements_data = get_list_serializer(AchievementSerializer, achievements, context={'request': request}).data
         timings['8_achievements'] = (time.time() - t_start) * 1000
         
         # 9. Testimonials
         t_start = time.time()
-        testimonials = Testimonial.objects.prefetch_related(image_prefetch).filter(is_visible=True, is_featured=True).order_by('order', '-date')
-        testimonials_data = TestimonialSerializer(testimonials, many=True, context={'request': request}).data
+        testimonials_data = get_list_serializer(TestimonialSerializer, testimonials, context={'request': request}).data
         timings['9_testimonials'] = (time.time() - t_start) * 1000
         
         # 10. Skills (limit 1000 like getSkills did)
         t_start = time.time()
         skills = Skill.objects.all().order_by('order')[:1000]
-        skills_data = SkillSerializer(skills, many=True, context={'request': request}).data
+        skills_data = get_list_serializer(SkillSerializer, skills, context={'request': request}).data
         timings['10_skills'] = (time.time() - t_start) * 1000
         
         # 11. Images (show_on_home=True)
         t_start = time.time()
         images = Image.objects.select_related('content_type').filter(show_on_home=True).order_by('order')[:100]
-        images_data = ImageSerializer(images, many=True, context={'request': request}).data
+        images_data = get_list_serializer(ImageSerializer, images, context={'request': request}).data
         timings['11_images'] = (time.time() - t_start) * 1000
         
         duration = time.time() - start_time
@@ -626,7 +755,7 @@ class PortfolioDataView(APIView):
         }
         
         # Cache the payload infinitely (timeout=None) until explicitly invalidated by signals
-        cache.set(CACHE_KEY, response_payload, timeout=None)
+        cache.set(CACHE_KEY, (version, response_payload), timeout=None)
         
         # Write to logger (production/syslog)
         logger.info(
@@ -648,8 +777,13 @@ class PortfolioDataView(APIView):
 # CACHE INVALIDATION SIGNALS
 # ============================================
 
-def clear_portfolio_cache(sender, **kwargs):
+# Saves touching only these fields (view counters) do not change ETags
+COUNTER_FIELDS = {'views_count'}
+
+def clear_portfolio_cache(sender, update_fields=None, **kwargs):
     cache.delete(CACHE_KEY)
+    if not (update_fields and set(update_fields) <= COUNTER_FIELDS):
+        bump_content_version()
     print(f"\n>>> [PORTFOLIO-DATA-CACHE] Cache invalidated due to model update: {sender.__name__}\n")
 
 # Auto-clear cache when any model that constructs the homepage payload is edited/deleted
@@ -657,3 +791,150 @@ for model in [Profile, SocialLink, Skill, Education, WorkExperience, Project, Ce
     post_save.connect(clear_portfolio_cache, sender=model)
     post_delete.connect(clear_portfolio_cache, sender=model)
 
+# Tag assignments are saved after the post itself
+m2m_changed.connect(clear_portfolio_cache, sender=BlogPost.tags.through)
+
+
+# ============================================
+# RESPONSIVE IMAGE VARIANTS & PLACEHOLDERS
+# ============================================
+
+def generate_image_variants(sender, instance, update_fields=None, **kwargs):
+    if not settings.IMAGE_VARIANTS:
+        return
+    fields = image_fields(sender)
+    if update_fields and not {f.name for f in fields} & set(update_fields):
+        return
+
+    def run():
+        # Responses rendered before the variants existed lack their srcsets
+        if ensure_variants(instance):
+            cache.delete(CACHE_KEY)
+            bump_content_version()
+
+    # After commit, so a failed save never leaves variants behind
+    transaction.on_commit(run)
+
+def refresh_image_metadata(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not {f.name for f in image_fields(sender)} & set(update_fields):
+        return
+
+    def invalidate():
+        cache.delete(CACHE_KEY)
+        bump_content_version()
+
+    schedule_image_metadata(instance, on_done=invalidate)
+
+for model in [Profile, Education, WorkExperience, Project, Certificate, Achievement, BlogPost, Testimonial, Image]:
+    if image_fields(model):
+        post_save.connect(generate_image_variants, sender=model)
+        post_save.connect(refresh_image_metadata, sender=model)
+
+
+# ============================================
+# OPEN GRAPH CARDS
+# ============================================
+
+def render_og_card(sender, instance, update_fields=None, **kwargs):
+    if not settings.OG_CARDS or (update_fields and 'updated_at' not in update_fields):
+        return
+    if sender is BlogPost and instance.status != 'published':
+        return
+    if sender is Project and not instance.is_visible:
+        return
+
+    def run():
+        try:
+            card = ensure_og_card(instance)
+        except Exception:
+            logger.exception(f"[OG-CARD] Rendering the card of {sender.__name__} #{instance.pk} failed")
+            return
+        if card:
+            # Detail responses cached before the card existed lack its og_image
+            cache.delete(CACHE_KEY)
+            bump_content_version()
+
+    transaction.on_commit(run)
+
+post_save.connect(render_og_card, sender=BlogPost)
+post_save.connect(render_og_card, sender=Project)
+
+
+# ============================================
+# PRERENDERED CRAWLER PAGES
+# ============================================
+
+def prerender_og_page(sender, instance, update_fields=None, **kwargs):
+    if not prerender.enabled() or (update_fields and 'updated_at' not in update_fields):
+        return
+
+    def run():
+        try:
+            prerender.refresh(instance)
+        except Exception:
+            logger.exception(f"[OG-PRERENDER] Prerendering {sender.__name__} #{instance.pk} failed")
+
+    # After the OG card (connected above), which the page links to
+    transaction.on_commit(run)
+
+def remove_prerendered_og_page(sender, instance, **kwargs):
+    if prerender.enabled():
+        transaction.on_commit(lambda: prerender.remove(instance))
+
+def remove_renamed_og_page(sender, instance, raw=False, **kwargs):
+    if raw or not prerender.enabled():
+        return
+    old_path = prerender.previous_path(instance)
+    if old_path:
+        # Crawlers would keep getting the file at the old slug
+        transaction.on_commit(lambda: prerender.remove_page(old_path))
+
+def rebuild_prerendered_og_pages(sender, update_fields=None, **kwargs):
+    # Every page carries the site name
+    if prerender.enabled() and not (update_fields and 'full_name' not in update_fields):
+        transaction.on_commit(prerender.rebuild)
+
+for route in OG_ROUTES:
+    pre_save.connect(remove_renamed_og_page, sender=route.model)
+    post_save.connect(prerender_og_page, sender=route.model)
+    post_delete.connect(remove_prerendered_og_page, sender=route.model)
+post_save.connect(rebuild_prerendered_og_pages, sender=Profile)
+
+
+# ============================================
+# RELATED CONTENT
+# ============================================
+
+def related_refreshed():
+    cache.delete(CACHE_KEY)
+    bump_content_version()
+
+def schedule_related_refresh(model, pk, also=()):
+    related.schedule(model, pk, also, on_done=related_refreshed)
+
+def refresh_related(sender, instance, update_fields=None, **kwargs):
+    if related.enabled() and not (update_fields and 'updated_at' not in update_fields):
+        schedule_related_refresh(sender, instance.pk)
+
+def refresh_related_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if not related.enabled() or action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        schedule_related_refresh(BlogPost, instance.pk)
+    else:
+        # tag.posts.add(...): the posts are in pk_set
+        for pk in pk_set or ():
+            schedule_related_refresh(BlogPost, pk)
+
+def refresh_related_on_delete(sender, instance, **kwargs):
+    if not related.enabled():
+        return
+    # Read before the delete cascades to the rows pointing at the instance
+    link_model = related.KINDS[sender].link_model
+    sources = list(link_model.objects.filter(target_id=instance.pk).values_list('source_id', flat=True))
+    schedule_related_refresh(sender, instance.pk, also=sources)
+
+for model in related.KINDS:
+    post_save.connect(refresh_related, sender=model)
+    pre_delete.connect(refresh_related_on_delete, sender=model)
+m2m_changed.connect(refresh_related_tags, sender=BlogPost.tags.through)
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -90,6 +91,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Serve static files efficiently
+    'api.media_middleware.MediaFilesMiddleware',  # Serve MEDIA_ROOT without hitting the DB
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # Must be before CommonMiddleware
     # Intercept social crawler requests and serve pre-rendered OG meta tags
@@ -152,6 +154,36 @@ elif os.environ.get('USE_POSTGRES', 'False') == 'True':
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Without CACHE_URL every process (gunicorn worker, serverless instance) has its
+# own LocMemCache, so the API content version behind ETags and cached documents
+# is kept in the database instead: one primary-key read per request (see
+# api/conditional.py). With a cache shared by all processes it is kept there and
+# a 304 needs no query.
+#   CACHE_URL='redis://host:6379/0'   needs the `redis` package
+#   CACHE_URL='db'                    run `python manage.py createcachetable` on deploy
+CACHE_URL = os.getenv('CACHE_URL', '')
+if CACHE_URL == 'db':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+        }
+    }
+elif CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+# Only set this with a single process, or a CACHES backend configured elsewhere
+# that every process shares
+CONTENT_VERSION_IN_CACHE = os.getenv('CONTENT_VERSION_IN_CACHE', str(bool(CACHE_URL))).lower() == 'true'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -201,17 +233,32 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/portfolio_media/'
 MEDIA_ROOT = BASE_DIR / 'portfolio_media'
 
+# Let the web server stream files for the API media endpoints (see api/media.py).
+# Only applies to filesystem storage. Prefix of an nginx `internal` location
+# aliased to MEDIA_ROOT, e.g. '/protected-media/':
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX', '')
+# Apache mod_xsendfile / lighttpd:
+MEDIA_SENDFILE = os.getenv('MEDIA_SENDFILE', 'False').lower() == 'true'
+
+# Store local uploads once per content under cas/<sha256> (see api/storage.py).
+CONTENT_ADDRESSED_MEDIA = os.getenv('CONTENT_ADDRESSED_MEDIA', 'True').lower() == 'true'
+
 # -------------------------
 # Cloudinary / External Media Toggle
 # -------------------------
 USE_CLOUDINARY = os.getenv('USE_CLOUDINARY', 'False').lower() == 'true'
 
+# Memoize storage.url(name) in an LRU of this many names per storage
+# (see api/storage.py URLCacheMixin); 0 disables it.
+MEDIA_URL_CACHE_SIZE = int(os.getenv('MEDIA_URL_CACHE_SIZE', '4096'))
+
 if USE_CLOUDINARY:
     # Add Cloudinary apps and configure storages to use Cloudinary for media
     INSTALLED_APPS += ['cloudinary_storage', 'cloudinary']
     STORAGES = {
         "default": {
-            "BACKEND": "cloudinary_storage.storage.MediaCloudinaryStorage",
+            "BACKEND": "api.cloud_storage.CachedMediaCloudinaryStorage",
+            "OPTIONS": {"url_cache_size": MEDIA_URL_CACHE_SIZE},
         },
         # Keep static files local in development, only use Cloudinary for media
         "staticfiles": {
@@ -225,13 +272,90 @@ else:
     # Default to local filesystem storage for development
     STORAGES = {
         "default": {
-            "BACKEND": "django.core.files.storage.FileSystemStorage",
+            "BACKEND": "api.storage.ContentAddressedStorage" if CONTENT_ADDRESSED_MEDIA else "api.storage.CachedURLFileSystemStorage",
+            "OPTIONS": {"url_cache_size": MEDIA_URL_CACHE_SIZE},
         },
         "staticfiles": {
             "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage" if not DEBUG else "django.contrib.staticfiles.storage.StaticFilesStorage",
         },
     }
 
+# Serve MEDIA_ROOT from an in-memory index at MEDIA_URL, also without DEBUG
+# (see api/media_middleware.py). Pointless when media lives on Cloudinary.
+MEDIA_SERVE = os.getenv('MEDIA_SERVE', str(not USE_CLOUDINARY)).lower() == 'true'
+# Cache lifetime of media that is not content-addressed (cas/ files are immutable)
+MEDIA_SERVE_MAX_AGE = int(os.getenv('MEDIA_SERVE_MAX_AGE', '3600'))
+
+# Responsive variants of uploaded images (see api/variants.py). Cloudinary
+# resizes on its own, so they are only generated for local storage by default.
+IMAGE_VARIANTS = os.getenv('IMAGE_VARIANTS', str(not USE_CLOUDINARY)).lower() == 'true'
+IMAGE_VARIANT_WIDTHS = [int(w) for w in os.getenv('IMAGE_VARIANT_WIDTHS', '320,640,960,1280').split(',') if w.strip()]
+IMAGE_VARIANT_QUALITY = int(os.getenv('IMAGE_VARIANT_QUALITY', '80'))
+
+# On-the-fly transformations at /api/media/transform/<uuid>/ (see api/transform.py)
+IMAGE_TRANSFORM_CACHE_DIR = os.getenv('IMAGE_TRANSFORM_CACHE_DIR') or str(BASE_DIR / 'portfolio_media_cache')
+IMAGE_TRANSFORM_CACHE_SIZE = int(os.getenv('IMAGE_TRANSFORM_CACHE_SIZE_MB', '256')) * 1024 * 1024
+IMAGE_TRANSFORM_MAX_DIMENSION = int(os.getenv('IMAGE_TRANSFORM_MAX_DIMENSION', '2560'))
+
+# Image dimensions / dominant colour / blurred placeholders (see api/placeholders.py)
+# are computed on a background thread after saves. Disable where threads do not
+# outlive the request (serverless) to compute them during the save instead.
+IMAGE_METADATA_ASYNC = os.getenv('IMAGE_METADATA_ASYNC', 'True').lower() == 'true'
+
+# Uploaded images are re-oriented, stripped of metadata, re-encoded and squeezed
+# into a per-kind byte budget before they are stored (see api/uploads.py).
+IMAGE_UPLOAD_OPTIMIZE = os.getenv('IMAGE_UPLOAD_OPTIMIZE', 'True').lower() == 'true'
+IMAGE_UPLOAD_FORMAT = os.getenv('IMAGE_UPLOAD_FORMAT', 'webp').lower()
+IMAGE_UPLOAD_QUALITY = int(os.getenv('IMAGE_UPLOAD_QUALITY', '85'))
+IMAGE_UPLOAD_MAX_DIMENSION = int(os.getenv('IMAGE_UPLOAD_MAX_DIMENSION', '2560'))
+IMAGE_UPLOAD_BUDGETS = {
+    kind: int(kb) * 1024
+    for kind, kb in (
+        item.split('=') for item in
+        os.getenv('IMAGE_UPLOAD_BUDGETS_KB', 'og=300,logo=150,avatar=200,default=500').split(',') if item.strip()
+    )
+}
+IMAGE_UPLOAD_BUDGETS.setdefault('default', 500 * 1024)
+# Keep untouched originals here (outside MEDIA_ROOT; empty = discard them)
+IMAGE_UPLOAD_ARCHIVE_DIR = os.getenv('IMAGE_UPLOAD_ARCHIVE_DIR', '')
+
+# Generated 1200x630 OG cards for posts/projects without an OG image (see api/og_cards.py)
+OG_CARDS = os.getenv('OG_CARDS', 'True').lower() == 'true'
+OG_CARD_FONT = os.getenv('OG_CARD_FONT', '')
+OG_CARD_FONT_BOLD = os.getenv('OG_CARD_FONT_BOLD', '')
+# Cards missing when a crawler asks for the page are rendered on a background
+# thread; 'False' renders them during that request (serverless hosts)
+OG_CARD_ASYNC = os.getenv('OG_CARD_ASYNC', str(IMAGE_METADATA_ASYNC)).lower() == 'true'
+# Public origin of this API (e.g. https://api.example.com). og:image must be an
+# absolute URL: upload paths are prefixed with it, else with the request's host
+# (prerendered pages have no request and need it)
+BACKEND_BASE_URL = os.getenv('BACKEND_URL', '').rstrip('/')
+
+# Crawler OG pages written to disk on publish/save (see api/prerender.py), served
+# by the OG middleware or the edge without queries. Needs the frontend's URL,
+# since the pages carry canonical links.
+OG_PRERENDER_BASE_URL = os.getenv('FRONTEND_URL', '').rstrip('/')
+OG_PRERENDER = os.getenv('OG_PRERENDER', str(bool(OG_PRERENDER_BASE_URL))).lower() == 'true'
+OG_PRERENDER_DIR = os.getenv('OG_PRERENDER_DIR') or str(BASE_DIR / 'og_pages')
+OG_PRERENDER_URL = '/og/'
+
+# Precomputed related posts/projects, refreshed after saves (see api/related.py)
+RELATED_CONTENT = os.getenv('RELATED_CONTENT', 'True').lower() == 'true'
+RELATED_CONTENT_SIZE = int(os.getenv('RELATED_CONTENT_SIZE', '5'))
+# Refreshed on a background thread after commit; 'False' refreshes during the
+# save (serverless hosts)
+RELATED_CONTENT_ASYNC = os.getenv('RELATED_CONTENT_ASYNC', str(IMAGE_METADATA_ASYNC)).lower() == 'true'
+
+# Time-decayed popular posts (see api/popularity.py): half-life of a view in the
+# all-time score, size of each window's precomputed top list and how long it is reused
+POPULAR_HALF_LIFE_DAYS = float(os.getenv('POPULAR_HALF_LIFE_DAYS', '7'))
+# Zero or negative would divide by zero or favour old views; under an hour the
+# all-time score is little more than the last few views
+if POPULAR_HALF_LIFE_DAYS < 1 / 24:
+    raise ImproperlyConfigured('POPULAR_HALF_LIFE_DAYS must be at least one hour (1/24)')
+POPULAR_POSTS_SIZE = int(os.getenv('POPULAR_POSTS_SIZE', '10'))
+POPULAR_POSTS_TTL = int(os.getenv('POPULAR_POSTS_TTL', '300'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -261,6 +385,10 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# Serialize read-only list responses through generated functions instead of the
+# DRF field machinery (see api/compiled_serializers.py). Output is identical.
+COMPILED_SERIALIZERS = os.getenv('COMPILED_SERIALIZERS', 'True').lower() == 'true'
+
 
 # ============================================
 # SWAGGER/OPENAPI CONFIGURATION
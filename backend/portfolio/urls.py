@@ -15,9 +15,10 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 from api.admin import portfolio_admin_site
+from api.sitemaps import sitemap_index, sitemap_section
 from django.conf import settings
 from django.conf.urls.static import static
 
@@ -29,8 +30,13 @@ urlpatterns = [
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+
+    # Sitemaps of the frontend's database content (api/sitemaps.py)
+    path('sitemap.xml', sitemap_index, name='sitemap-index'),
+    re_path(r'^sitemap-(?P<section>[a-z]+)(?:-(?P<page>[0-9]+))?\.xml$', sitemap_section, name='sitemap-section'),
 ]
 
-# Serve media files during development
-if settings.DEBUG:
+# Serve media files during development (api.media_middleware.MediaFilesMiddleware
+# serves them whenever MEDIA_SERVE is on)
+if settings.DEBUG and not settings.MEDIA_SERVE:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
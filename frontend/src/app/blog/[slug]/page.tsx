@@ -33,7 +33,7 @@ export async function generateMetadata({
       title: post.title,
       description: post.excerpt,
       baseURL: baseURL,
-      image: post.featured_image || `/api/og/generate?title=${encodeURIComponent(post.title)}`,
+      image: post.og_image || post.featured_image || `/api/og/generate?title=${encodeURIComponent(post.title)}`,
       path: `${blog.path}/${post.slug}`,
     });
   } catch (error) {
@@ -67,7 +67,7 @@ export default async function PostPage({
         datePublished={post.published_at || post.created_at}
         dateModified={post.updated_at}
         image={
-          post.featured_image || `/api/og/generate?title=${encodeURIComponent(post.title)}`
+          post.og_image || post.featured_image || `/api/og/generate?title=${encodeURIComponent(post.title)}`
         }
         author={{
           name: person.name,
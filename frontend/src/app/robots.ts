@@ -1,5 +1,9 @@
 import { baseURL } from "@/resources";
 
+// Database content is listed by the backend's sitemap index, which serves
+// its child sitemaps itself; ours only covers the local MDX pages.
+const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://127.0.0.1:8000";
+
 export default function robots() {
   return {
     rules: [
@@ -7,6 +11,6 @@ export default function robots() {
         userAgent: "*",
       },
     ],
-    sitemap: `${baseURL}/sitemap.xml`,
+    sitemap: [`${API_URL}/sitemap.xml`, `${baseURL}/sitemap.xml`],
   };
 }
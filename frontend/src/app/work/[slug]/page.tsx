@@ -37,7 +37,7 @@ export async function generateMetadata({
       title: project.title,
       description: project.short_description,
       baseURL: baseURL,
-      image: project.featured_image || `/api/og/generate?title=${encodeURIComponent(project.title)}`,
+      image: project.og_image || project.featured_image || `/api/og/generate?title=${encodeURIComponent(project.title)}`,
       path: `${work.path}/${project.slug}`,
     });
   } catch (error) {
@@ -86,7 +86,7 @@ export default async function Project({
         datePublished={project.created_at}
         dateModified={project.updated_at}
         image={
-          project.featured_image || `/api/og/generate?title=${encodeURIComponent(project.title)}`
+          project.og_image || project.featured_image || `/api/og/generate?title=${encodeURIComponent(project.title)}`
         }
         author={{
           name: person.name,
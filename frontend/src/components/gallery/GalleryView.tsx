@@ -90,9 +90,11 @@ export default function GalleryView() {
               <Image
                 src={img.data_uri || img.image_url}
                 alt={img.alt_text || img.caption || "Gallery Image"}
-                width={img.width || 400}
-                height={img.height || 300}
-                style={{ width: "100%", height: "auto", objectFit: "cover" }}
+                width={img.width || img.placeholder?.width || 400}
+                height={img.height || img.placeholder?.height || 300}
+                style={{ width: "100%", height: "auto", objectFit: "cover", backgroundColor: img.placeholder?.color }}
+                placeholder={img.placeholder?.lqip ? "blur" : "empty"}
+                blurDataURL={img.placeholder?.lqip}
                 unoptimized={!!img.data_uri}
               />
             </button>
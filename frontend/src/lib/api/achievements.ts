@@ -17,11 +17,11 @@ export const achievementsApi = {
    * Get all achievements
    */
   list: (params?: AchievementFilters) =>
-    apiClient.get<PaginatedAchievements>('/achievements/', params),
+    apiClient.get<PaginatedAchievements>('/achievements/', { expand: 'images', ...params }),
 
   /**
    * Get achievement by slug
    */
   get: (slug: string) =>
-    apiClient.get<Achievement>(`/achievements/${slug}/`),
+    apiClient.get<Achievement>(`/achievements/${slug}/`, { expand: 'images' }),
 };
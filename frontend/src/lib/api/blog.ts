@@ -9,6 +9,7 @@ import type {
   BlogPostDetail,
   BlogCategory,
   BlogTag,
+  BlogFacets,
   PaginatedBlogPosts,
   PaginatedBlogCategories,
   PaginatedBlogTags,
@@ -21,6 +22,10 @@ import type {
 interface BlogCategoryParams extends PaginationParams, SearchParams, OrderingParams {}
 interface BlogTagParams extends PaginationParams, SearchParams, OrderingParams {}
 
+// Embed the nested objects the BlogPost* types describe
+const POST_LIST_EXPAND = 'category,tags';
+const POST_DETAIL_EXPAND = 'category,tags,images';
+
 /**
  * Blog API Service
  */
@@ -29,31 +34,49 @@ export const blogApi = {
    * Get all published blog posts (paginated)
    */
   list: (params?: BlogFilters) =>
-    apiClient.get<PaginatedBlogPosts>('/blog/', params),
+    apiClient.get<PaginatedBlogPosts>('/blog/', { expand: POST_LIST_EXPAND, ...params }),
 
   /**
    * Get blog post by slug (increments view count)
    */
   get: (slug: string) =>
-    apiClient.get<BlogPostDetail>(`/blog/${slug}/`),
+    apiClient.get<BlogPostDetail>(`/blog/${slug}/`, { expand: POST_DETAIL_EXPAND }),
 
   /**
    * Get featured blog posts
    */
   getFeatured: () =>
-    apiClient.get<BlogPost[]>('/blog/featured/'),
+    apiClient.get<BlogPost[]>('/blog/featured/', { expand: POST_LIST_EXPAND }),
 
   /**
    * Get posts by category slug
    */
   getByCategory: (categorySlug: string) =>
-    apiClient.get<PaginatedBlogPosts>(`/blog/category/${categorySlug}/`),
+    apiClient.get<PaginatedBlogPosts>(`/blog/category/${categorySlug}/`, { expand: POST_LIST_EXPAND }),
 
   /**
    * Get posts by tag slug
    */
   getByTag: (tagSlug: string) =>
-    apiClient.get<PaginatedBlogPosts>(`/blog/tag/${tagSlug}/`),
+    apiClient.get<PaginatedBlogPosts>(`/blog/tag/${tagSlug}/`, { expand: POST_LIST_EXPAND }),
+
+  /**
+   * Get the most similar posts (precomputed)
+   */
+  getRelated: (slug: string) =>
+    apiClient.get<BlogPost[]>(`/blog/${slug}/related/`, { expand: POST_LIST_EXPAND }),
+
+  /**
+   * Get the most viewed posts of a window, recent views weighing more
+   */
+  getPopular: (window: '1d' | '7d' | '30d' | '90d' | 'all' = '7d') =>
+    apiClient.get<BlogPost[]>('/blog/popular/', { expand: POST_LIST_EXPAND, window }),
+
+  /**
+   * Get category, tag and year/month counts of the posts matching the filters
+   */
+  getFacets: (params?: BlogFilters) =>
+    apiClient.get<BlogFacets>('/blog/facets/', params),
 
   // Categories
   categories: {
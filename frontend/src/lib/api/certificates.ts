@@ -17,11 +17,11 @@ export const certificatesApi = {
    * Get all certificates
    */
   list: (params?: CertificateFilters) =>
-    apiClient.get<PaginatedCertificates>('/certificates/', params),
+    apiClient.get<PaginatedCertificates>('/certificates/', { expand: 'images', ...params }),
 
   /**
    * Get certificate by ID
    */
   get: (id: number) =>
-    apiClient.get<Certificate>(`/certificates/${id}/`),
+    apiClient.get<Certificate>(`/certificates/${id}/`, { expand: 'images' }),
 };
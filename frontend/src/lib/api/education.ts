@@ -17,11 +17,11 @@ export const educationApi = {
    * Get all education records
    */
   list: (params?: EducationFilters) =>
-    apiClient.get<PaginatedEducation>('/education/', params),
+    apiClient.get<PaginatedEducation>('/education/', { expand: 'images', ...params }),
 
   /**
    * Get education by slug
    */
   get: (slug: string) =>
-    apiClient.get<Education>(`/education/${slug}/`),
+    apiClient.get<Education>(`/education/${slug}/`, { expand: 'images' }),
 };
@@ -24,11 +24,17 @@ export const projectsApi = {
    * Get project by slug
    */
   get: (slug: string) =>
-    apiClient.get<ProjectDetail>(`/projects/${slug}/`),
+    apiClient.get<ProjectDetail>(`/projects/${slug}/`, { expand: 'images' }),
 
   /**
    * Get featured projects
    */
   getFeatured: () =>
     apiClient.get<Project[]>('/projects/featured/'),
+
+  /**
+   * Get the most similar projects (precomputed)
+   */
+  getRelated: (slug: string) =>
+    apiClient.get<Project[]>(`/projects/${slug}/related/`),
 };
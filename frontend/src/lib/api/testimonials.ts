@@ -17,17 +17,17 @@ export const testimonialsApi = {
    * Get all testimonials
    */
   list: (params?: TestimonialFilters) =>
-    apiClient.get<PaginatedTestimonials>('/testimonials/', params),
+    apiClient.get<PaginatedTestimonials>('/testimonials/', { expand: 'images', ...params }),
 
   /**
    * Get testimonial by slug
    */
   get: (slug: string) =>
-    apiClient.get<Testimonial>(`/testimonials/${slug}/`),
+    apiClient.get<Testimonial>(`/testimonials/${slug}/`, { expand: 'images' }),
 
   /**
    * Get featured testimonials
    */
   getFeatured: () =>
-    apiClient.get<Testimonial[]>('/testimonials/featured/'),
+    apiClient.get<Testimonial[]>('/testimonials/featured/', { expand: 'images' }),
 };
@@ -17,11 +17,11 @@ export const workExperienceApi = {
    * Get all work experiences
    */
   list: (params?: WorkExperienceFilters) =>
-    apiClient.get<PaginatedWorkExperience>('/work-experience/', params),
+    apiClient.get<PaginatedWorkExperience>('/work-experience/', { expand: 'images', ...params }),
 
   /**
    * Get work experience by ID
    */
   get: (id: number) =>
-    apiClient.get<WorkExperience>(`/work-experience/${id}/`),
+    apiClient.get<WorkExperience>(`/work-experience/${id}/`, { expand: 'images' }),
 };
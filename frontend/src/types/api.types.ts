@@ -14,6 +14,24 @@ export type SkillType = 'technical' | 'soft' | 'tool' | 'language' | 'framework'
 export type SocialPlatform = 'linkedin' | 'github' | 'twitter' | 'instagram' | 'facebook' | 'youtube' | 'dribbble' | 'behance' | 'medium' | 'dev' | 'stackoverflow' | 'website' | 'other';
 export type ImageType = 'cover' | 'gallery' | 'thumbnail' | 'logo' | 'avatar' | 'og' | 'other';
 
+/**
+ * `srcset` strings of the resized copies of an uploaded image, per format
+ * (`webp` plus a `jpeg` or `png` fallback). null when there are none.
+ */
+export type Srcset = Partial<Record<'webp' | 'jpeg' | 'png', string>> | null;
+
+/**
+ * Layout data computed in the background for an image: size, dominant colour
+ * and a tiny blurred preview (`data:` URI). null until computed.
+ */
+export type ImagePlaceholder = {
+  width: number;
+  height: number;
+  aspect_ratio: number | null;
+  color: string;
+  lqip: string;
+} | null;
+
 // Base Models
 export interface Image {
   id: number;
@@ -27,6 +45,8 @@ export interface Image {
   caption?: string;
   order: number;
   image_url: string;
+  srcset?: Srcset;
+  placeholder?: ImagePlaceholder;
   data_uri: string;
   created_at: string;
 }
@@ -65,12 +85,28 @@ export interface BlogCategory {
   show_on_home?: boolean;
 }
 
+export interface FacetCount {
+  slug: string;
+  name: string;
+  count: number;
+}
+
+export interface BlogFacets {
+  count: number;
+  categories: FacetCount[];
+  tags: FacetCount[];
+  years: { year: number; count: number }[];
+  months: { month: string; count: number }[];  // "YYYY-MM", newest first
+}
+
 export interface Profile {
   id: number;
   full_name: string;
   headline: string;
   bio: string;
   profile_image: string;
+  profile_image_srcset?: Srcset;
+  profile_image_placeholder?: ImagePlaceholder;
   email: string;
   phone?: string;
   location?: string;
@@ -99,6 +135,8 @@ export interface Achievement {
   description?: string;
   url?: string;
   image: string;
+  image_srcset?: Srcset;
+  image_placeholder?: ImagePlaceholder;
   order: number;
   images: Image[];
   show_on_home?: boolean;
@@ -109,12 +147,16 @@ export interface Certificate {
   title: string;
   issuing_organization: string;
   organization_logo: string;
+  organization_logo_srcset?: Srcset;
+  organization_logo_placeholder?: ImagePlaceholder;
   issue_date: string;
   expiry_date?: string | null;
   does_not_expire: boolean;
   credential_id?: string;
   credential_url?: string;
   certificate_image: string;
+  certificate_image_srcset?: Srcset;
+  certificate_image_placeholder?: ImagePlaceholder;
   description?: string;
   skills?: string;
   order: number;
@@ -134,6 +176,8 @@ export interface Education {
   description?: string;
   location?: string;
   logo: string;
+  logo_srcset?: Srcset;
+  logo_placeholder?: ImagePlaceholder;
   images: Image[];
   show_on_home?: boolean;
 }
@@ -142,6 +186,8 @@ export interface WorkExperience {
   id: number;
   company_name: string;
   company_logo: string;
+  company_logo_srcset?: Srcset;
+  company_logo_placeholder?: ImagePlaceholder;
   company_url?: string;
   job_title: string;
   employment_type?: EmploymentType;
@@ -164,6 +210,8 @@ export interface Testimonial {
   author_title: string;
   author_company?: string;
   author_image: string;
+  author_image_srcset?: Srcset;
+  author_image_placeholder?: ImagePlaceholder;
   content: string;
   rating?: number;
   relationship?: string;
@@ -181,6 +229,8 @@ export interface Project {
   slug: string;
   short_description: string;
   featured_image: string;
+  featured_image_srcset?: Srcset;
+  featured_image_placeholder?: ImagePlaceholder;
   featured_image_alt?: string;
   live_url?: string;
   github_url?: string;
@@ -201,6 +251,7 @@ export interface ProjectDetail extends Project {
   start_date?: string | null;
   end_date?: string | null;
   images: Image[];
+  og_image?: string | null;
 }
 
 export interface BlogPostList {
@@ -209,6 +260,8 @@ export interface BlogPostList {
   slug: string;
   excerpt: string;
   featured_image: string;
+  featured_image_srcset?: Srcset;
+  featured_image_placeholder?: ImagePlaceholder;
   featured_image_alt?: string;
   category: BlogCategory;
   tags: BlogTag[];
@@ -216,6 +269,7 @@ export interface BlogPostList {
   status?: BlogStatus;
   published_at?: string | null;
   reading_time?: number;
+  word_count?: number;
   views_count?: number;
   is_featured: boolean;
   created_at: string;
@@ -227,7 +281,16 @@ export interface BlogPost extends BlogPostList {
   content: string;
 }
 
+export interface TocEntry {
+  level: number;
+  id: string;
+  name: string;
+  children: TocEntry[];
+}
+
 export interface BlogPostDetail extends BlogPost {
+  content_html: string;
+  toc: TocEntry[];
   images: Image[];
   allow_comments: boolean;
   meta_title?: string;
@@ -236,7 +299,7 @@ export interface BlogPostDetail extends BlogPost {
   canonical_url?: string;
   og_title?: string;
   og_description?: string;
-  og_image: string;
+  og_image: string | null;
   schema_type?: string;
 }
 
@@ -284,13 +347,21 @@ export interface OrderingParams {
   ordering?: string;
 }
 
-export interface AchievementFilters extends PaginationParams, SearchParams, OrderingParams {
+/**
+ * Nested relations to embed, e.g. `images` or `category,tags` (`*` for all).
+ * Relations that are not expanded come back as ids / URLs.
+ */
+export interface ExpandParams {
+  expand?: string;
+}
+
+export interface AchievementFilters extends PaginationParams, SearchParams, OrderingParams, ExpandParams {
   achievement_type?: AchievementType;
   profile?: number;
   show_on_home?: boolean;
 }
 
-export interface BlogFilters extends PaginationParams, SearchParams, OrderingParams {
+export interface BlogFilters extends PaginationParams, SearchParams, OrderingParams, ExpandParams {
   category?: number;
   tags?: number[];
   is_featured?: boolean;
@@ -298,13 +369,13 @@ export interface BlogFilters extends PaginationParams, SearchParams, OrderingPar
   show_on_home?: boolean;
 }
 
-export interface CertificateFilters extends PaginationParams, SearchParams, OrderingParams {
+export interface CertificateFilters extends PaginationParams, SearchParams, OrderingParams, ExpandParams {
   does_not_expire?: boolean;
   profile?: number;
   show_on_home?: boolean;
 }
 
-export interface EducationFilters extends PaginationParams, OrderingParams {
+export interface EducationFilters extends PaginationParams, OrderingParams, ExpandParams {
   is_current?: boolean;
   profile?: number;
   show_on_home?: boolean;
@@ -317,7 +388,7 @@ export interface ImageFilters extends PaginationParams {
   show_on_home?: boolean;
 }
 
-export interface ProjectFilters extends PaginationParams, SearchParams, OrderingParams {
+export interface ProjectFilters extends PaginationParams, SearchParams, OrderingParams, ExpandParams {
   status?: ProjectStatus;
   is_featured?: boolean;
   profile?: number;
@@ -337,14 +408,14 @@ export interface SocialLinkFilters extends PaginationParams {
   show_on_home?: boolean;
 }
 
-export interface TestimonialFilters extends PaginationParams, OrderingParams {
+export interface TestimonialFilters extends PaginationParams, OrderingParams, ExpandParams {
   rating?: number;
   is_featured?: boolean;
   profile?: number;
   show_on_home?: boolean;
 }
 
-export interface WorkExperienceFilters extends PaginationParams, SearchParams, OrderingParams {
+export interface WorkExperienceFilters extends PaginationParams, SearchParams, OrderingParams, ExpandParams {
   employment_type?: EmploymentType;
   work_mode?: WorkMode;
   is_current?: boolean;
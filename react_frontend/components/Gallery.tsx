@@ -9,7 +9,7 @@ interface GalleryProps {
 }
 
 export const Gallery: React.FC<GalleryProps> = ({ images = [], className = '', columns }) => {
-  const norm = (images as any[]).map((i) => ({ src: i.image_url || i.src || i, alt: i.alt_text || i.alt || '', caption: i.caption || '' }));
+  const norm = (images as any[]).map((i) => ({ src: i.image_url || i.src || i, alt: i.alt_text || i.alt || '', caption: i.caption || '', placeholder: i.placeholder || null }));
   const [open, setOpen] = useState(false);
   const [index, setIndex] = useState(0);
 
@@ -31,9 +31,14 @@ export const Gallery: React.FC<GalleryProps> = ({ images = [], className = '', c
             key={i}
             onClick={() => { setIndex(i); setOpen(true); }}
             className="relative overflow-hidden rounded-[1.5rem] p-0 border-0 bg-transparent cursor-pointer"
-            style={{ aspectRatio: '16/9' }}
+            style={{
+              aspectRatio: '16/9',
+              backgroundColor: img.placeholder?.color,
+              backgroundImage: img.placeholder?.lqip ? `url(${img.placeholder.lqip})` : undefined,
+              backgroundSize: 'cover',
+            }}
           >
-            <img src={img.src} alt={img.alt} className="w-full h-full object-cover rounded-[1.5rem]" />
+            <img src={img.src} alt={img.alt} loading="lazy" className="w-full h-full object-cover rounded-[1.5rem]" />
           </button>
         ))}
       </div>
@@ -63,9 +63,10 @@ export const api = {
       search: params.search,
       status: params.status,
       limit: params.limit || undefined,
-      offset: params.page ? (params.page - 1) * (params.limit || 15) : undefined
+      offset: params.page ? (params.page - 1) * (params.limit || 15) : undefined,
+      expand: 'images'
     }),
-  getProjectDetail: (slug: string) => fetchJson<Project>(`/projects/${slug}/`),
+  getProjectDetail: (slug: string) => fetchJson<Project>(`/projects/${slug}/`, { expand: 'images' }),
 
   getBlogPosts: (params: { featured?: boolean; page?: number; show_on_home?: boolean; search?: string; category?: string; tags?: string; limit?: number } = {}) => 
     fetchJson<PaginatedResponse<BlogPost>>('/blog/', { 
@@ -75,25 +76,26 @@ export const api = {
       category: params.category,
       tags: params.tags,
       limit: params.limit || undefined,
-      offset: params.page ? (params.page - 1) * (params.limit || 15) : undefined
+      offset: params.page ? (params.page - 1) * (params.limit || 15) : undefined,
+      expand: 'category,tags'
     }),
-  getBlogPostDetail: (slug: string) => fetchJson<BlogPost>(`/blog/${slug}/`),
+  getBlogPostDetail: (slug: string) => fetchJson<BlogPost>(`/blog/${slug}/`, { expand: 'category,tags,images' }),
   getBlogCategories: () => fetchJson<PaginatedResponse<BlogCategory>>('/blog/categories/'),
 
   getExperience: (params: { show_on_home?: boolean; page?: number } = {}) => fetchJson<PaginatedResponse<WorkExperience>>('/work-experience/', { show_on_home: params.show_on_home ? 'true' : undefined, ordering: '-start_date', page: params.page }),
-  getExperienceDetail: (id: number) => fetchJson<WorkExperience>(`/work-experience/${id}/`),
+  getExperienceDetail: (id: number) => fetchJson<WorkExperience>(`/work-experience/${id}/`, { expand: 'images' }),
 
   getEducation: (params: { show_on_home?: boolean; page?: number } = {}) => fetchJson<PaginatedResponse<Education>>('/education/', { show_on_home: params.show_on_home ? 'true' : undefined, ordering: '-start_date', page: params.page }),
-  getEducationDetail: (slug: string) => fetchJson<Education>(`/education/${slug}/`),
+  getEducationDetail: (slug: string) => fetchJson<Education>(`/education/${slug}/`, { expand: 'images' }),
 
   getCertificates: (params: { show_on_home?: boolean; page?: number } = {}) => fetchJson<PaginatedResponse<Certificate>>('/certificates/', { show_on_home: params.show_on_home ? 'true' : undefined, ordering: '-issue_date', page: params.page }),
-  getCertificateDetail: (slug: string) => fetchJson<Certificate>(`/certificates/${slug}/`),
+  getCertificateDetail: (slug: string) => fetchJson<Certificate>(`/certificates/${slug}/`, { expand: 'images' }),
 
   getAchievements: (params: { show_on_home?: boolean; page?: number } = {}) => fetchJson<PaginatedResponse<Achievement>>('/achievements/', { show_on_home: params.show_on_home ? 'true' : undefined, ordering: '-date', page: params.page }),
-  getAchievementDetail: (slug: string) => fetchJson<Achievement>(`/achievements/${slug}/`),
+  getAchievementDetail: (slug: string) => fetchJson<Achievement>(`/achievements/${slug}/`, { expand: 'images' }),
 
   getTestimonials: (params: { featured?: boolean; show_on_home?: boolean; page?: number } = {}) => fetchJson<PaginatedResponse<Testimonial>>('/testimonials/', { is_featured: (params.featured ?? true) ? 'true' : undefined, show_on_home: params.show_on_home ? 'true' : undefined, page: params.page }),
-  getTestimonialDetail: (slug: string) => fetchJson<Testimonial>(`/testimonials/${slug}/`),
+  getTestimonialDetail: (slug: string) => fetchJson<Testimonial>(`/testimonials/${slug}/`, { expand: 'images' }),
 
   getImages: (params: { show_on_home?: boolean; image_type?: string; limit?: number } = {}) => 
     fetchJson<PaginatedResponse<Image>>('/images/', { 
@@ -9,6 +9,9 @@ export interface PaginatedResponse<T> {
 export interface Image {
   id: number;
   image_url: string;
+  width?: number | null;
+  height?: number | null;
+  placeholder?: { width: number; height: number; aspect_ratio: number | null; color: string; lqip: string } | null;
   alt_text: string;
   caption?: string;
   show_on_home?: boolean;